@@ -1,35 +1,55 @@
 # app/__init__.py
+import os
+
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
+from sqlalchemy.orm import configure_mappers
 from .config import Config
+from .replicas import RoutingSession
 
 
-db = SQLAlchemy()
-migrate = Migrate()
+# RoutingSession: الـ GETs بتقرا من الـ read replicas لو متعرفة (DATABASE_REPLICA_URLS)
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
 
-    # CORS – نفس اللي عاملُه في الأبليكيشن الأول
+    # ورا nginx: remote_addr / scheme الحقيقيين من X-Forwarded-* (Config.PROXY_FIX_HOPS)
+    hops = app.config["PROXY_FIX_HOPS"]
+    if hops:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops)
+
+    # CORS – الـ origins في Config.CORS_ORIGINS (env: CORS_ORIGINS)
     CORS(
         app,
-        origins=[
-            "http://localhost:3000",
-            "http://127.0.0.1:3000",
-            "https://airnav-compound-frontend.vercel.app",
-            "http://95.179.181.72:3000",
-            "http://airnav-compound.work.gd",
-            "http://market.airnav-compound.work.gd",
-        ],
+        origins=app.config["CORS_ORIGINS"],
         supports_credentials=True,
     )
 
     db.init_app(app)
-    migrate.init_app(app, db)
+
+    # Flask-Migrate بيعمل import لـ alembic كله (~0.2s) – محتاجينه بس في `flask db ...`
+    if os.environ.get("FLASK_RUN_FROM_CLI") == "true":
+        from flask_migrate import Migrate
+        Migrate(app, db)
+
+    from . import ratelimit
+    ratelimit.init_app(app)
+
+    # gzip / brotli للـ JSON responses الكبيرة
+    from . import compression
+    compression.init_app(app)
+
+    from . import replicas
+    replicas.init_app(app, db)
+
+    # كل request بيتحدد له الكمبوند (tenant) قبل أي query
+    from . import tenancy
+    tenancy.init_app(app)
 
     # مهم علشان models تتسجل
     from . import models  # noqa: F401
@@ -41,6 +61,8 @@ def create_app():
     from .uploads.routes import uploads_bp
     from app.orders.routes import orders_bp
     from app.reviews.routes import profile_bp
+    from app.admin.routes import admin_bp
+    from app.notifications.routes import notifications_bp
 
 
     app.register_blueprint(main_bp)
@@ -49,7 +71,46 @@ def create_app():
     app.register_blueprint(uploads_bp, url_prefix="/api/uploads")
     app.register_blueprint(orders_bp, url_prefix="/api/orders")
     app.register_blueprint(profile_bp, url_prefix="/api/profile")
+    app.register_blueprint(admin_bp, url_prefix="/api/admin")
+    app.register_blueprint(notifications_bp, url_prefix="/api/notifications")
+
+    # CLI commands
+    # flask idempotency purge
+    from app.orders.idempotency import idempotency_cli
+    app.cli.add_command(idempotency_cli)
+
+    # flask analytics rebuild
+    from app.stores.analytics import analytics_cli
+    app.cli.add_command(analytics_cli)
 
+    # flask export orders --format csv|parquet --out ...
+    from app.admin.export import export_cli
+    app.cli.add_command(export_cli)
+
+    # flask orders archive|partitions
+    from app.orders.archive import orders_cli
+    app.cli.add_command(orders_cli)
+
+    # flask jobs worker|purge|retry
+    from app.jobs.worker import jobs_cli
+    app.cli.add_command(jobs_cli)
+
+    # flask tenants create|list
+    from app.tenancy import tenants_cli
+    app.cli.add_command(tenants_cli)
+
+    # flask notifications bench
+    from app.notifications.dispatch import notifications_cli
+    app.cli.add_command(notifications_cli)
+
+    # flask auth bench
+    from app.auth.bench import auth_cli
+    app.cli.add_command(auth_cli)
+
+
+    # الـ mappers بتتجهز هنا مرة واحدة – مع gunicorn preload ده بيحصل في الـ master قبل الـ fork
+    # بدل أول request في كل worker
+    configure_mappers()
 
     # بعدين هنزود:
     # from .seller_routes import seller_bp
@@ -58,3 +119,13 @@ def create_app():
     # app.register_blueprint(customer_bp, url_prefix="/api/customer")
 
     return app
+
+
+def dispose_engines(app):
+    """
+    بتتنادى في الـ worker بعد الـ fork (gunicorn.conf.py): أي connection اتفتحت في الـ master
+    متتشاركش – الـ worker بيفتح connections جديدة بتاعته.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
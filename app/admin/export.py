@@ -0,0 +1,250 @@
+# app/admin/export.py
+"""
+Export للطلبات (row لكل order item) من غير ما نحمل الجدول كله في الذاكرة:
+server-side cursor + yield_per، والكتابة chunk بـ chunk.
+pandas / pyarrow اختياريين – لو مش متسطبين الـ summary بيتحسب بـ Python عادي
+والـ Parquet بيرجع error واضح.
+"""
+import csv
+import io
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import select
+
+from app import db
+from app.models import Order, OrderItem, Store
+
+export_cli = AppGroup("export", help="Streaming data exports.")
+
+DEFAULT_CHUNK_SIZE = 2000
+CENTS = Decimal("0.01")
+
+EXPORT_COLUMNS = [
+    "order_id",
+    "order_created_at",
+    "order_status",
+    "store_id",
+    "store_name",
+    "category",
+    "customer_id",
+    "delivery_method",
+    "order_total",
+    "item_id",
+    "product_id",
+    "product_name",
+    "unit_price",
+    "quantity",
+    "subtotal",
+]
+
+
+def iter_order_item_chunks(date_from=None, date_to=None, store_id=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                           status=None):
+    """
+    بيرجع lists من tuples (بنفس ترتيب EXPORT_COLUMNS)، كل list حجمها chunk_size بالكتير.
+    yield_per في SQLAlchemy 2 بيفعّل stream_results (server-side cursor في psycopg2).
+    status (زي "DELIVERED" للـ summary) بيتفلتر في الـ SQL.
+    """
+    stmt = (
+        select(
+            Order.id,
+            Order.created_at,
+            Order.status,
+            Order.store_id,
+            Store.name,
+            Store.category,
+            Order.customer_id,
+            Order.delivery_method,
+            Order.total_amount,
+            OrderItem.id,
+            OrderItem.product_id,
+            OrderItem.product_name,
+            OrderItem.unit_price,
+            OrderItem.quantity,
+            OrderItem.subtotal,
+        )
+        .join(OrderItem, OrderItem.order_id == Order.id)
+        .join(Store, Store.id == Order.store_id)
+        .order_by(Order.id, OrderItem.id)
+    )
+    if date_from is not None:
+        stmt = stmt.where(Order.created_at >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(Order.created_at < date_to)
+    if store_id is not None:
+        stmt = stmt.where(Order.store_id == store_id)
+    if status is not None:
+        stmt = stmt.where(Order.status == status)
+
+    result = db.session.execute(stmt.execution_options(yield_per=chunk_size))
+    try:
+        for partition in result.partitions():
+            yield [tuple(row) for row in partition]
+    finally:
+        result.close()
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def iter_csv(chunks):
+    """
+    بيرجع CSV كـ strings (header الأول وبعدين chunk لكل partition) – مناسب للـ streaming response.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+
+    for chunk in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_value(v) for v in row] for row in chunk)
+        yield buffer.getvalue()
+
+
+def write_parquet(chunks, path: str):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise click.ClickException("Parquet export requires pyarrow (pip install pyarrow)")
+
+    money = pa.decimal128(12, 2)
+    schema = pa.schema(
+        [
+            ("order_id", pa.int64()),
+            ("order_created_at", pa.timestamp("us")),
+            ("order_status", pa.string()),
+            ("store_id", pa.int64()),
+            ("store_name", pa.string()),
+            ("category", pa.string()),
+            ("customer_id", pa.int64()),
+            ("delivery_method", pa.string()),
+            ("order_total", money),
+            ("item_id", pa.int64()),
+            ("product_id", pa.int64()),
+            ("product_name", pa.string()),
+            ("unit_price", money),
+            ("quantity", pa.int64()),
+            ("subtotal", money),
+        ]
+    )
+
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunks:
+            columns = list(zip(*chunk))
+            batch = pa.RecordBatch.from_arrays(
+                [pa.array(col, type=field.type) for col, field in zip(columns, schema)],
+                schema=schema,
+            )
+            writer.write_batch(batch)
+
+
+def _summary_key(row):
+    # (store_id, store_name, category, day)
+    return row[3], row[4], row[5], row[1].date().isoformat()
+
+
+class RevenueSummary:
+    """
+    إيراد الطلبات الـ DELIVERED لكل (store, category, day)، بيتجمع chunk بـ chunk.
+    الذاكرة بتكبر مع عدد المجموعات بس، مش مع عدد الـ rows.
+    لو pandas متسطب الـ groupby بيتعمل vectorized على كل chunk.
+    الفلوس Decimal في الحالتين (مش float64)، فالنتيجة واحدة بـ pandas أو من غيرها.
+    الـ chunks ممكن يبقى فيها حالات تانية (export CLI) – اللي مش DELIVERED بيتشال هنا.
+    """
+
+    def __init__(self):
+        try:
+            import pandas as pd
+        except ImportError:
+            pd = None
+        self._pd = pd
+        self._totals = None if pd is not None else defaultdict(Decimal)
+
+    def add(self, chunk):
+        if self._pd is None:
+            for row in chunk:
+                if row[2] == "DELIVERED":
+                    self._totals[_summary_key(row)] += Decimal(row[14] or 0)
+            return
+
+        pd = self._pd
+        df = pd.DataFrame.from_records(chunk, columns=EXPORT_COLUMNS)
+        df = df[df["order_status"] == "DELIVERED"]
+        if df.empty:
+            return
+        df = df.assign(
+            day=pd.to_datetime(df["order_created_at"]).dt.strftime("%Y-%m-%d"),
+            subtotal=df["subtotal"].map(lambda v: Decimal(v or 0)),
+        )
+        part = df.groupby(["store_id", "store_name", "category", "day"])["subtotal"].sum()
+        self._totals = part if self._totals is None else self._totals.add(part, fill_value=0)
+
+    def rows(self):
+        if self._totals is None:
+            return []
+        totals = self._totals if self._pd is None else self._totals.to_dict()
+        return [
+            {
+                "store_id": int(store_id),
+                "store_name": store_name,
+                "category": category,
+                "day": day,
+                "revenue": float(Decimal(value).quantize(CENTS)),
+            }
+            for (store_id, store_name, category, day), value in sorted(totals.items())
+        ]
+
+
+def summarize(chunks):
+    summary = RevenueSummary()
+    for chunk in chunks:
+        summary.add(chunk)
+    return summary.rows()
+
+
+@export_cli.command("orders")
+@click.option("--format", "fmt", type=click.Choice(["csv", "parquet"]), default="csv")
+@click.option("--out", "out_path", required=True, help="Output file path ('-' for stdout, CSV only).")
+@click.option("--from", "date_from", type=click.DateTime(["%Y-%m-%d"]), default=None, help="Inclusive.")
+@click.option("--to", "date_to", type=click.DateTime(["%Y-%m-%d"]), default=None, help="Exclusive.")
+@click.option("--store-id", type=int, default=None)
+@click.option("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, show_default=True)
+@click.option("--summary", "summary_path", default=None, help="Also write a revenue summary CSV here.")
+def export_orders_command(fmt, out_path, date_from, date_to, store_id, chunk_size, summary_path):
+    """Export orders joined with their items to CSV or Parquet."""
+    summary = RevenueSummary() if summary_path else None
+    written = 0
+
+    def chunks():
+        # الـ summary بيتحسب في نفس اللفة – كل chunk بيتكتب وبيتجمع وبعدين يترمي
+        nonlocal written
+        for chunk in iter_order_item_chunks(date_from, date_to, store_id, chunk_size):
+            if summary is not None:
+                summary.add(chunk)
+            written += len(chunk)
+            yield chunk
+
+    if fmt == "parquet":
+        write_parquet(chunks(), out_path)
+    else:
+        with click.open_file(out_path, "w", encoding="utf-8") as out:
+            for text in iter_csv(chunks()):
+                out.write(text)
+
+    if summary is not None:
+        with open(summary_path, "w", encoding="utf-8", newline="") as fh:
+            writer = csv.DictWriter(fh, fieldnames=["store_id", "store_name", "category", "day", "revenue"])
+            writer.writeheader()
+            writer.writerows(summary.rows())
+
+    click.echo(f"Exported {written} rows to {out_path}", err=True)
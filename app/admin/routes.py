@@ -0,0 +1,63 @@
+# app/admin/routes.py
+from datetime import datetime
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+
+from app.auth.routes import get_current_user_from_request
+from app.admin.export import iter_order_item_chunks, iter_csv, summarize
+
+admin_bp = Blueprint("admin", __name__)
+
+
+def _export_filters():
+    """
+    ?from=YYYY-MM-DD (inclusive) &to=YYYY-MM-DD (exclusive) &store_id=
+    """
+    date_from = request.args.get("from")
+    date_to = request.args.get("to")
+    return {
+        "date_from": datetime.fromisoformat(date_from) if date_from else None,
+        "date_to": datetime.fromisoformat(date_to) if date_to else None,
+        "store_id": request.args.get("store_id", type=int),
+    }
+
+
+@admin_bp.route("/export/orders", methods=["GET"])
+def export_orders():
+    """
+    CSV لكل order items – بيتبعت chunk بـ chunk من server-side cursor.
+    """
+    current_user, error = get_current_user_from_request(allowed_roles=["ADMIN"])
+    if error:
+        msg, status = error
+        return jsonify({"message": msg}), status
+
+    try:
+        filters = _export_filters()
+    except ValueError:
+        return jsonify({"message": "صيغة التاريخ غير صالحة (YYYY-MM-DD)"}), 400
+
+    filename = f"orders-{datetime.utcnow():%Y%m%d-%H%M%S}.csv"
+    return Response(
+        stream_with_context(iter_csv(iter_order_item_chunks(**filters))),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@admin_bp.route("/export/summary", methods=["GET"])
+def export_summary():
+    """
+    إيراد الطلبات الـ DELIVERED لكل (store, category, day).
+    """
+    current_user, error = get_current_user_from_request(allowed_roles=["ADMIN"])
+    if error:
+        msg, status = error
+        return jsonify({"message": msg}), status
+
+    try:
+        filters = _export_filters()
+    except ValueError:
+        return jsonify({"message": "صيغة التاريخ غير صالحة (YYYY-MM-DD)"}), 400
+
+    return jsonify(summarize(iter_order_item_chunks(status="DELIVERED", **filters))), 200
@@ -0,0 +1,152 @@
+# app/auth/bench.py
+"""
+- flask auth bench – throughput بتاع POST /api/auth/login تحت concurrency. الـ logins بتتبعت
+  من كذا thread على الـ app نفسه (test client، من غير network) – يعني الرقم ده الـ hashing
+  + الـ DB + Flask لـ process واحد بنفس PASSWORD_HASH_* اللي في الـ config
+- flask auth bench-tokens – تكلفة الـ auth لكل request: jwt.decode من غير cache، decode_token
+  من الـ verified-token cache، و get_current_user_from_request كاملة (فيها الـ DB get)
+
+الاتنين بيعملوا user مؤقت في الكمبوند الافتراضي وبيمسحوه في الآخر.
+"""
+import statistics
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import click
+import jwt
+from flask import current_app
+from flask.cli import AppGroup
+
+from app import db
+from app.auth.tokens import decode_token, get_token_cache, jwt_secret
+from app.models import Tenant, User
+from app.tenancy import use_tenant
+
+auth_cli = AppGroup("auth", help="Authentication benchmarks.")
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+@contextmanager
+def _bench_user():
+    """
+    (user, password) – user مؤقت بيتمسح بعد الـ bench.
+    """
+    tenant = Tenant.query.filter_by(code=current_app.config.get("DEFAULT_TENANT")).first()
+    if tenant is None:
+        raise click.ClickException("DEFAULT_TENANT does not exist")
+
+    username = f"bench-{uuid.uuid4().hex[:12]}"
+    password = uuid.uuid4().hex
+    with use_tenant(tenant.id):
+        user = User(username=username, full_name="Auth bench", email=f"{username}@bench.invalid",
+                    role="CUSTOMER")
+        user.set_password(password)
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+        try:
+            yield user, password
+        finally:
+            db.session.rollback()
+            User.query.filter_by(id=user_id).delete()
+            db.session.commit()
+
+
+@auth_cli.command("bench")
+@click.option("--requests", "total", type=int, default=200, show_default=True)
+@click.option("--concurrency", type=int, default=8, show_default=True)
+def bench_command(total, concurrency):
+    """Login throughput and latency under concurrency."""
+    app = current_app._get_current_object()
+    with _bench_user() as (user, password):
+        _login_bench(app, user.username, password, total, concurrency)
+
+
+def _login_bench(app, username, password, total, concurrency):
+    # الـ bench كله من نفس الـ IP – الـ rate limit هيقفله بعد أول كام login
+    ratelimit_enabled = app.config.get("RATELIMIT_ENABLED", True)
+    app.config["RATELIMIT_ENABLED"] = False
+
+    latencies, statuses = [], {}
+    lock = threading.Lock()
+    per_thread = total // concurrency
+    body = {"username_or_email": username, "password": password}
+
+    def worker():
+        client = app.test_client()
+        for _ in range(per_thread):
+            started = time.perf_counter()
+            status = client.post("/api/auth/login", json=body).status_code
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                statuses[status] = statuses.get(status, 0) + 1
+
+    try:
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        app.config["RATELIMIT_ENABLED"] = ratelimit_enabled
+
+    sent = len(latencies)
+    click.echo(
+        f"{sent} logins in {elapsed:.2f}s with concurrency {concurrency}: {sent / elapsed:.1f} logins/s "
+        f"(hash workers {app.config.get('PASSWORD_HASH_WORKERS')}, "
+        f"queue {app.config.get('PASSWORD_HASH_QUEUE')}, method {app.config.get('PASSWORD_HASH_METHOD')})"
+    )
+    click.echo(
+        f"latency ms: p50 {statistics.median(latencies) * 1000:.0f}, "
+        f"p95 {_percentile(latencies, 95) * 1000:.0f}, max {max(latencies) * 1000:.0f}"
+    )
+    click.echo("status: " + ", ".join(f"{code}={n}" for code, n in sorted(statuses.items())))
+
+
+def _per_call_us(fn, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1_000_000
+
+
+@auth_cli.command("bench-tokens")
+@click.option("--iterations", type=int, default=20000, show_default=True)
+def bench_tokens_command(iterations):
+    """Per-request auth overhead: JWT verify, token cache hit, full user lookup."""
+    from app.auth.routes import generate_token, get_current_user_from_request
+
+    app = current_app._get_current_object()
+    with _bench_user() as (user, _):
+        token = generate_token(user)
+        secret = jwt_secret()
+        decode_token(token)  # يدخل الـ cache
+
+        results = [
+            ("jwt.decode (no cache)", _per_call_us(
+                lambda: jwt.decode(token, secret, algorithms=["HS256"]), iterations)),
+            ("decode_token (cache hit)", _per_call_us(lambda: decode_token(token), iterations)),
+        ]
+
+        headers = {"Authorization": f"Bearer {token}"}
+        with app.test_request_context("/api/auth/me", headers=headers), use_tenant(user.tenant_id):
+            def current_user():
+                db.session.expunge_all()  # كل request بيبدأ بـ session فاضية
+                found, error = get_current_user_from_request()
+                assert error is None, error
+
+            results.append(("get_current_user_from_request", _per_call_us(
+                current_user, max(1, iterations // 10))))
+
+    click.echo(f"JWT cache size {get_token_cache().maxsize}")
+    for name, us in results:
+        click.echo(f"{name:32s} {us:8.1f} us/call")
@@ -0,0 +1,103 @@
+# app/auth/passwords.py
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from functools import lru_cache
+
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class PasswordHasherBusy(Exception):
+    """
+    الـ pool مليان (login storm) – الأحسن نرجع 503 بدل ما الـ worker يفضل مستني.
+    """
+
+
+_lock = threading.Lock()
+_executor = None
+_slots = None
+_owner_pid = None
+
+
+def _get_pool():
+    """
+    ThreadPoolExecutor واحد لكل process.
+    hashlib.scrypt / pbkdf2_hmac بيسيبوا الـ GIL، فالـ threads التانية في نفس
+    الـ worker بتفضل تخدم requests وإحنا بنعمل hash.
+    بنتأكد من الـ pid علشان لو الـ app اتعملها preload قبل الـ fork.
+
+    الـ pool بيحدد إيه بالظبط:
+    - أقصى عدد hashes شغالة في نفس الوقت في الـ process = PASSWORD_HASH_WORKERS
+      (الـ CPU والـ memory بتاعة scrypt مش بتزيد مع عدد الـ logins)
+    - أقصى عدد hashes شغالة + مستنية = WORKERS + PASSWORD_HASH_QUEUE، واللي بعدهم
+      بياخد PasswordHasherBusy (503) بعد PASSWORD_HASH_TIMEOUT بدل ما الطابور يكبر
+    مش بيحرر الـ request thread: الـ request بيفضل مستني future.result() لحد ما الـ hash
+    يخلص، فعدد الـ logins المتوازية لكل worker لسه محدود بـ gunicorn threads.
+    لو حصل timeout الـ hash بيكمل في الـ pool والـ slot بيرجع لما يخلص.
+    قياس: flask auth bench
+    """
+    global _executor, _slots, _owner_pid
+
+    pid = os.getpid()
+    if _executor is not None and _owner_pid == pid:
+        return _executor, _slots
+
+    with _lock:
+        if _executor is None or _owner_pid != pid:
+            workers = max(1, current_app.config.get("PASSWORD_HASH_WORKERS", 2))
+            queue = max(0, current_app.config.get("PASSWORD_HASH_QUEUE", 32))
+            _executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="password-hash"
+            )
+            # workers + queue = أقصى عدد hashes شغالة أو مستنية في نفس الوقت
+            _slots = threading.BoundedSemaphore(workers + queue)
+            _owner_pid = pid
+    return _executor, _slots
+
+
+def _run(fn, *args):
+    executor, slots = _get_pool()
+    timeout = current_app.config.get("PASSWORD_HASH_TIMEOUT", 10)
+
+    if not slots.acquire(timeout=timeout):
+        raise PasswordHasherBusy()
+
+    try:
+        future = executor.submit(fn, *args)
+    except Exception:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        raise PasswordHasherBusy()
+
+
+def _hash_method() -> str:
+    return current_app.config.get("PASSWORD_HASH_METHOD") or "scrypt"
+
+
+@lru_cache(maxsize=8)
+def _method_prefix(method: str) -> str:
+    # "scrypt" → "scrypt:32768:8:1" – الجزء اللي قبل أول $ في الـ hash
+    return generate_password_hash("", method=method).split("$", 1)[0]
+
+
+def hash_password(password: str) -> str:
+    return _run(generate_password_hash, password, _hash_method())
+
+
+def verify_password(pwhash: str, password: str) -> bool:
+    return _run(check_password_hash, pwhash, password)
+
+
+def needs_rehash(pwhash: str) -> bool:
+    """
+    True لو الـ hash معمول بـ method/parameters غير اللي في الـ config.
+    """
+    if not pwhash or "$" not in pwhash:
+        return True
+    return pwhash.split("$", 1)[0] != _method_prefix(_hash_method())
@@ -2,9 +2,15 @@ from datetime import datetime, timedelta
 
 import jwt
 from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 
 from app import db
 from app.models import User
+from app.auth.passwords import PasswordHasherBusy
+from app.auth.tokens import jwt_secret, decode_token, invalidate_user_tokens
+from app.ratelimit import rate_limit
+from app.replicas import mark_recent_write
 
 auth_bp = Blueprint("auth", __name__)
 
@@ -12,23 +18,29 @@ VALID_ROLES = {"CUSTOMER", "SELLER"}
 DEFAULT_ROLE = "CUSTOMER"
 
 
-def generate_token(user: User) -> str:
+def generate_token(user: User, token_type: str = "access") -> str:
     """
     Generate a signed JWT for the given user.
+    - access: عمره قصير (ACCESS_TOKEN_TTL_MINUTES) وبيتبعت مع كل request
+    - refresh: عمره طويل (REFRESH_TOKEN_TTL_DAYS) وبيستخدم بس في /refresh
+    الاتنين فيهم "ver" = user.token_version، فـ logout-all بيلغيهم كلهم.
     """
-    secret = current_app.config.get("JWT_SECRET")
-    if not secret:
-        # fallback على SECRET_KEY لو JWT_SECRET مش مطلوب
-        secret = current_app.config.get("SECRET_KEY", "dev-jwt-secret")
+    now = datetime.utcnow()
+    if token_type == "refresh":
+        lifetime = timedelta(days=current_app.config.get("REFRESH_TOKEN_TTL_DAYS", 30))
+    else:
+        lifetime = timedelta(minutes=current_app.config.get("ACCESS_TOKEN_TTL_MINUTES", 15))
 
     payload = {
         "sub": str(user.id),          # نخليها string عشان نبقى متوافقين مع PyJWT 2
         "role": user.role,
-        "iat": datetime.utcnow(),
-        "exp": datetime.utcnow() + timedelta(days=30),
+        "typ": token_type,
+        "ver": user.token_version or 0,
+        "iat": now,
+        "exp": now + lifetime,
     }
 
-    token = jwt.encode(payload, secret, algorithm="HS256")
+    token = jwt.encode(payload, jwt_secret(), algorithm="HS256")
 
     # PyJWT 1.x بيرجع bytes – 2.x بيرجع str
     if isinstance(token, bytes):
@@ -36,10 +48,47 @@ def generate_token(user: User) -> str:
     return token
 
 
+def revoke_user_tokens(user: User):
+    """
+    logout-everywhere / تغيير role: أي توكن قديم (access أو refresh) يبقى مرفوض.
+    لازم commit بعدها.
+    """
+    user.token_version = (user.token_version or 0) + 1
+    invalidate_user_tokens(user.id)
+
+
+def _load_user_from_claims(data: dict, token_type: str):
+    """
+    بترجع (user, error). التوكنات القديمة اللي مفيهاش typ/ver بتتعامل على إنها access بـ ver=0.
+    """
+    if data.get("typ", "access") != token_type:
+        return None, ("Invalid token type", 401)
+
+    user_id = data.get("sub")
+    if not user_id:
+        return None, ("Invalid token payload", 401)
+
+    # user_id string → int
+    try:
+        user_id_int = int(user_id)
+    except ValueError:
+        return None, ("Invalid token payload", 401)
+
+    user = db.session.get(User, user_id_int)
+    if not user:
+        return None, ("User not found", 404)
+
+    # الـ version بنقارنه باليوزر اللي لسه جايبينه – من غير query زيادة
+    if data.get("ver", 0) != (user.token_version or 0):
+        return None, ("Token revoked, please login again", 401)
+
+    return user, None
+
+
 def get_current_user_from_request(allowed_roles=None):
     """
     - تقرأ Authorization: Bearer <token>
-    - تفك JWT بنفس JWT_SECRET
+    - تفك JWT بنفس JWT_SECRET (أو من الـ verified-token cache)
     - تجيب الـ User من الـ DB
     - لو allowed_roles متحديد، تتأكد إن role فيهم
     """
@@ -51,40 +100,26 @@ def get_current_user_from_request(allowed_roles=None):
     if not token:
         return None, ("Missing or invalid Authorization header", 401)
 
-    secret = current_app.config.get("JWT_SECRET")
-    if not secret:
-        secret = current_app.config.get("SECRET_KEY", "dev-jwt-secret")
-
     try:
-        data = jwt.decode(token, secret, algorithms=["HS256"])
+        data = decode_token(token)
     except jwt.ExpiredSignatureError:
         return None, ("Token expired, please login again", 401)
     except jwt.InvalidTokenError:
         return None, ("Invalid token", 401)
 
-    user_id = data.get("sub")
-    role = data.get("role")
-
-    if not user_id:
-        return None, ("Invalid token payload", 401)
-
-    # user_id string → int
-    try:
-        user_id_int = int(user_id)
-    except ValueError:
-        return None, ("Invalid token payload", 401)
-
-    user = User.query.get(user_id_int)
-    if not user:
-        return None, ("User not found", 404)
+    user, error = _load_user_from_claims(data, "access")
+    if error:
+        return None, error
 
-    if allowed_roles is not None and role not in allowed_roles:
+    # الـ role من الـ DB مش من التوكن، علشان تغيير الـ role يسري فوراً
+    if allowed_roles is not None and user.role not in allowed_roles:
         return None, ("Not allowed", 403)
 
     return user, None
 
 
 @auth_bp.route("/register", methods=["POST"])
+@rate_limit("register")
 def register():
     data = request.get_json() or {}
 
@@ -104,13 +139,6 @@ def register():
     if not username or not full_name or not email or not password:
         return jsonify({"message": "برجاء إدخال كل البيانات المطلوبة"}), 400
 
-    # unique checks
-    if User.query.filter_by(username=username).first():
-        return jsonify({"message": "اسم المستخدم مستخدم بالفعل"}), 400
-
-    if User.query.filter_by(email=email).first():
-        return jsonify({"message": "هذا البريد مستخدم بالفعل"}), 400
-
     # ✅ determine final role
     role = desired_role if desired_role in VALID_ROLES else DEFAULT_ROLE
 
@@ -124,10 +152,24 @@ def register():
         floor=floor,
         apartment=apartment,
     )
-    user.set_password(password)
+    try:
+        user.set_password(password)
+    except PasswordHasherBusy:
+        return jsonify({"message": "الخدمة مشغولة حالياً، حاول مرة أخرى"}), 503
 
+    # unique checks: بنسيبها للـ unique indexes بدل 2 queries قبل الـ insert
+    # (وكده كمان مفيش race لو اتنين سجلوا بنفس الاسم في نفس اللحظة)
     db.session.add(user)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError as exc:
+        db.session.rollback()
+        if "email" in str(exc.orig).lower():
+            return jsonify({"message": "هذا البريد مستخدم بالفعل"}), 400
+        return jsonify({"message": "اسم المستخدم مستخدم بالفعل"}), 400
+
+    # أول GET بالتوكن الجديد ممكن يسبق الـ replica
+    mark_recent_write(user.id)
 
     token = generate_token(user)
 
@@ -135,6 +177,7 @@ def register():
         {
             "message": "تم إنشاء الحساب بنجاح",
             "access_token": token,
+            "refresh_token": generate_token(user, "refresh"),
             "user": {
                 "id": user.id,
                 "username": user.username,
@@ -151,6 +194,7 @@ def register():
 
 
 @auth_bp.route("/login", methods=["POST"])
+@rate_limit("login")
 def login():
     data = request.get_json() or {}
     username_or_email = data.get("username_or_email", "").strip()
@@ -159,21 +203,32 @@ def login():
     if not username_or_email or not password:
         return jsonify({"message": "برجاء إدخال اسم المستخدم/البريد وكلمة المرور"}), 400
 
-    user = (
-        User.query.filter(
-            (User.username == username_or_email) | (User.email == username_or_email.lower())
-        )
-        .first()
-    )
+    # query على index واحد بدل OR على الاتنين. الـ register مش بيمنع "@" في الـ username،
+    # فلو مفيش email بالقيمة دي بنجرب الـ username (query تانية بس في الحالة دي)
+    lookup = username_or_email.lower()
+    user = None
+    if "@" in lookup:
+        user = User.query.filter(func.lower(User.email) == lookup).first()
+    if user is None:
+        user = User.query.filter(func.lower(User.username) == lookup).first()
 
-    if not user or not user.check_password(password):
-        return jsonify({"message": "بيانات الدخول غير صحيحة"}), 401
+    try:
+        if not user or not user.check_password(password):
+            return jsonify({"message": "بيانات الدخول غير صحيحة"}), 401
+
+        # الـ hash parameters اتغيرت في الـ config → نحدث الـ hash بالباسورد اللي لسه متأكدين منه
+        if user.password_needs_rehash():
+            user.set_password(password)
+            db.session.commit()
+    except PasswordHasherBusy:
+        return jsonify({"message": "الخدمة مشغولة حالياً، حاول مرة أخرى"}), 503
 
     token = generate_token(user)
 
     return jsonify(
         {
             "access_token": token,
+            "refresh_token": generate_token(user, "refresh"),
             "user": {
                 "id": user.id,
                 "username": user.username,
@@ -185,6 +240,58 @@ def login():
     ), 200
 
 
+@auth_bp.route("/refresh", methods=["POST"])
+@rate_limit("refresh")
+def refresh():
+    """
+    body: { "refresh_token": "..." } → access_token جديد من غير باسورد ولا hashing.
+    """
+    data = request.get_json() or {}
+    refresh_token = (data.get("refresh_token") or "").strip()
+    if not refresh_token:
+        return jsonify({"message": "refresh_token مطلوب"}), 400
+
+    try:
+        claims = decode_token(refresh_token)
+    except jwt.ExpiredSignatureError:
+        return jsonify({"message": "Token expired, please login again"}), 401
+    except jwt.InvalidTokenError:
+        return jsonify({"message": "Invalid token"}), 401
+
+    user, error = _load_user_from_claims(claims, "refresh")
+    if error:
+        msg, status = error
+        return jsonify({"message": msg}), status
+
+    return jsonify({"access_token": generate_token(user)}), 200
+
+
+@auth_bp.route("/logout-all", methods=["POST"])
+def logout_all():
+    user, error = get_current_user_from_request()
+    if error:
+        msg, status = error
+        return jsonify({"message": msg}), status
+
+    revoke_user_tokens(user)
+    db.session.commit()
+
+    return jsonify({"message": "تم تسجيل الخروج من كل الأجهزة"}), 200
+
+
+def serialize_user(user: User):
+    return {
+        "id": user.id,
+        "username": user.username,
+        "full_name": user.full_name,
+        "email": user.email,
+        "role": user.role,
+        "building": user.building,
+        "floor": user.floor,
+        "apartment": user.apartment,
+    }
+
+
 @auth_bp.route("/me", methods=["GET"])
 def me():
     user, error = get_current_user_from_request()
@@ -192,17 +299,4 @@ def me():
         msg, status = error
         return jsonify({"message": msg}), status
 
-    return jsonify(
-        {
-            "user": {
-                "id": user.id,
-                "username": user.username,
-                "full_name": user.full_name,
-                "email": user.email,
-                "role": user.role,
-                "building": user.building,
-                "floor": user.floor,
-                "apartment": user.apartment,
-            }
-        }
-    ), 200
+    return jsonify({"user": serialize_user(user)}), 200
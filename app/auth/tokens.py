@@ -0,0 +1,111 @@
+# app/auth/tokens.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import jwt
+from flask import current_app
+
+
+def jwt_secret() -> str:
+    secret = current_app.config.get("JWT_SECRET")
+    if not secret:
+        # fallback على SECRET_KEY لو JWT_SECRET مش مطلوب
+        secret = current_app.config.get("SECRET_KEY", "dev-jwt-secret")
+    return secret
+
+
+class VerifiedTokenCache:
+    """
+    LRU صغير: sha256(token) → claims اللي اتعملها verify قبل كده.
+    - بيحترم exp: الـ entry بيتشال أول ما التوكن يخلص
+    - _by_user: sub → مفاتيح توكناته اللي في الـ cache، فـ invalidate_user بيشيلهم كلهم
+      وبيخليهم يتعمل لهم verify كامل تاني. بيتشال مع آخر entry لليوزر، فحجمه محدود بـ maxsize
+    - بيرجع نسخة من الـ claims (flat dict) – اللي بيعدّل فيها مبيغيرش الـ cache
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # key → (claims, exp)
+        self._by_user = {}
+        self._lock = threading.Lock()
+
+    def _remove(self, key: bytes):
+        claims, _ = self._entries.pop(key)
+        sub = claims.get("sub")
+        keys = self._by_user.get(sub)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[sub]
+
+    def get(self, key: bytes, now: float):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            claims, exp = entry
+            if exp is not None and now >= exp:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return dict(claims)
+
+    def put(self, key: bytes, claims: dict):
+        claims = dict(claims)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (claims, claims.get("exp"))
+            self._by_user.setdefault(claims.get("sub"), set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key in self._by_user.pop(str(user_id), ()):
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_token_cache() -> VerifiedTokenCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = VerifiedTokenCache(
+                    maxsize=current_app.config.get("JWT_CACHE_SIZE", 4096)
+                )
+    return _cache
+
+
+def decode_token(token: str) -> dict:
+    """
+    زي jwt.decode بالظبط (نفس الـ exceptions)، بس التوكن اللي اتعمله verify
+    قبل كده بيرجع من الـ cache من غير HMAC.
+    """
+    cache = get_token_cache() if current_app.config.get("JWT_CACHE_SIZE", 4096) else None
+    if cache is None:
+        return jwt.decode(token, jwt_secret(), algorithms=["HS256"])
+
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    claims = cache.get(key, time.time())
+    if claims is not None:
+        return claims
+
+    claims = jwt.decode(token, jwt_secret(), algorithms=["HS256"])
+    cache.put(key, claims)
+    return claims
+
+
+def invalidate_user_tokens(user_id):
+    get_token_cache().invalidate_user(user_id)
@@ -0,0 +1,144 @@
+# app/compression.py
+"""
+ضغط الـ JSON responses (gzip أو brotli) حسب Accept-Encoding بتاع العميل.
+
+- بيتضغط بس لو الـ body أكبر من COMPRESS_MIN_SIZE والـ mimetype في COMPRESS_MIMETYPES
+- brotli اختياري (pip install brotli) – لو مش متسطب بنرجع لـ gzip
+- الـ streaming responses (orders stream / exports) مبتتضغطش هنا
+- الـ payloads المتخزنة (التصنيفات، منيو المتجر) بتستخدم PrecompressedJSON / PrecompressedBody:
+  الـ body بيتعمل encode ويتضغط مرة واحدة لكل encoding في كل ملء للـ cache، مش مع كل request
+"""
+import gzip
+import threading
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # brotli اختياري
+    brotli = None
+
+
+def _accepted_encodings(header: str) -> dict:
+    """
+    "gzip, br;q=0.8, *;q=0" → {"gzip": 1.0, "br": 0.8, "*": 0.0}
+    """
+    accepted = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def negotiate_encoding(header: str):
+    """
+    "br" أو "gzip" أو None. brotli الأول لو متاح ومقبول (بيطلع أصغر في الـ JSON العربي).
+    """
+    accepted = _accepted_encodings(header)
+    wildcard = accepted.get("*", 0.0)
+    candidates = ("br", "gzip") if brotli is not None else ("gzip",)
+    best, best_q = None, 0.0
+    for coding in candidates:
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    config = current_app.config
+    if encoding == "br":
+        return brotli.compress(data, quality=config.get("COMPRESS_BROTLI_LEVEL", 5))
+    return gzip.compress(data, compresslevel=config.get("COMPRESS_GZIP_LEVEL", 6), mtime=0)
+
+
+def _request_encoding(size: int):
+    config = current_app.config
+    if not config.get("COMPRESS_ENABLED", True) or size < config.get("COMPRESS_MIN_SIZE", 1024):
+        return None
+    return negotiate_encoding(request.headers.get("Accept-Encoding", ""))
+
+
+def _add_vary(response):
+    response.vary.add("Accept-Encoding")
+
+
+class PrecompressedBody:
+    """
+    body جاهز (bytes) متخزن في cache: كل encoding بيتضغط أول مرة يتطلب بس ويفضل محفوظ
+    مع الـ cache entry (يعني مرة لكل ملء للـ cache، مش مع كل request).
+    """
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self._variants = {}
+        self._lock = threading.Lock()
+
+    def variant(self, encoding: str) -> bytes:
+        data = self._variants.get(encoding)
+        if data is None:
+            with self._lock:
+                data = self._variants.get(encoding)
+                if data is None:
+                    data = compress(self.body, encoding)
+                    self._variants[encoding] = data
+        return data
+
+    def response(self, status: int = 200):
+        encoding = _request_encoding(len(self.body))
+        body = self.variant(encoding) if encoding else self.body
+        response = current_app.response_class(body, status=status, mimetype=current_app.json.mimetype)
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        _add_vary(response)
+        return response
+
+
+class PrecompressedJSON(PrecompressedBody):
+    """
+    نفس PrecompressedBody بس من payload – الـ serialize بيحصل مرة واحدة.
+    """
+
+    def __init__(self, payload):
+        self.payload = payload
+        super().__init__(current_app.json.response(payload).get_data())
+
+
+def compress_response(response):
+    """
+    after_request: بيضغط الـ response لو ينفع ولسه مش مضغوط.
+    """
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or response.status_code < 200
+        or response.status_code in (204, 206, 304)
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in current_app.config.get("COMPRESS_MIMETYPES", ("application/json",))
+        or "no-transform" in (response.headers.get("Cache-Control") or "")
+    ):
+        return response
+
+    data = response.get_data()
+    encoding = _request_encoding(len(data))
+    _add_vary(response)
+    if encoding is None:
+        return response
+
+    response.set_data(compress(data, encoding))
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def init_app(app):
+    app.after_request(compress_response)
@@ -1,21 +1,143 @@
 # app/config.py
 import os
-from dotenv import load_dotenv
+
+from .replicas import replica_binds
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-load_dotenv(os.path.join(BASE_DIR, ".env"))
+
+# في الـ container الـ env جاي من برا ومفيش .env – مش محتاجين نعمل import لـ dotenv أصلاً
+_ENV_FILE = os.path.join(BASE_DIR, ".env")
+if os.path.exists(_ENV_FILE):
+    from dotenv import load_dotenv
+
+    load_dotenv(_ENV_FILE)
 
 class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY", "dev-secret")
     JWT_SECRET = os.environ.get("JWT_SECRET", "dev-jwt-secret")
+    ACCESS_TOKEN_TTL_MINUTES = int(os.environ.get("ACCESS_TOKEN_TTL_MINUTES", "15"))
+    REFRESH_TOKEN_TTL_DAYS = int(os.environ.get("REFRESH_TOKEN_TTL_DAYS", "30"))
+    # عدد التوكنات اللي بنحتفظ بيها verified في الذاكرة (0 = من غير cache)
+    JWT_CACHE_SIZE = int(os.environ.get("JWT_CACHE_SIZE", "4096"))
 
     _db_url = os.environ.get("DATABASE_URL", "")
     MEDIA_ROOT = os.environ.get("MEDIA_ROOT", "/app/media")
     MEDIA_URL_PATH = "/media"  # اللي هنستخدمه في الـ URLs الخارجية
 
+    # ملفات استيراد المنيو (CSV/XLSX) لحد ما الـ job worker يخلص منها – برا MEDIA_ROOT
+    # (مش بيتعمله serve)، ولازم الـ web والـ worker يشوفوا نفس المكان
+    IMPORT_ROOT = os.environ.get("IMPORT_ROOT", "/app/imports")
+
     # convert postgres:// to postgresql:// لو موجودة
     if _db_url.startswith("postgres://"):
         _db_url = _db_url.replace("postgres://", "postgresql://", 1)
 
     SQLALCHEMY_DATABASE_URI = _db_url
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Read replicas (اختياري): "postgresql://replica1/db,postgresql://replica2/db"
+    SQLALCHEMY_BINDS = replica_binds(os.environ.get("DATABASE_REPLICA_URLS", ""))
+    # بعد ما المستخدم يكتب حاجة، قرايته بتفضل من الـ primary المدة دي
+    READ_YOUR_WRITES_SECONDS = float(os.environ.get("READ_YOUR_WRITES_SECONDS", "5"))
+
+    # Multi-compound: الكمبوند بيتحدد بـ X-Compound أو الـ Host، وإلا DEFAULT_TENANT
+    DEFAULT_TENANT = os.environ.get("DEFAULT_TENANT", "airnav")
+    TENANT_CACHE_SECONDS = int(os.environ.get("TENANT_CACHE_SECONDS", "60"))
+
+    # الـ frontends المسموح لها (CORS) – كمبوند جديد بيضيف الـ origin بتاعه هنا
+    CORS_ORIGINS = [
+        origin.strip()
+        for origin in os.environ.get(
+            "CORS_ORIGINS",
+            "http://localhost:3000,"
+            "http://127.0.0.1:3000,"
+            "https://airnav-compound-frontend.vercel.app,"
+            "http://95.179.181.72:3000,"
+            "http://airnav-compound.work.gd,"
+            "http://market.airnav-compound.work.gd",
+        ).split(",")
+        if origin.strip()
+    ]
+
+    # مواعيد فتح المتاجر بتتحسب بالتوقيت ده
+    STORE_TIMEZONE = os.environ.get("STORE_TIMEZONE", "Africa/Cairo")
+
+    # الـ facet counts بتاعة /api/stores/categories بتتخزن المدة دي بالكتير
+    CATEGORY_CACHE_SECONDS = int(os.environ.get("CATEGORY_CACHE_SECONDS", "60"))
+
+    # snapshot الأسعار والمخزون لكل متجر بتاع POST /api/orders/quote بيتخزن المدة دي بالكتير
+    PRICING_CACHE_SECONDS = int(os.environ.get("PRICING_CACHE_SECONDS", "60"))
+
+    # snapshots المنيو (JSON لكل store/catalog_version) مشتركة بين الـ workers على نفس الجهاز
+    CATALOG_CACHE_DIR = os.environ.get("CATALOG_CACHE_DIR", "")
+
+    # ضغط الـ JSON responses (gzip / brotli لو متسطب) – الأصغر من COMPRESS_MIN_SIZE bytes بيتبعت زي ما هو
+    COMPRESS_ENABLED = os.environ.get("COMPRESS_ENABLED", "1") == "1"
+    COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", "1024"))
+    COMPRESS_GZIP_LEVEL = int(os.environ.get("COMPRESS_GZIP_LEVEL", "6"))
+    COMPRESS_BROTLI_LEVEL = int(os.environ.get("COMPRESS_BROTLI_LEVEL", "5"))
+    COMPRESS_MIMETYPES = ("application/json",)
+
+    # عدد الـ proxies (nginx / load balancer) اللي قدام gunicorn – ProxyFix بياخد الـ client IP
+    # والـ scheme من X-Forwarded-For / X-Forwarded-Proto على قد العدد ده بس.
+    # من غيره كل الـ anonymous traffic بيبقى IP الـ proxy (bucket واحد للكل في الـ rate limiting).
+    # لو gunicorn مكشوف مباشرة خليها 0، وإلا أي client يقدر يزوّر الـ IP بتاعه.
+    PROXY_FIX_HOPS = int(os.environ.get("PROXY_FIX_HOPS", "1"))
+
+    # Rate limiting – "memory" أو "sqlite:////tmp/ratelimit.db" (مشترك بين الـ gunicorn workers)
+    RATELIMIT_ENABLED = os.environ.get("RATELIMIT_ENABLED", "1") == "1"
+    RATELIMIT_STORAGE = os.environ.get("RATELIMIT_STORAGE", "memory")
+    RATELIMIT_BUDGETS = {
+        "login": "10/minute",
+        "refresh": "30/minute",
+        "register": "5/minute",
+        "create_order": "20/minute",
+        "order_quote": "120/minute",
+        "uploads": "30/minute",
+        "stores_search": "60/minute",
+    }
+
+    # Background jobs (flask jobs worker)
+    JOBS_CONCURRENCY = int(os.environ.get("JOBS_CONCURRENCY", "4"))
+    JOBS_POLL_INTERVAL = float(os.environ.get("JOBS_POLL_INTERVAL", "1.0"))
+    JOBS_MAX_ATTEMPTS = int(os.environ.get("JOBS_MAX_ATTEMPTS", "5"))
+    JOBS_BACKOFF_SECONDS = int(os.environ.get("JOBS_BACKOFF_SECONDS", "10"))
+    JOBS_BACKOFF_MAX_SECONDS = int(os.environ.get("JOBS_BACKOFF_MAX_SECONDS", "3600"))
+    # job فضل RUNNING أكتر من كده يعني الـ worker بتاعه مات
+    JOBS_LOCK_TIMEOUT = int(os.environ.get("JOBS_LOCK_TIMEOUT", "600"))
+    THUMBNAIL_SIZE = int(os.environ.get("THUMBNAIL_SIZE", "400"))
+
+    # إشعارات الطلبات (webhook / Web Push) – بتتبعت من الـ worker
+    NOTIFICATIONS_ENABLED = os.environ.get("NOTIFICATIONS_ENABLED", "1") == "1"
+    # الأحداث اللي بتحصل في الفترة دي بتتجمع في إشعار واحد لكل مستلم
+    NOTIFICATIONS_BATCH_WINDOW = int(os.environ.get("NOTIFICATIONS_BATCH_WINDOW", "2"))
+    NOTIFICATIONS_BATCH_SIZE = int(os.environ.get("NOTIFICATIONS_BATCH_SIZE", "50"))
+    NOTIFICATIONS_SCAN_LIMIT = int(os.environ.get("NOTIFICATIONS_SCAN_LIMIT", "1000"))
+    # "stub" → كل الإشعارات بتتسجل في الذاكرة بدل ما تتبعت (تطوير / تجارب)
+    NOTIFICATIONS_TRANSPORT_OVERRIDE = os.environ.get("NOTIFICATIONS_TRANSPORT_OVERRIDE", "")
+    WEBHOOK_TIMEOUT = float(os.environ.get("WEBHOOK_TIMEOUT", "5"))
+    WEBHOOK_POOL_SIZE = int(os.environ.get("WEBHOOK_POOL_SIZE", "8"))
+    VAPID_PRIVATE_KEY = os.environ.get("VAPID_PRIVATE_KEY", "")
+    VAPID_SUBJECT = os.environ.get("VAPID_SUBJECT", "mailto:admin@airnav-compound.work.gd")
+    # الـ webpush endpoints مسموحة بس للـ hosts دي ("." في الأول = أي subdomain)
+    WEBPUSH_ALLOWED_HOSTS = [
+        h.strip()
+        for h in os.environ.get(
+            "WEBPUSH_ALLOWED_HOSTS",
+            "fcm.googleapis.com,updates.push.services.mozilla.com,.push.apple.com,.notify.windows.com",
+        ).split(",")
+        if h.strip()
+    ]
+
+    # `flask orders archive`: الطلبات المنتهية الأقدم من كده بتتنقل لـ orders_archive
+    ORDER_ARCHIVE_MONTHS = int(os.environ.get("ORDER_ARCHIVE_MONTHS", "6"))
+
+    # الـ Idempotency-Key بتاع POST /api/orders بيفضل صالح المدة دي
+    IDEMPOTENCY_TTL_HOURS = int(os.environ.get("IDEMPOTENCY_TTL_HOURS", "24"))
+
+    # Password hashing – أي method تقبله werkzeug زي "scrypt:32768:8:1" أو "pbkdf2:sha256:600000"
+    # لو غيرناها، الباسوردات القديمة بتتعمل لها rehash تلقائي عند الـ login
+    PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_QUEUE = int(os.environ.get("PASSWORD_HASH_QUEUE", "32"))
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get("PASSWORD_HASH_TIMEOUT", "10"))
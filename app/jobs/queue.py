@@ -0,0 +1,156 @@
+# app/jobs/queue.py
+"""
+Job queue بسيط على جدول jobs (Postgres في الإنتاج، SQLite في التطوير):
+
+- enqueue() بيضيف الـ Job للـ session بس – الـ commit بتاع الـ request هو اللي بيظهره
+  للـ worker، فلو الـ request عمل rollback الـ job بيختفي معاه
+- الـ worker بياخد jobs بـ UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED)
+  (على SQLite الـ FOR UPDATE مش بيتكتب، والـ UPDATE نفسه atomic لأن فيه writer واحد)
+- لو الـ handler رمى exception الـ job بيرجع QUEUED بعد backoff أُسّي، ولما المحاولات تخلص يبقى DEAD
+- job فضل RUNNING أكتر من JOBS_LOCK_TIMEOUT (الـ worker مات) بيتاخد تاني
+
+الـ handlers بتتسجل بـ @job("name") في الموديولز اللي في TASK_MODULES.
+"""
+import importlib
+import json
+import logging
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import and_, or_, select, update
+
+from app import db
+from app.models import Job
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, DONE, DEAD = "QUEUED", "RUNNING", "DONE", "DEAD"
+
+# الموديولز اللي فيها @job – الـ worker بيعملها import قبل ما يبدأ
+TASK_MODULES = (
+    "app.uploads.tasks",
+    "app.notifications.dispatch",
+    "app.stores.imports",
+)
+
+_registry = {}
+
+
+class JobError(Exception):
+    """exception من الـ handler معناها إن الـ job مش هينجح مهما اتعاد – بيبقى DEAD على طول."""
+
+
+def job(name: str):
+    def decorator(func):
+        if name in _registry and _registry[name] is not func:
+            raise RuntimeError(f"Job {name!r} is already registered")
+        _registry[name] = func
+        return func
+
+    return decorator
+
+
+def load_tasks():
+    for module in TASK_MODULES:
+        importlib.import_module(module)
+    return dict(_registry)
+
+
+def enqueue(name: str, payload: dict = None, queue: str = "default", delay: int = 0, max_attempts: int = None) -> Job:
+    """
+    بيضيف الـ job للـ session الحالية من غير commit – الـ job بيتنفذ بعد commit الـ request.
+    """
+    if max_attempts is None:
+        max_attempts = current_app.config.get("JOBS_MAX_ATTEMPTS", 5)
+    record = Job(
+        queue=queue,
+        name=name,
+        payload=json.dumps(payload or {}, ensure_ascii=False),
+        status=QUEUED,
+        attempts=0,
+        max_attempts=max_attempts,
+        run_at=datetime.utcnow() + timedelta(seconds=delay),
+    )
+    db.session.add(record)
+    return record
+
+
+def backoff_seconds(attempts: int) -> int:
+    base = current_app.config.get("JOBS_BACKOFF_SECONDS", 10)
+    cap = current_app.config.get("JOBS_BACKOFF_MAX_SECONDS", 3600)
+    return min(cap, base * 2 ** max(attempts - 1, 0))
+
+
+def claim_jobs(worker_id: str, queue: str = "default", limit: int = 1):
+    """
+    بياخد لحد limit jobs جاهزين ويعلّم عليهم RUNNING في statement واحد.
+    بترجع list من (id, name, payload, attempts, max_attempts) وبتعمل commit.
+    """
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=current_app.config.get("JOBS_LOCK_TIMEOUT", 600))
+
+    ready = (
+        select(Job.id)
+        .where(
+            Job.queue == queue,
+            or_(
+                and_(Job.status == QUEUED, Job.run_at <= now),
+                and_(Job.status == RUNNING, Job.locked_at < stale),
+            ),
+        )
+        .order_by(Job.run_at, Job.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+
+    rows = db.session.execute(
+        update(Job)
+        .where(Job.id.in_(ready))
+        .values(status=RUNNING, locked_at=now, locked_by=worker_id, attempts=Job.attempts + 1)
+        .returning(Job.id, Job.name, Job.payload, Job.attempts, Job.max_attempts)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.session.commit()
+    return rows
+
+
+def _finish(job_id: int, worker_id: str, **values):
+    # لو الـ job اتاخد من worker تاني (lock timeout) منكتبش فوقه
+    db.session.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.locked_by == worker_id, Job.status == RUNNING)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+
+def run_job(row, worker_id: str):
+    """
+    بينفذ job واحد اتعمله claim. لازم يتنادى جوه app context.
+    """
+    job_id, name, payload, attempts, max_attempts = row
+    handler = _registry.get(name)
+
+    try:
+        if handler is None:
+            raise JobError(f"Unknown job {name!r}")
+        handler(**json.loads(payload or "{}"))
+        db.session.commit()
+    except Exception as exc:
+        db.session.rollback()
+        error = f"{type(exc).__name__}: {exc}"
+        if isinstance(exc, JobError) or attempts >= max_attempts:
+            logger.exception("Job %s (%s) is dead after %s attempts", job_id, name, attempts)
+            _finish(job_id, worker_id, status=DEAD, last_error=error,
+                    finished_at=datetime.utcnow(), locked_at=None, locked_by=None)
+        else:
+            delay = backoff_seconds(attempts)
+            logger.warning("Job %s (%s) failed, retrying in %ss: %s", job_id, name, delay, error)
+            _finish(job_id, worker_id, status=QUEUED, last_error=error,
+                    run_at=datetime.utcnow() + timedelta(seconds=delay), locked_at=None, locked_by=None)
+        return False
+
+    _finish(job_id, worker_id, status=DONE, finished_at=datetime.utcnow(), locked_at=None, locked_by=None)
+    return True
@@ -0,0 +1,124 @@
+# app/jobs/worker.py
+"""
+flask jobs worker  – بيسحب jobs من الجدول وينفذهم في thread pool محدود (--concurrency)
+flask jobs purge   – بيمسح الـ jobs الـ DONE والـ DEAD القديمة
+flask jobs retry   – بيرجّع الـ jobs الـ DEAD للـ queue
+"""
+import logging
+import os
+import signal
+import socket
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from app import db
+from app.jobs.queue import DEAD, DONE, QUEUED, claim_jobs, load_tasks, run_job
+from app.models import Job
+
+logger = logging.getLogger(__name__)
+
+jobs_cli = AppGroup("jobs", help="Background job queue.")
+
+
+def _run_in_app(app, row, worker_id):
+    # كل thread ليه app context (وبالتالي session) لوحده
+    with app.app_context():
+        try:
+            run_job(row, worker_id)
+        finally:
+            db.session.remove()
+
+
+@jobs_cli.command("worker")
+@click.option("--queue", default="default", show_default=True)
+@click.option("--concurrency", type=int, default=None, help="Defaults to JOBS_CONCURRENCY.")
+@click.option("--poll-interval", type=float, default=None, help="Seconds to sleep when the queue is empty.")
+@click.option("--once", is_flag=True, help="Drain the ready jobs and exit.")
+def worker_command(queue, concurrency, poll_interval, once):
+    """Run a job worker until SIGINT/SIGTERM."""
+    app = current_app._get_current_object()
+    concurrency = concurrency or app.config.get("JOBS_CONCURRENCY", 4)
+    poll_interval = poll_interval if poll_interval is not None else app.config.get("JOBS_POLL_INTERVAL", 1.0)
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    handlers = load_tasks()
+    click.echo(f"Worker {worker_id} on queue {queue!r} ({concurrency} threads): {', '.join(sorted(handlers))}", err=True)
+
+    stopping = threading.Event()
+    slots = threading.BoundedSemaphore(concurrency)
+
+    def stop(signum, frame):
+        stopping.set()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    def release(_future):
+        slots.release()
+
+    processed = 0
+    inflight = set()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="job-worker") as pool:
+        while not stopping.is_set():
+            # مناخدش jobs أكتر من الـ threads الفاضية – الباقي يفضل متاح لـ workers تانيين
+            free = 0
+            while free < concurrency and slots.acquire(blocking=False):
+                free += 1
+            if free == 0:
+                slots.acquire()
+                free = 1
+
+            rows = claim_jobs(worker_id, queue=queue, limit=free)
+            for _ in range(free - len(rows)):
+                slots.release()
+
+            for row in rows:
+                future = pool.submit(_run_in_app, app, row, worker_id)
+                inflight.add(future)
+                future.add_done_callback(release)
+            processed += len(rows)
+
+            if not rows:
+                inflight = {f for f in inflight if not f.done()}
+                if once:
+                    # الـ jobs اللي لسه شغالة ممكن تضيف jobs جديدة – نستناهم قبل ما نقول إن الـ queue فاضية
+                    if not inflight:
+                        break
+                    wait(inflight, return_when=FIRST_COMPLETED)
+                    continue
+                stopping.wait(poll_interval)
+
+    click.echo(f"Worker {worker_id} stopped after {processed} jobs", err=True)
+
+
+@jobs_cli.command("purge")
+@click.option("--days", type=int, default=7, show_default=True)
+def purge_command(days):
+    """Delete finished (DONE or DEAD) jobs older than --days."""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    # الـ DEAD كمان – اللي محتاج يتعاد يتعمله `flask jobs retry` قبل الـ cutoff
+    deleted = Job.query.filter(Job.status.in_((DONE, DEAD)), Job.finished_at < cutoff).delete(
+        synchronize_session=False
+    )
+    db.session.commit()
+    click.echo(f"Deleted {deleted} jobs")
+
+
+@jobs_cli.command("retry")
+@click.option("--name", default=None, help="Only jobs with this name.")
+def retry_command(name):
+    """Put dead jobs back on the queue."""
+    query = Job.query.filter(Job.status == DEAD)
+    if name:
+        query = query.filter(Job.name == name)
+    count = query.update(
+        {"status": QUEUED, "attempts": 0, "run_at": datetime.utcnow(), "finished_at": None},
+        synchronize_session=False,
+    )
+    db.session.commit()
+    click.echo(f"Requeued {count} jobs")
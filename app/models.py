@@ -1,16 +1,38 @@
 # app/models.py
 from datetime import datetime
 from . import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from .auth.passwords import hash_password, verify_password, needs_rehash
+from .tenancy import TenantScoped
+
+
+# -------- Tenant ---------
+class Tenant(db.Model):
+    """
+    كمبوند – كل الداتا (users / stores / orders ...) بتاعته عليها tenant_id.
+    """
+    __tablename__ = "tenants"
+
+    id = db.Column(db.Integer, primary_key=True)
+    code = db.Column(db.String(50), unique=True, nullable=False)  # بيتبعت في X-Compound
+    name = db.Column(db.String(120), nullable=False)
+    hosts = db.Column(db.Text, nullable=True)  # "market.example.com,api.example.com"
+    is_active = db.Column(db.Boolean, nullable=False, default=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<Tenant {self.code}>"
+
 
 # -------- User ---------
-class User(db.Model):
+class User(TenantScoped, db.Model):
     __tablename__ = "users"
 
     id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(64), unique=True, nullable=False)
+    # username / email unique جوه الكمبوند بس (الـ indexes تحت)
+    username = db.Column(db.String(64), nullable=False)
     full_name = db.Column(db.String(120), nullable=False)
-    email = db.Column(db.String(120), unique=True, nullable=False)
+    email = db.Column(db.String(120), nullable=False)
     role = db.Column(db.String(32), nullable=False, default="CUSTOMER")  # CUSTOMER / SELLER / ADMIN
     phone = db.Column(db.String(30), nullable=True)
 
@@ -19,28 +41,54 @@ class User(db.Model):
     apartment = db.Column(db.String(10), nullable=True)
 
     password_hash = db.Column(db.String(255), nullable=False)
+    # بيزيد مع logout-all / تغيير الـ role → كل التوكنات القديمة تبقى مرفوضة
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # login بيدور بـ tenant_id + lower(...) → index واحد حسب نوع الـ input
+    __table_args__ = (
+        db.Index("ix_users_tenant_lower_username", "tenant_id", db.func.lower(username), unique=True),
+        db.Index("ix_users_tenant_lower_email", "tenant_id", db.func.lower(email), unique=True),
+    )
+
     def set_password(self, password: str):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password: str) -> bool:
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+
+    def password_needs_rehash(self) -> bool:
+        return needs_rehash(self.password_hash)
 
     def __repr__(self):
         return f"<User {self.username} ({self.role})>"
 
 
+# -------- StoreCategory ---------
+class StoreCategory(db.Model):
+    __tablename__ = "store_categories"
+
+    code = db.Column(db.String(50), primary_key=True)  # FOOD / DESSERT / CLOTHES / ...
+    name = db.Column(db.String(80), nullable=False)    # الاسم اللي بيظهر في الأبليكيشن
+    sort_order = db.Column(db.Integer, nullable=False, default=0)
+    is_active = db.Column(db.Boolean, nullable=False, default=True)
+
+    def __repr__(self):
+        return f"<StoreCategory {self.code}>"
+
+
 # -------- Store ---------
-class Store(db.Model):
+class Store(TenantScoped, db.Model):
     __tablename__ = "stores"
 
     id = db.Column(db.Integer, primary_key=True)
     owner_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     name = db.Column(db.String(120), nullable=False)
     description = db.Column(db.Text, nullable=True)
-    category = db.Column(db.String(50), nullable=False)  # FOOD / DESSERT / CLOTHES / ...
+    category = db.Column(
+        db.String(50), db.ForeignKey("store_categories.code"), nullable=False
+    )  # StoreCategory.code
     is_active = db.Column(db.Boolean, default=True)
 
     min_order_amount = db.Column(db.Numeric(10, 2), nullable=True)
@@ -51,15 +99,25 @@ class Store(db.Model):
 
     profile_image_url = db.Column(db.String(255), nullable=True)
 
+    # بيزيد مع أي تعديل في المنتجات أو بيانات المتجر (app/stores/catalog.py)
+    catalog_version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     owner = db.relationship("User", backref=db.backref("stores", lazy="dynamic"))
 
+    # list_active_stores?open_now=1
+    __table_args__ = (
+        db.Index("ix_stores_active_hours", "tenant_id", "is_active", "open_from", "open_to"),
+        # list_active_stores?category=... مترتبة بـ created_at
+        db.Index("ix_stores_active_category_created", "tenant_id", "is_active", "category", "created_at"),
+    )
+
     def __repr__(self):
         return f"<Store {self.name} (owner={self.owner_id})>"
 
 
-class Product(db.Model):
+class Product(TenantScoped, db.Model):
     __tablename__ = "products"
 
     id = db.Column(db.Integer, primary_key=True)
@@ -84,8 +142,39 @@ class Product(db.Model):
         backref=db.backref("products", lazy=True, cascade="all, delete-orphan"),
     )
 
+    __table_args__ = (
+        db.Index("ix_products_tenant_store_active", "tenant_id", "store_id", "is_active"),
+    )
+
+# -------- ProductImportJob ---------
+class ProductImportJob(TenantScoped, db.Model):
+    """
+    استيراد منيو من CSV/XLSX في الخلفية – الـ seller بيتابع الحالة بالـ id.
+    """
+    __tablename__ = "product_import_jobs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    store_id = db.Column(db.Integer, db.ForeignKey("stores.id"), nullable=False, index=True)
+    filename = db.Column(db.String(255), nullable=False)
+    file_path = db.Column(db.String(500), nullable=False)
+
+    status = db.Column(db.String(20), nullable=False, default="QUEUED")  # QUEUED / RUNNING / DONE / FAILED
+    processed_rows = db.Column(db.Integer, nullable=False, default=0)
+    created_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_count = db.Column(db.Integer, nullable=False, default=0)
+    error_count = db.Column(db.Integer, nullable=False, default=0)
+    errors = db.Column(db.Text, nullable=True)  # JSON: [{"row": 3, "error": "..."}] (أول 200 بس)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<ProductImportJob {self.id} store={self.store_id} {self.status}>"
+
+
 # -------- Order ---------
-class Order(db.Model):
+class Order(TenantScoped, db.Model):
     __tablename__ = "orders"
 
     id = db.Column(db.Integer, primary_key=True)
@@ -97,6 +186,8 @@ class Order(db.Model):
     # PENDING / ACCEPTED / REJECTED / PREPARING / READY / ON_THE_WAY / DELIVERED / CANCELLED
 
     total_amount = db.Column(db.Numeric(10, 2), nullable=False, default=0)
+    # مصاريف التوصيل لوحدها – total_amount = المنتجات بس (الـ revenue في الـ rollups)
+    delivery_fee = db.Column(db.Numeric(10, 2), nullable=False, default=0, server_default="0")
     delivery_method = db.Column(db.String(20), nullable=False, default="DELIVERY")  # DELIVERY / PICKUP
 
     notes = db.Column(db.String(255), nullable=True)
@@ -107,12 +198,18 @@ class Order(db.Model):
     customer = db.relationship("User", backref=db.backref("orders", lazy="dynamic"))
     store = db.relationship("Store", backref=db.backref("orders", lazy="dynamic"))
 
+    # قوائم طلبات المتجر / العميل الأحدث الأول
+    __table_args__ = (
+        db.Index("ix_orders_tenant_store_created", "tenant_id", "store_id", "created_at"),
+        db.Index("ix_orders_tenant_customer_created", "tenant_id", "customer_id", "created_at"),
+    )
+
     def __repr__(self):
         return f"<Order {self.id} store={self.store_id} customer={self.customer_id}>"
 
 
 # -------- OrderItem ---------
-class OrderItem(db.Model):
+class OrderItem(TenantScoped, db.Model):
     __tablename__ = "order_items"
 
     id = db.Column(db.Integer, primary_key=True)
@@ -127,10 +224,256 @@ class OrderItem(db.Model):
     order = db.relationship("Order", backref=db.backref("items", lazy="dynamic"))
     product = db.relationship("Product")
 
+    __table_args__ = (
+        db.Index("ix_order_items_tenant_order", "tenant_id", "order_id"),
+    )
+
     def __repr__(self):
         return f"<OrderItem order={self.order_id} product={self.product_id} qty={self.quantity}>"
 
-class StoreReview(db.Model):
+# -------- Archived orders ---------
+class ArchivedOrder(TenantScoped, db.Model):
+    """
+    طلبات منتهية (DELIVERED / REJECTED / CANCELLED) أقدم من ORDER_ARCHIVE_MONTHS –
+    `flask orders archive` بينقلها من orders، فالـ queries العادية مش بتلمسها.
+    في Postgres الجدول partitioned بالشهر (RANGE على created_at)، علشان كده created_at جزء من الـ PK.
+    """
+    __tablename__ = "orders_archive"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # نفس id بتاع orders
+    created_at = db.Column(db.DateTime, primary_key=True)
+
+    customer_id = db.Column(db.Integer, nullable=False)
+    store_id = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    total_amount = db.Column(db.Numeric(10, 2), nullable=False, default=0)
+    delivery_fee = db.Column(db.Numeric(10, 2), nullable=False, default=0, server_default="0")
+    delivery_method = db.Column(db.String(20), nullable=False)
+    notes = db.Column(db.String(255), nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=True)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    # نفس أسماء الـ attributes بتاعة Order علشان serialize_order يشتغل عليها
+    customer = db.relationship(
+        "User", primaryjoin="foreign(ArchivedOrder.customer_id) == User.id", viewonly=True
+    )
+    store = db.relationship(
+        "Store", primaryjoin="foreign(ArchivedOrder.store_id) == Store.id", viewonly=True
+    )
+    items = db.relationship(
+        "ArchivedOrderItem",
+        primaryjoin="and_(foreign(ArchivedOrderItem.order_id) == ArchivedOrder.id, "
+                    "foreign(ArchivedOrderItem.order_created_at) == ArchivedOrder.created_at)",
+        order_by="ArchivedOrderItem.id",
+        viewonly=True,
+    )
+
+    __table_args__ = (
+        db.Index("ix_orders_archive_tenant_store_created", "tenant_id", "store_id", "created_at"),
+        db.Index("ix_orders_archive_tenant_customer_created", "tenant_id", "customer_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    def __repr__(self):
+        return f"<ArchivedOrder {self.id} store={self.store_id}>"
+
+
+class ArchivedOrderItem(TenantScoped, db.Model):
+    __tablename__ = "order_items_archive"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    # created_at بتاع الطلب – مفتاح الـ partition، وبيخلي الـ join بين الجدولين على نفس الشهر
+    order_created_at = db.Column(db.DateTime, primary_key=True)
+
+    order_id = db.Column(db.Integer, nullable=False)
+    product_id = db.Column(db.Integer, nullable=False)
+    product_name = db.Column(db.String(120), nullable=False)
+    unit_price = db.Column(db.Numeric(10, 2), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False, default=1)
+    subtotal = db.Column(db.Numeric(10, 2), nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_order_items_archive_tenant_order", "tenant_id", "order_id"),
+        {"postgresql_partition_by": "RANGE (order_created_at)"},
+    )
+
+    def __repr__(self):
+        return f"<ArchivedOrderItem order={self.order_id} product={self.product_id}>"
+
+
+# -------- OrderEvent ---------
+class OrderEvent(TenantScoped, db.Model):
+    """
+    Append-only log لكل تغيير في الطلبات، بيتكتب في نفس الـ transaction.
+    id هو الـ sequence: الـ consumers بيقروا WHERE id > :after ORDER BY id.
+    order_id من غير FK: الـ events بتفضل بعد ما الطلب يتنقل للأرشيف.
+    """
+    __tablename__ = "order_events"
+
+    # BIGINT في Postgres – SQLite محتاج INTEGER علشان يبقى autoincrement
+    id = db.Column(db.BigInteger().with_variant(db.Integer, "sqlite"), primary_key=True)
+    order_id = db.Column(db.Integer, nullable=False)
+    store_id = db.Column(db.Integer, nullable=False)
+    customer_id = db.Column(db.Integer, nullable=False)
+
+    event_type = db.Column(db.String(20), nullable=False)  # CREATED / STATUS_CHANGED
+    status = db.Column(db.String(20), nullable=False)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    # feeds لكل store / customer وتاريخ كل order: range scan على (x, id)
+    # في Postgres الـ INCLUDE بيخليه index-only scan
+    __table_args__ = (
+        db.Index(
+            "ix_order_events_store_id_id", "store_id", "id",
+            postgresql_include=["tenant_id", "order_id", "event_type", "status", "created_at"],
+        ),
+        db.Index(
+            "ix_order_events_customer_id_id", "customer_id", "id",
+            postgresql_include=["tenant_id", "order_id", "event_type", "status", "created_at"],
+        ),
+        db.Index("ix_order_events_order_id_id", "order_id", "id"),
+        # الـ dispatcher: cursor لكل tenant
+        db.Index("ix_order_events_tenant_id_id", "tenant_id", "id"),
+    )
+
+    def __repr__(self):
+        return f"<OrderEvent {self.id} order={self.order_id} {self.status}>"
+
+
+# -------- Analytics rollups ---------
+class StoreDailyStats(db.Model):
+    """
+    Rollup يومي لكل متجر – بيتحدث incremental مع إنشاء الطلب وتغيير حالته.
+    day = يوم إنشاء الطلب.
+    """
+    __tablename__ = "store_daily_stats"
+
+    store_id = db.Column(db.Integer, db.ForeignKey("stores.id"), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+
+    orders_count = db.Column(db.Integer, nullable=False, default=0)
+    delivered_count = db.Column(db.Integer, nullable=False, default=0)
+    cancelled_count = db.Column(db.Integer, nullable=False, default=0)  # CANCELLED + REJECTED
+    revenue = db.Column(db.Numeric(12, 2), nullable=False, default=0)  # الطلبات الـ DELIVERED بس
+
+
+class ProductDailyStats(db.Model):
+    __tablename__ = "product_daily_stats"
+
+    store_id = db.Column(db.Integer, db.ForeignKey("stores.id"), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    product_id = db.Column(db.Integer, primary_key=True)
+
+    product_name = db.Column(db.String(150), nullable=False)  # آخر اسم اتباع بيه
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+
+
+# -------- Job ---------
+class Job(db.Model):
+    """
+    Background job queue: الـ request بيضيف Job في نفس الـ transaction
+    (يعني الـ job بيبان للـ worker بعد الـ commit بس)، و `flask jobs worker` بينفذه.
+    """
+    __tablename__ = "jobs"
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, "sqlite"), primary_key=True)
+    queue = db.Column(db.String(50), nullable=False, default="default")
+    name = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.Text, nullable=True)  # JSON
+
+    status = db.Column(db.String(20), nullable=False, default="QUEUED")  # QUEUED / RUNNING / DONE / DEAD
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    locked_at = db.Column(db.DateTime, nullable=True)
+    locked_by = db.Column(db.String(100), nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    # الـ worker بيدور على: queue = ? AND status = 'QUEUED' AND run_at <= now ORDER BY run_at
+    # schedule_dispatch (مع كل طلب) بيدور على: name = ? AND status = 'QUEUED' – partial index
+    # على الـ QUEUED بس، فحجمه مش بيكبر مع الـ DONE اللي لسه متمسحتش
+    __table_args__ = (
+        db.Index("ix_jobs_claim", "queue", "status", "run_at"),
+        db.Index(
+            "ix_jobs_queued_name",
+            "name",
+            postgresql_where=db.text("status = 'QUEUED'"),
+            sqlite_where=db.text("status = 'QUEUED'"),
+        ),
+    )
+
+    def __repr__(self):
+        return f"<Job {self.id} {self.name} {self.status}>"
+
+
+# -------- Notifications ---------
+class NotificationEndpoint(TenantScoped, db.Model):
+    """
+    مكان استلام إشعارات الطلبات لمستخدم: webhook (URL + secret للتوقيع)
+    أو Web Push subscription (endpoint URL + keys).
+    """
+    __tablename__ = "notification_endpoints"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
+
+    transport = db.Column(db.String(20), nullable=False)  # webhook / webpush
+    target = db.Column(db.String(1000), nullable=False)
+    secret = db.Column(db.String(255), nullable=True)
+    keys = db.Column(db.Text, nullable=True)  # JSON: {"p256dh": ..., "auth": ...}
+
+    is_active = db.Column(db.Boolean, default=True, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<NotificationEndpoint {self.id} {self.transport} user={self.user_id}>"
+
+
+class NotificationCursor(db.Model):
+    """
+    آخر order_events.id اتعمله dispatch – الـ dispatcher بيكمل من بعده.
+    واحد لكل tenant ("order_events:<tenant_id>") – ترتيب الـ commit مضمون جوه الـ tenant بس.
+    """
+    __tablename__ = "notification_cursors"
+
+    name = db.Column(db.String(50), primary_key=True)
+    last_event_id = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+
+# -------- IdempotencyKey ---------
+class IdempotencyKey(db.Model):
+    """
+    Idempotency-Key لـ POST /api/orders: الـ retry بيرجع نفس الـ response المتخزن.
+    الـ unique constraint هو اللي بيفصل بين اتنين duplicates جايين في نفس اللحظة.
+    """
+    __tablename__ = "idempotency_keys"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    key = db.Column(db.String(64), nullable=False)
+    request_hash = db.Column(db.String(64), nullable=False)  # sha256 للـ body
+
+    response_status = db.Column(db.Integer, nullable=False)
+    response_body = db.Column(db.Text, nullable=False)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_key"),
+    )
+
+    def __repr__(self):
+        return f"<IdempotencyKey user={self.user_id} key={self.key}>"
+
+
+class StoreReview(TenantScoped, db.Model):
     __tablename__ = "store_reviews"
 
     id = db.Column(db.Integer, primary_key=True)
@@ -149,5 +492,9 @@ class StoreReview(db.Model):
         "User", backref=db.backref("store_reviews", lazy="dynamic")
     )
 
+    __table_args__ = (
+        db.Index("ix_store_reviews_tenant_store_created", "tenant_id", "store_id", "created_at"),
+    )
+
     def __repr__(self):
         return f"<StoreReview store={self.store_id} customer={self.customer_id} rating={self.rating}>"
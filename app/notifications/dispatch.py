@@ -0,0 +1,232 @@
+# app/notifications/dispatch.py
+"""
+Fanout لإشعارات الطلبات – مفيش أي network call جوه الـ request:
+
+1) record_order_events بينادي schedule_dispatch(): job "notifications.dispatch" واحد
+   بـ delay = NOTIFICATIONS_BATCH_WINDOW (لو فيه واحد QUEUED خلاص مش بنضيف تاني)
+2) الـ dispatch بيقرا order_events من بعد الـ cursor، ويجمعهم لكل مستلم:
+   - CREATED → صاحب المتجر
+   - STATUS_CHANGED → العميل
+   لو نفس الطلب ليه أكتر من event في الدفعة بنبعت آخر واحد بس
+3) لكل endpoint شغال عند المستلم: job "notifications.deliver" فيه لحد NOTIFICATIONS_BATCH_SIZE event
+   – الـ retries والـ dead letter (status=DEAD) من الـ job queue نفسها
+
+فيه cursor لكل tenant بيتحرك بـ compare-and-set في نفس الـ transaction اللي بيضيف الـ deliver
+jobs، فلو اتنين dispatch اشتغلوا مع بعض واحد بس اللي بيكمل. والقراية من tail_events
+(app/orders/events.py) اللي بيضمن إن الـ ids بتبان بترتيب الـ commit جوه الـ tenant – يعني
+الـ cursor مبيعدّيش event transaction بتاعته لسه مفتوحة.
+"""
+import json
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import update
+
+from app import db
+from app.jobs.queue import QUEUED, enqueue, job
+from app.models import Job, NotificationCursor, NotificationEndpoint, Store, Tenant
+from app.notifications.transports import ConnectionPool, EndpointGone, WebhookTransport, get_transport
+from app.orders.events import EVENT_CREATED, serialize_event, tail_events
+from app.tenancy import use_tenant
+
+DISPATCH_JOB = "notifications.dispatch"
+DELIVER_JOB = "notifications.deliver"
+CURSOR_NAME = "order_events"
+
+notifications_cli = AppGroup("notifications", help="Order notification fanout.")
+
+
+def schedule_dispatch():
+    """
+    بيتنادى من نفس الـ transaction اللي كتب الـ events.
+    """
+    if not current_app.config.get("NOTIFICATIONS_ENABLED", True):
+        return
+    pending = (
+        db.session.query(Job.id)
+        .filter(Job.name == DISPATCH_JOB, Job.status == QUEUED)
+        .first()
+    )
+    if pending is None:
+        enqueue(DISPATCH_JOB, delay=current_app.config.get("NOTIFICATIONS_BATCH_WINDOW", 2))
+
+
+def _cursor_name(tenant_id: int) -> str:
+    return f"{CURSOR_NAME}:{tenant_id}"
+
+
+def _cursor_position(tenant_id: int) -> int:
+    cursor = db.session.get(NotificationCursor, _cursor_name(tenant_id))
+    if cursor is None:
+        # أول مرة للـ tenant: نكمل من الـ cursor القديم المشترك لو موجود، وإلا من أول event
+        legacy = db.session.get(NotificationCursor, CURSOR_NAME)
+        cursor = NotificationCursor(
+            name=_cursor_name(tenant_id), last_event_id=legacy.last_event_id if legacy else 0
+        )
+        db.session.add(cursor)
+        db.session.flush()
+    return cursor.last_event_id
+
+
+def group_by_recipient(events, owners):
+    """
+    events مرتبين بالـ id → {user_id: [event, ...]} بآخر event لكل طلب.
+    """
+    latest = defaultdict(dict)
+    for event in events:
+        if event.event_type == EVENT_CREATED:
+            recipient = owners.get(event.store_id)
+        else:
+            recipient = event.customer_id
+        if recipient is not None:
+            latest[recipient][event.order_id] = event
+    return {
+        user_id: sorted(by_order.values(), key=lambda e: e.id)
+        for user_id, by_order in latest.items()
+    }
+
+
+def _dispatch_tenant(tenant_id: int, limit: int) -> int:
+    """
+    بيعمل dispatch لحد limit event للـ tenant ويعمل commit. بيرجع عدد الـ events (0 لو مفيش
+    أو لو dispatch تاني سبقنا).
+    """
+    with use_tenant(tenant_id):
+        start = _cursor_position(tenant_id)
+        # tail_events: الـ ids بتبان بترتيب الـ commit جوه الـ tenant، فالـ cursor مش هيعدّي
+        # event لسه متعملوش commit
+        events = tail_events(start, limit)
+        if not events:
+            db.session.commit()
+            return 0
+
+        store_ids = {e.store_id for e in events if e.event_type == EVENT_CREATED}
+        owners = {}
+        if store_ids:
+            owners = dict(db.session.query(Store.id, Store.owner_id).filter(Store.id.in_(store_ids)))
+
+        grouped = group_by_recipient(events, owners)
+        endpoints = NotificationEndpoint.query.filter(
+            NotificationEndpoint.user_id.in_(grouped.keys()),
+            NotificationEndpoint.is_active.is_(True),
+        ).all()
+
+        batch_size = current_app.config.get("NOTIFICATIONS_BATCH_SIZE", 50)
+        for endpoint in endpoints:
+            payload = [serialize_event(e) for e in grouped[endpoint.user_id]]
+            for i in range(0, len(payload), batch_size):
+                enqueue(DELIVER_JOB, {"endpoint_id": endpoint.id, "events": payload[i:i + batch_size]})
+
+        moved = db.session.execute(
+            update(NotificationCursor)
+            .where(NotificationCursor.name == _cursor_name(tenant_id), NotificationCursor.last_event_id == start)
+            .values(last_event_id=events[-1].id, updated_at=db.func.now())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if moved != 1:
+            # dispatch تاني سبقنا على نفس الـ events
+            db.session.rollback()
+            return 0
+        db.session.commit()
+        return len(events)
+
+
+@job(DISPATCH_JOB)
+def dispatch_events():
+    limit = current_app.config.get("NOTIFICATIONS_SCAN_LIMIT", 1000)
+    tenant_ids = [tenant_id for (tenant_id,) in db.session.query(Tenant.id).order_by(Tenant.id)]
+    counts = [_dispatch_tenant(tenant_id, limit) for tenant_id in tenant_ids]
+    if not any(counts):
+        return
+
+    # sweep تاني بعد الـ window: events اتكتبت واحنا شغالين، أو لسه فيه أكتر من limit
+    enqueue(DISPATCH_JOB, delay=0 if max(counts) >= limit else current_app.config.get("NOTIFICATIONS_BATCH_WINDOW", 2))
+
+
+@job(DELIVER_JOB)
+def deliver(endpoint_id: int, events: list):
+    endpoint = db.session.get(NotificationEndpoint, endpoint_id)
+    if endpoint is None or not endpoint.is_active:
+        return
+
+    message = {"type": "order_events", "user_id": endpoint.user_id, "events": events}
+    try:
+        get_transport(endpoint.transport).send(endpoint, message)
+    except EndpointGone:
+        endpoint.is_active = False
+
+
+def serialize_endpoint(endpoint: NotificationEndpoint):
+    return {
+        "id": endpoint.id,
+        "transport": endpoint.transport,
+        "target": endpoint.target,
+        "is_active": endpoint.is_active,
+        "created_at": endpoint.created_at.isoformat() if endpoint.created_at else None,
+    }
+
+
+@notifications_cli.command("bench")
+@click.option("--messages", type=int, default=2000, show_default=True)
+@click.option("--batch-size", type=int, default=20, show_default=True, help="Events per message.")
+@click.option("--concurrency", type=int, default=4, show_default=True)
+def bench_command(messages, batch_size, concurrency):
+    """Webhook throughput against a local stub HTTP server."""
+    connections = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            connections.append(1)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self.send_response(204)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    class Endpoint:
+        id = 0
+        secret = "bench"
+        target = f"http://127.0.0.1:{server.server_port}/hook"
+
+    event = {"seq": 1, "order_id": 1, "store_id": 1, "event_type": EVENT_CREATED,
+             "status": "PENDING", "created_at": "2026-01-01T00:00:00"}
+    message = {"type": "order_events", "user_id": 1, "events": [event] * batch_size}
+
+    pool = ConnectionPool(max_idle=concurrency, allow_private=True)
+    transport = WebhookTransport(pool)
+    per_thread = messages // concurrency
+
+    def worker():
+        for _ in range(per_thread):
+            transport.send(Endpoint, message)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    sent = per_thread * concurrency
+    pool.close()
+    server.shutdown()
+    click.echo(
+        f"{sent} messages ({sent * batch_size} events) in {elapsed:.2f}s: "
+        f"{sent / elapsed:.0f} msg/s, {len(connections)} TCP connections"
+    )
@@ -0,0 +1,98 @@
+import json
+
+from flask import Blueprint, jsonify, request
+
+from app import db
+from app.auth.routes import get_current_user_from_request
+from app.models import NotificationEndpoint
+from app.notifications.dispatch import serialize_endpoint
+from app.notifications.transports import target_error
+
+notifications_bp = Blueprint("notifications", __name__)
+
+TRANSPORTS = ("webhook", "webpush")
+MAX_ENDPOINTS_PER_USER = 10
+
+
+# ---------- List my notification endpoints ----------
+@notifications_bp.route("/endpoints", methods=["GET"])
+def list_endpoints():
+    current_user, error = get_current_user_from_request(allowed_roles=["SELLER", "CUSTOMER"])
+    if error:
+        msg, status = error
+        return jsonify({"message": msg}), status
+
+    endpoints = (
+        NotificationEndpoint.query
+        .filter_by(user_id=current_user.id)
+        .order_by(NotificationEndpoint.created_at.desc())
+        .all()
+    )
+    return jsonify([serialize_endpoint(e) for e in endpoints]), 200
+
+
+# ---------- Register an endpoint ----------
+@notifications_bp.route("/endpoints", methods=["POST"])
+def add_endpoint():
+    """
+    body:
+    { "transport": "webhook", "url": "https://...", "secret": "..." }
+    { "transport": "webpush", "url": "<subscription endpoint>", "keys": {"p256dh": "...", "auth": "..."} }
+    """
+    current_user, error = get_current_user_from_request(allowed_roles=["SELLER", "CUSTOMER"])
+    if error:
+        msg, status = error
+        return jsonify({"message": msg}), status
+
+    data = request.get_json() or {}
+    transport = data.get("transport")
+    url = (data.get("url") or "").strip()
+
+    if transport not in TRANSPORTS:
+        return jsonify({"message": "نوع الإشعار غير مدعوم"}), 400
+
+    # https بس، والـ host لازم يكون public (ولخدمة push معروفة للـ webpush) – SSRF
+    url_error = target_error(transport, url)
+    if url_error:
+        return jsonify({"message": url_error}), 400
+
+    keys = None
+    if transport == "webpush":
+        keys = data.get("keys") or {}
+        if not isinstance(keys, dict) or not keys.get("p256dh") or not keys.get("auth"):
+            return jsonify({"message": "بيانات الاشتراك غير مكتملة"}), 400
+        keys = json.dumps({"p256dh": keys["p256dh"], "auth": keys["auth"]})
+
+    count = NotificationEndpoint.query.filter_by(user_id=current_user.id, is_active=True).count()
+    if count >= MAX_ENDPOINTS_PER_USER:
+        return jsonify({"message": f"الحد الأقصى {MAX_ENDPOINTS_PER_USER} وسائل إشعار"}), 400
+
+    endpoint = NotificationEndpoint(
+        user_id=current_user.id,
+        transport=transport,
+        target=url,
+        secret=(data.get("secret") or None) if transport == "webhook" else None,
+        keys=keys,
+    )
+    db.session.add(endpoint)
+    db.session.commit()
+
+    return jsonify(serialize_endpoint(endpoint)), 201
+
+
+# ---------- Remove an endpoint ----------
+@notifications_bp.route("/endpoints/<int:endpoint_id>", methods=["DELETE"])
+def delete_endpoint(endpoint_id):
+    current_user, error = get_current_user_from_request(allowed_roles=["SELLER", "CUSTOMER"])
+    if error:
+        msg, status = error
+        return jsonify({"message": msg}), status
+
+    endpoint = NotificationEndpoint.query.filter_by(id=endpoint_id, user_id=current_user.id).first()
+    if not endpoint:
+        return jsonify({"message": "وسيلة الإشعار غير موجودة"}), 404
+
+    db.session.delete(endpoint)
+    db.session.commit()
+
+    return jsonify({"message": "تم حذف وسيلة الإشعار"}), 200
@@ -0,0 +1,290 @@
+# app/notifications/transports.py
+"""
+Transports للإشعارات. كل transport عنده send(endpoint, message):
+- بيرجع عادي لو اتبعت
+- TransportError → الـ job بيتعاد بـ backoff (ولما المحاولات تخلص يبقى DEAD = dead letter)
+- EndpointGone → الـ endpoint مبقاش موجود (404/410) فبيتقفل ومفيش retry
+
+الـ webhooks بتستخدم connections محفوظة (keep-alive) لكل host بدل connection جديدة لكل إشعار.
+
+SSRF: الـ webhook لازم https، والـ host لازم يـresolve لعناوين public بس (مش loopback /
+link-local / private / reserved). ده بيتشيك وقت التسجيل (target_error) وتاني مع كل connection
+جديدة – الـ connection بتتفتح على نفس الـ IP اللي اتشيك، فالـ DNS rebinding مش بيعدي.
+الـ webpush مسموح بس لـ hosts خدمات الـ push المعروفة (WEBPUSH_ALLOWED_HOSTS).
+"""
+import hashlib
+import hmac
+import http.client
+import ipaddress
+import json
+import socket
+import threading
+from collections import deque
+from urllib.parse import urlsplit
+
+from flask import current_app
+
+
+class TransportError(Exception):
+    pass
+
+
+class EndpointGone(Exception):
+    pass
+
+
+class UnsafeTarget(EndpointGone):
+    """
+    الـ URL بقى بيشاور على عنوان مش مسموح (أو مش https) – الـ endpoint بيتقفل.
+    """
+
+
+def _is_public(ip: str) -> bool:
+    addr = ipaddress.ip_address(ip.split("%", 1)[0])
+    if addr.version == 6 and addr.ipv4_mapped is not None:
+        addr = addr.ipv4_mapped
+    return addr.is_global and not addr.is_multicast
+
+
+def resolve_public(host: str, port: int):
+    """
+    getaddrinfo للـ host – UnsafeTarget لو أي عنوان منهم مش public، TransportError لو مش بيـresolve.
+    """
+    try:
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except (socket.gaierror, UnicodeError) as exc:
+        raise TransportError(f"Could not resolve {host}: {exc}")
+    if not infos:
+        raise TransportError(f"Could not resolve {host}")
+    for *_, sockaddr in infos:
+        if not _is_public(sockaddr[0]):
+            raise UnsafeTarget(f"{host} resolves to non-public address {sockaddr[0]}")
+    return infos
+
+
+def _public_connection(address, timeout=socket._GLOBAL_DEFAULT_TIMEOUT, source_address=None, *args, **kwargs):
+    """
+    بديل socket.create_connection لـ http.client: بيـresolve ويشيك ويتصل بنفس الـ IP.
+    """
+    host, port = address[0], address[1]
+    error = None
+    for *_, sockaddr in resolve_public(host, port):
+        try:
+            return socket.create_connection((sockaddr[0], port), timeout, source_address)
+        except OSError as exc:
+            error = exc
+    raise error
+
+
+def is_push_service(host: str) -> bool:
+    host = (host or "").lower().rstrip(".")
+    for allowed in current_app.config.get("WEBPUSH_ALLOWED_HOSTS", ()):
+        allowed = allowed.lower()
+        if host == allowed.lstrip(".") or (allowed.startswith(".") and host.endswith(allowed)):
+            return True
+    return False
+
+
+def target_error(transport: str, url: str):
+    """
+    بيرجع رسالة الغلط (للـ API) أو None لو الـ URL ينفع.
+    """
+    if len(url) > 1000:
+        return "الرابط غير صالح"
+    try:
+        parts = urlsplit(url)
+        port = parts.port or 443
+    except ValueError:
+        return "الرابط غير صالح"
+    if parts.scheme != "https" or not parts.hostname:
+        return "الرابط لازم يكون https"
+    if transport == "webpush" and not is_push_service(parts.hostname):
+        return "خدمة الإشعارات (push) غير مدعومة"
+    try:
+        resolve_public(parts.hostname, port)
+    except UnsafeTarget:
+        return "الرابط يشير لعنوان غير مسموح"
+    except TransportError:
+        return "تعذر الوصول للرابط"
+    return None
+
+
+def _encode(message) -> bytes:
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class ConnectionPool:
+    """
+    Idle connections لكل (scheme, host, port). http.client.HTTPConnection مش thread-safe،
+    فكل thread بياخد connection لوحده ويرجعها بعد ما يخلص.
+    """
+
+    def __init__(self, max_idle: int = 8, timeout: float = 5.0, allow_private: bool = False):
+        self.max_idle = max_idle
+        self.timeout = timeout
+        # True بس للـ bench (stub server على 127.0.0.1)
+        self.allow_private = allow_private
+        self._idle = {}
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    def _new(self, scheme, host, port):
+        self.opened += 1
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        conn = cls(host, port, timeout=self.timeout)
+        if not self.allow_private:
+            conn._create_connection = _public_connection
+        return conn
+
+    def acquire(self, scheme, host, port):
+        key = (scheme, host, port)
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop()
+        return self._new(scheme, host, port)
+
+    def release(self, scheme, host, port, conn):
+        key = (scheme, host, port)
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            for idle in self._idle.values():
+                for conn in idle:
+                    conn.close()
+            self._idle.clear()
+
+    def post(self, url: str, body: bytes, headers: dict):
+        """
+        بيرجع (status, body). لو الـ connection المحفوظة اتقفلت من الناحية التانية بنجرب مرة بـ connection جديدة.
+        """
+        parts = urlsplit(url)
+        scheme = parts.scheme
+        port = parts.port or (443 if scheme == "https" else 80)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+
+        for attempt in range(2):
+            conn = self.acquire(scheme, parts.hostname, port)
+            try:
+                conn.request("POST", path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                conn.close()
+                if attempt == 0:
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+            if response.will_close:
+                conn.close()
+            else:
+                self.release(scheme, parts.hostname, port, conn)
+            return response.status, data
+
+
+class WebhookTransport:
+    """
+    POST JSON للـ URL. لو للـ endpoint secret: X-Signature = sha256=HMAC(secret, body).
+    """
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+
+    def send(self, endpoint, message):
+        if not endpoint.target.startswith("https://") and not self.pool.allow_private:
+            raise UnsafeTarget("Webhook target must use https")
+        body = _encode(message)
+        headers = {"Content-Type": "application/json", "User-Agent": "airnav-market-notifier"}
+        if endpoint.secret:
+            digest = hmac.new(endpoint.secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+            headers["X-Signature"] = f"sha256={digest}"
+
+        try:
+            status, _ = self.pool.post(endpoint.target, body, headers)
+        except (OSError, http.client.HTTPException) as exc:
+            raise TransportError(f"Webhook request failed: {exc}")
+
+        if 200 <= status < 300:
+            return
+        if status in (404, 410):
+            raise EndpointGone(f"Webhook returned {status}")
+        raise TransportError(f"Webhook returned {status}")
+
+
+class WebPushTransport:
+    """
+    Web Push بـ pywebpush (اختياري) و VAPID_PRIVATE_KEY.
+    """
+
+    def send(self, endpoint, message):
+        try:
+            from pywebpush import WebPushException, webpush
+        except ImportError:
+            raise TransportError("Web Push requires pywebpush (pip install pywebpush)")
+
+        private_key = current_app.config.get("VAPID_PRIVATE_KEY")
+        if not private_key:
+            raise TransportError("VAPID_PRIVATE_KEY is not configured")
+
+        parts = urlsplit(endpoint.target)
+        if parts.scheme != "https" or not is_push_service(parts.hostname):
+            raise UnsafeTarget("Push endpoint is not a known push service")
+        resolve_public(parts.hostname, parts.port or 443)
+
+        subscription = {"endpoint": endpoint.target, "keys": json.loads(endpoint.keys or "{}")}
+        try:
+            webpush(
+                subscription_info=subscription,
+                data=_encode(message),
+                vapid_private_key=private_key,
+                vapid_claims={"sub": current_app.config.get("VAPID_SUBJECT")},
+                timeout=current_app.config.get("WEBHOOK_TIMEOUT", 5),
+            )
+        except WebPushException as exc:
+            status = getattr(exc.response, "status_code", None)
+            if status in (404, 410):
+                raise EndpointGone(f"Push subscription returned {status}")
+            raise TransportError(f"Web Push failed: {exc}")
+
+
+class StubTransport:
+    """
+    بيحتفظ بآخر الرسايل في الذاكرة بدل ما يبعت – للتطوير والتجارب.
+    """
+
+    def __init__(self, maxlen: int = 1000):
+        self.sent = deque(maxlen=maxlen)
+
+    def send(self, endpoint, message):
+        self.sent.append((endpoint.id, message))
+
+
+_lock = threading.Lock()
+_transports = None
+
+
+def get_transport(name: str):
+    global _transports
+    with _lock:
+        if _transports is None:
+            pool = ConnectionPool(
+                max_idle=current_app.config.get("WEBHOOK_POOL_SIZE", 8),
+                timeout=current_app.config.get("WEBHOOK_TIMEOUT", 5),
+            )
+            _transports = {
+                "webhook": WebhookTransport(pool),
+                "webpush": WebPushTransport(),
+                "stub": StubTransport(),
+            }
+    override = current_app.config.get("NOTIFICATIONS_TRANSPORT_OVERRIDE")
+    return _transports[override or name]
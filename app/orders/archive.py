@@ -0,0 +1,189 @@
+# app/orders/archive.py
+"""
+أرشفة الطلبات القديمة:
+- flask orders archive   → الطلبات المنتهية (DELIVERED / REJECTED / CANCELLED) اللي عدى عليها
+  ORDER_ARCHIVE_MONTHS بتتنقل بالـ items بتاعتها لـ orders_archive / order_items_archive
+  على دفعات (كل دفعة transaction لوحدها)، فـ orders بيفضل فيه الطلبات الحديثة بس
+- flask orders partitions → Postgres: بيعمل الـ monthly partitions مقدماً
+
+الـ archive في Postgres partitioned بالشهر (الـ migration بتعمل الـ parent + default partition)،
+وكل partition شهر كامل فحذف شهور قديمة بعدين يبقى DROP TABLE.
+"""
+from datetime import date, datetime
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import delete, insert, select, text
+
+from app import db
+from app.models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+
+orders_cli = AppGroup("orders", help="Orders maintenance.")
+
+TERMINAL_STATUSES = ("DELIVERED", "REJECTED", "CANCELLED")
+DEFAULT_BATCH_SIZE = 1000
+
+PARTITIONED_TABLES = (ArchivedOrder.__tablename__, ArchivedOrderItem.__tablename__)
+
+# الشهور اللي اتأكدنا إن ليها partitions في الـ process ده
+_known_months = set()
+
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def archive_cutoff(months: int, now: datetime = None) -> datetime:
+    """
+    أول يوم في الشهر من months شهور – الأرشفة بتنقل شهور كاملة.
+    """
+    start = add_months(month_start(now or datetime.utcnow()), -months)
+    return datetime(start.year, start.month, 1)
+
+
+def _is_postgres() -> bool:
+    return db.session.get_bind().dialect.name == "postgresql"
+
+
+def ensure_partitions(first: date, last: date):
+    """
+    Partition لكل شهر من first لحد last (الاتنين inclusive). في غير Postgres مفيش حاجة.
+    الـ commit على اللي نادى.
+    """
+    if not _is_postgres():
+        return 0
+    created = 0
+    month = month_start(first)
+    while month <= last:
+        following = add_months(month, 1)
+        for table in PARTITIONED_TABLES:
+            db.session.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {table}_{month:%Y_%m} PARTITION OF {table} "
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{following.isoformat()}')"
+                )
+            )
+        _known_months.add(month)
+        created += 1
+        month = following
+    return created
+
+
+def _order_columns():
+    return [
+        Order.id, Order.created_at, Order.tenant_id, Order.customer_id, Order.store_id,
+        Order.status, Order.total_amount, Order.delivery_fee, Order.delivery_method, Order.notes,
+        Order.updated_at,
+    ]
+
+
+def archive_batch(cutoff: datetime, batch_size: int = DEFAULT_BATCH_SIZE):
+    """
+    بينقل لحد batch_size طلب ويعمل commit. بيرجع عدد الطلبات اللي اتنقلت.
+    """
+    candidates = (
+        select(Order.id, Order.created_at)
+        .where(Order.status.in_(TERMINAL_STATUSES), Order.created_at < cutoff)
+        .order_by(Order.id)
+        .limit(batch_size)
+    )
+    if _is_postgres():
+        # أكتر من archive شغال مع بعض ما يمسكوش نفس الطلبات
+        candidates = candidates.with_for_update(skip_locked=True)
+    rows = db.session.execute(candidates).all()
+    if not rows:
+        return 0
+
+    ids = [order_id for order_id, _ in rows]
+    missing = {month_start(created_at) for _, created_at in rows} - _known_months
+    if missing:
+        ensure_partitions(min(missing), max(missing))
+
+    now = datetime.utcnow()
+    db.session.execute(
+        insert(ArchivedOrder).from_select(
+            ["id", "created_at", "tenant_id", "customer_id", "store_id", "status",
+             "total_amount", "delivery_fee", "delivery_method", "notes", "updated_at", "archived_at"],
+            select(*_order_columns(), db.literal(now)).where(Order.id.in_(ids)),
+        )
+    )
+    db.session.execute(
+        insert(ArchivedOrderItem).from_select(
+            ["id", "order_created_at", "tenant_id", "order_id", "product_id", "product_name",
+             "unit_price", "quantity", "subtotal"],
+            select(
+                OrderItem.id, Order.created_at, OrderItem.tenant_id, OrderItem.order_id,
+                OrderItem.product_id, OrderItem.product_name, OrderItem.unit_price,
+                OrderItem.quantity, OrderItem.subtotal,
+            )
+            .join(Order, Order.id == OrderItem.order_id)
+            .where(OrderItem.order_id.in_(ids)),
+        )
+    )
+    db.session.execute(
+        delete(OrderItem).where(OrderItem.order_id.in_(ids)).execution_options(synchronize_session=False)
+    )
+    db.session.execute(
+        delete(Order).where(Order.id.in_(ids)).execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return len(ids)
+
+
+def archive_orders(months: int, batch_size: int = DEFAULT_BATCH_SIZE):
+    """
+    بيكمل لحد ما batch يرجع 0 – مع SKIP LOCKED الـ batch ممكن يرجع أقل من batch_size لأن
+    archiver تاني ماسك الباقي، مش لأن الشغل خلص. الـ 0 معناه إن مفيش حاجة متاحة لينا خالص
+    (واللي متمسك عند archiver تاني هو اللي هينقله).
+    """
+    cutoff = archive_cutoff(months)
+    total = 0
+    while True:
+        moved = archive_batch(cutoff, batch_size)
+        total += moved
+        if moved == 0:
+            return total
+
+
+@orders_cli.command("archive")
+@click.option("--months", type=int, default=None, help="Defaults to ORDER_ARCHIVE_MONTHS.")
+@click.option("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, show_default=True)
+@click.option("--dry-run", is_flag=True, help="Only count the orders that would move.")
+def archive_command(months, batch_size, dry_run):
+    """Move old finished orders to the archive tables."""
+    months = months if months is not None else current_app.config.get("ORDER_ARCHIVE_MONTHS", 6)
+    cutoff = archive_cutoff(months)
+
+    if dry_run:
+        count = Order.query.filter(
+            Order.status.in_(TERMINAL_STATUSES), Order.created_at < cutoff
+        ).count()
+        click.echo(f"{count} orders created before {cutoff:%Y-%m-%d} would be archived")
+        return
+
+    total = archive_orders(months, batch_size)
+    click.echo(f"Archived {total} orders created before {cutoff:%Y-%m-%d}")
+
+
+@orders_cli.command("partitions")
+@click.option("--ahead", type=int, default=3, show_default=True, help="Months after the archive cutoff.")
+@click.option("--since", "since", type=click.DateTime(["%Y-%m"]), default=None, help="First month (default: oldest order).")
+def partitions_command(ahead, since):
+    """Create monthly archive partitions (Postgres)."""
+    if not _is_postgres():
+        click.echo("Archive partitions are only used on Postgres")
+        return
+
+    if since is None:
+        oldest = db.session.query(db.func.min(Order.created_at)).scalar() or datetime.utcnow()
+        since = oldest
+    cutoff = archive_cutoff(current_app.config.get("ORDER_ARCHIVE_MONTHS", 6))
+    created = ensure_partitions(month_start(since), add_months(month_start(cutoff), ahead))
+    db.session.commit()
+    click.echo(f"Ensured {created} monthly partitions")
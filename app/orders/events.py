@@ -0,0 +1,82 @@
+# app/orders/events.py
+"""
+order_events: log append-only، الـ consumers (الـ feed والإشعارات) بيتابعوه بالـ id (id > cursor).
+
+الضمان: جوه الكمبوند (tenant) الواحد الـ ids بتبان بنفس ترتيب الـ commit – أي consumer وصل
+لـ id = N مش هيظهر بعدها event بـ id أصغر من N لنفس الـ tenant. في Postgres الـ id بييجي من
+الـ sequence وقت الـ INSERT مش وقت الـ commit، فمن غير حاجة transaction ماسكة 101 ممكن تعمل commit
+بعد واحدة ماسكة 102 والـ consumer اللي عدّى 102 عمره ما يشوف 101. علشان كده record_order_events
+بياخد advisory lock (xact) للـ tenant قبل الـ INSERT: الـ transaction اللي بعدها في نفس الـ tenant
+مبتاخدش ids غير بعد ما اللي قبلها تعمل commit أو rollback. الكمبوندات التانية مش بتستنى.
+
+يعني أي cursor لازم يبقى لكل tenant: الـ feeds (store / customer جوه tenant واحد) والـ dispatcher
+(cursor لكل tenant). cursor واحد على كل الـ tenants مش آمن.
+في SQLite الكتابة أصلاً serialized (lock على الداتابيز كلها).
+"""
+from datetime import datetime
+
+from sqlalchemy import func, insert, select
+
+from app import db
+from app.models import OrderEvent
+from app.tenancy import current_tenant_id
+
+EVENT_CREATED = "CREATED"
+EVENT_STATUS_CHANGED = "STATUS_CHANGED"
+
+# مفتاح الـ pg_advisory_xact_lock بتاع كتابة الـ events ("orev")
+EVENTS_LOCK_KEY = 0x6F726576
+
+
+def _lock_event_sequence():
+    # بيتفك لوحده مع الـ commit / rollback. (key, tenant_id) – lock لكل كمبوند
+    if db.session.get_bind().dialect.name == "postgresql":
+        db.session.execute(
+            select(func.pg_advisory_xact_lock(EVENTS_LOCK_KEY, current_tenant_id() or 0))
+        )
+
+
+def record_order_events(rows, event_type: str):
+    """
+    rows: [{"order_id", "store_id", "customer_id", "status"}, ...]
+    insert واحد (executemany) في الـ transaction الحالي – الـ commit على اللي نادى.
+    وبيجدول dispatch للإشعارات في نفس الـ transaction.
+    الـ advisory lock بيفضل ماسك لحد الـ commit – نادي الدالة دي قرب آخر الـ transaction.
+    """
+    if not rows:
+        return
+    _lock_event_sequence()
+    now = datetime.utcnow()
+    db.session.execute(
+        insert(OrderEvent),
+        [dict(row, event_type=event_type, created_at=now) for row in rows],
+    )
+
+    # الإشعارات بتتبعت من الـ worker بعد الـ commit
+    from app.notifications.dispatch import schedule_dispatch
+    schedule_dispatch()
+
+
+def serialize_event(event: OrderEvent):
+    return {
+        "seq": event.id,
+        "order_id": event.order_id,
+        "store_id": event.store_id,
+        "event_type": event.event_type,
+        "status": event.status,
+        "created_at": event.created_at.isoformat() if event.created_at else None,
+    }
+
+
+def tail_events(after: int, limit: int, store_id=None, customer_id=None):
+    """
+    Range scan بالـ sequence: WHERE (store_id|customer_id) = ? AND id > :after ORDER BY id LIMIT n
+    (والـ tenant الحالي من الـ TenantScoped). آمن كـ cursor جوه tenant واحد: الـ ids بتبان
+    بترتيب الـ commit (شوف أول الملف)، فمفيش event هيظهر بعدين بـ id <= آخر id رجع.
+    """
+    query = OrderEvent.query.filter(OrderEvent.id > after)
+    if store_id is not None:
+        query = query.filter(OrderEvent.store_id == store_id)
+    if customer_id is not None:
+        query = query.filter(OrderEvent.customer_id == customer_id)
+    return query.order_by(OrderEvent.id.asc()).limit(limit).all()
@@ -0,0 +1,89 @@
+# app/orders/idempotency.py
+import hashlib
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app, jsonify
+from flask.cli import AppGroup
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import IdempotencyKey
+
+MAX_KEY_LENGTH = 64
+
+idempotency_cli = AppGroup("idempotency", help="Idempotency keys maintenance.")
+
+
+def _ttl() -> timedelta:
+    return timedelta(hours=current_app.config.get("IDEMPOTENCY_TTL_HOURS", 24))
+
+
+def request_fingerprint(raw_body: bytes) -> str:
+    return hashlib.sha256(raw_body or b"").hexdigest()
+
+
+def _stored_response(record: IdempotencyKey):
+    return current_app.response_class(
+        record.response_body,
+        status=record.response_status,
+        mimetype="application/json",
+    )
+
+
+def replay(user_id: int, key: str, request_hash: str):
+    """
+    لو الـ key اتستخدم قبل كده → الـ response المتخزن (أو 422 لو الـ body مختلف).
+    لو لأ (أو انتهت صلاحيته) → None ونكمل الـ request عادي.
+    """
+    record = IdempotencyKey.query.filter_by(user_id=user_id, key=key).first()
+    if record is None:
+        return None
+
+    if record.created_at < datetime.utcnow() - _ttl():
+        db.session.delete(record)
+        db.session.commit()
+        return None
+
+    if record.request_hash != request_hash:
+        return jsonify({"message": "Idempotency-Key مستخدم مع طلب مختلف"}), 422
+
+    return _stored_response(record)
+
+
+def commit_with_key(user_id: int, key: str, request_hash: str, body: str, status: int):
+    """
+    بيخزن الـ response في نفس الـ transaction بتاع الـ order ويعمل commit.
+    لو request تاني بنفس الـ key سبقنا، الـ unique constraint بيرفض الـ commit،
+    فبنعمل rollback (الـ order بتاعنا بيتلغي) ونرجع الـ response بتاع اللي سبق.
+    """
+    db.session.add(
+        IdempotencyKey(
+            user_id=user_id,
+            key=key,
+            request_hash=request_hash,
+            response_status=status,
+            response_body=body,
+        )
+    )
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        winner = replay(user_id, key, request_hash)
+        if winner is not None:
+            return winner
+        return jsonify({"message": "الطلب قيد التنفيذ، حاول مرة أخرى"}), 409
+
+    return current_app.response_class(body, status=status, mimetype="application/json")
+
+
+@idempotency_cli.command("purge")
+def purge_command():
+    """Delete idempotency keys older than IDEMPOTENCY_TTL_HOURS."""
+    cutoff = datetime.utcnow() - _ttl()
+    deleted = IdempotencyKey.query.filter(IdempotencyKey.created_at < cutoff).delete(
+        synchronize_session=False
+    )
+    db.session.commit()
+    click.echo(f"Deleted {deleted} expired idempotency keys")
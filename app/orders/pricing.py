@@ -0,0 +1,177 @@
+# app/orders/pricing.py
+"""
+حساب إجمالي السلة بـ Decimal – نفس الحسبة بتستخدمها POST /api/orders/quote و create_order:
+- subtotal = سعر الوحدة × الكمية، و items_total = مجموعهم
+- الحد الأدنى للطلب (Store.min_order_amount) على items_total من غير التوصيل
+- delivery_fee بتتزود بس لو delivery_method == "DELIVERY" – total = items_total + delivery_fee
+  (الطلب بيتسجل total_amount = items_total و Order.delivery_fee لوحدها، علشان الـ revenue
+  في الـ analytics يفضل المنتجات بس)
+
+الـ quote بيقرا من snapshot للمتجر (الأسعار والمخزون) متخزن في الذاكرة لحد ما:
+- المنتجات أو المتجر يتعدلوا في نفس الـ process (invalidate_store_pricing)
+- أو يعدي PRICING_CACHE_SECONDS (علشان تعديلات الـ workers التانية توصل)
+create_order بيحسب من الـ DB على طول (الأسعار الحالية هي اللي بتتسجل في الطلب).
+"""
+import threading
+import time
+from decimal import Decimal
+
+from flask import current_app
+
+from app import db
+from app.models import Product, Store
+from app.stores.hours import is_open_at, local_time
+from app.tenancy import current_tenant_id
+
+CENTS = Decimal("0.01")
+
+DELIVERY_METHODS = ("DELIVERY", "PICKUP")
+
+_lock = threading.Lock()
+_cache = {}  # (tenant_id, store_id) → {"expires_at", "store", "products"}
+
+
+def money(value) -> Decimal:
+    return Decimal(value or 0).quantize(CENTS)
+
+
+def store_terms(store: Store) -> dict:
+    return {
+        "id": store.id,
+        "name": store.name,
+        "min_order_amount": money(store.min_order_amount),
+        "delivery_fee": money(store.delivery_fee),
+        "open_from": store.open_from,
+        "open_to": store.open_to,
+    }
+
+
+def _load(store_id: int):
+    store = Store.query.filter_by(id=store_id, is_active=True).first()
+    if store is None:
+        return None, None
+    rows = db.session.query(Product.id, Product.name, Product.price, Product.stock).filter(
+        Product.store_id == store.id, Product.is_active == True
+    )
+    products = {
+        pid: {"name": name, "price": money(price), "stock": stock or 0}
+        for pid, name, price, stock in rows
+    }
+    return store_terms(store), products
+
+
+def store_snapshot(store_id: int):
+    """
+    (terms, products) للمتجر من الـ cache، أو (None, None) لو المتجر مش موجود أو مش نشط.
+    """
+    key = (current_tenant_id(), store_id)
+    now = time.monotonic()
+    entry = _cache.get(key)
+    if entry is not None and now < entry["expires_at"]:
+        return entry["store"], entry["products"]
+
+    with _lock:
+        entry = _cache.get(key)
+        if entry is None or now >= entry["expires_at"]:
+            terms, products = _load(store_id)
+            if terms is None:
+                _cache.pop(key, None)
+                return None, None
+            for stale in [k for k, e in _cache.items() if now >= e["expires_at"]]:
+                del _cache[stale]
+            entry = {
+                "store": terms,
+                "products": products,
+                "expires_at": now + current_app.config.get("PRICING_CACHE_SECONDS", 60),
+            }
+            _cache[key] = entry
+    return entry["store"], entry["products"]
+
+
+def invalidate_store_pricing(store_id: int):
+    with _lock:
+        _cache.pop((current_tenant_id(), store_id), None)
+
+
+def parse_cart_items(items_data):
+    """
+    [{"product_id": 10, "quantity": 2}, ...] → [(product_id, quantity)] بنفس قواعد create_order:
+    الكمية الغلط أو <= 0 بتبقى 1. الـ items اللي من غير product_id بتتشال.
+    """
+    items = []
+    for it in items_data or []:
+        if not isinstance(it, dict) or not it.get("product_id"):
+            continue
+        qty = it.get("quantity", 1)
+        try:
+            qty = int(qty)
+        except (TypeError, ValueError):
+            qty = 1
+        if qty <= 0:
+            qty = 1
+        items.append((it.get("product_id"), qty))
+    return items
+
+
+def compute_quote(terms: dict, products: dict, items, delivery_method: str):
+    """
+    terms: store_terms(store)، products: {id: {"name", "price", "stock"}}، items: parse_cart_items.
+    delivery_method لازم يكون من DELIVERY_METHODS.
+    بترجع (quote, error). المبالغ Decimal – serialize_quote بيحولها للـ JSON.
+    """
+    if delivery_method not in DELIVERY_METHODS:
+        return None, "طريقة الاستلام غير صالحة (DELIVERY أو PICKUP)"
+
+    lines = []
+    requested = {}
+    items_total = Decimal("0.00")
+
+    for pid, qty in items:
+        product = products.get(pid)
+        if product is None:
+            return None, f"المنتج {pid} غير متاح"
+        subtotal = (product["price"] * qty).quantize(CENTS)
+        items_total += subtotal
+        requested[pid] = requested.get(pid, 0) + qty
+        lines.append(
+            {
+                "product_id": pid,
+                "product_name": product["name"],
+                "unit_price": product["price"],
+                "quantity": qty,
+                "subtotal": subtotal,
+            }
+        )
+
+    for line in lines:
+        line["in_stock"] = requested[line["product_id"]] <= products[line["product_id"]]["stock"]
+
+    delivery_fee = terms["delivery_fee"] if delivery_method == "DELIVERY" else Decimal("0.00")
+    min_order = terms["min_order_amount"]
+    all_in_stock = all(line["in_stock"] for line in lines)
+    meets_min_order = items_total >= min_order
+    is_open_now = is_open_at(terms["open_from"], terms["open_to"], local_time())
+
+    return {
+        "store_id": terms["id"],
+        "delivery_method": delivery_method,
+        "items": lines,
+        "items_total": items_total,
+        "delivery_fee": delivery_fee,
+        "total": items_total + delivery_fee,
+        "min_order_amount": min_order,
+        "meets_min_order": meets_min_order,
+        "amount_to_min_order": max(min_order - items_total, Decimal("0.00")),
+        "all_in_stock": all_in_stock,
+        "is_open_now": is_open_now,
+        "can_order": bool(lines) and meets_min_order and all_in_stock and is_open_now,
+    }, None
+
+
+def serialize_quote(quote: dict):
+    def out(value):
+        return float(value) if isinstance(value, Decimal) else value
+
+    data = {key: out(value) for key, value in quote.items() if key != "items"}
+    data["items"] = [{key: out(value) for key, value in line.items()} for line in quote["items"]]
+    return data
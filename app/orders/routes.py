@@ -1,14 +1,40 @@
 # app/orders/routes.py
 
-from flask import Blueprint, jsonify, request
+import json
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from sqlalchemy.orm import joinedload, selectinload
 from app import db
 from app.auth.routes import get_current_user_from_request
-from app.models import Store, Product, Order, OrderItem
+from app.models import Store, Product, Order, OrderItem, OrderEvent, ArchivedOrder
+from app.ratelimit import rate_limit
+from app.orders import idempotency
+from app.orders.status import ORDER_STATUSES, transition_orders
+from app.orders.stock import reserve_stock
+from app.orders.pricing import (
+    DELIVERY_METHODS,
+    compute_quote,
+    money,
+    parse_cart_items,
+    serialize_quote,
+    store_snapshot,
+    store_terms,
+)
+from app.orders.events import EVENT_CREATED, record_order_events, serialize_event, tail_events
+from app.stores.analytics import record_order_created
+from app.orders.streaming import iter_store_orders, iter_json_array, iter_ndjson, merge_newest_first
+from app.stores.hours import local_time, is_open_at
 from datetime import datetime
 
 orders_bp = Blueprint("orders", __name__)
 
-def serialize_order(order: Order, include_items: bool = True):
+MAX_BULK_ORDERS = 200
+MAX_EVENTS_PAGE = 500
+
+def serialize_order(order: Order, include_items: bool = True, items=None):
+    """
+    items: الـ OrderItems لو اتجابوا batch (recent_customer_orders) – غير كده order.items.
+    """
     base = {
         "id": order.id,
         "store_id": order.store_id,
@@ -17,6 +43,8 @@ def serialize_order(order: Order, include_items: bool = True):
         "customer_name": order.customer.full_name if order.customer else None,
         "status": order.status,
         "total_amount": float(order.total_amount or 0),
+        "delivery_fee": float(order.delivery_fee or 0),
+        "grand_total": float((order.total_amount or 0) + (order.delivery_fee or 0)),
         "delivery_method": order.delivery_method,
         "notes": order.notes,
         "created_at": order.created_at.isoformat() if order.created_at else None,
@@ -32,13 +60,73 @@ def serialize_order(order: Order, include_items: bool = True):
                 "quantity": it.quantity,
                 "subtotal": float(it.subtotal),
             }
-            for it in order.items
+            for it in (order.items if items is None else items)
         ]
     return base
 
 
+def recent_customer_orders(customer_id: int, limit: int):
+    """
+    آخر limit طلبات للعميل في 2 queries: الطلبات (+ المتجر والعميل بـ join) ثم كل الـ items بـ IN.
+    """
+    orders = (
+        Order.query.filter_by(customer_id=customer_id)
+        .options(joinedload(Order.store), joinedload(Order.customer))
+        .order_by(Order.created_at.desc(), Order.id.desc())
+        .limit(limit)
+        .all()
+    )
+    items_by_order = {o.id: [] for o in orders}
+    if orders:
+        items = (
+            OrderItem.query.filter(OrderItem.order_id.in_(list(items_by_order)))
+            .order_by(OrderItem.id)
+            .all()
+        )
+        for it in items:
+            items_by_order[it.order_id].append(it)
+    return [serialize_order(o, items=items_by_order[o.id]) for o in orders]
+
+
+# ---------- Cart: quote ----------
+@orders_bp.route("/quote", methods=["POST"])
+@rate_limit("order_quote")
+def quote_order():
+    """
+    نفس body بتاع create_order (store_id, items, delivery_method) → الإجمالي من غير ما يتعمل طلب.
+    الأسعار والمخزون من snapshot المتجر المتخزن (app/orders/pricing.py) – مفيش DB في الغالب.
+    الرد: items (بـ in_stock لكل منتج), items_total, delivery_fee, total,
+    min_order_amount, meets_min_order, amount_to_min_order, is_open_now, can_order
+    """
+    data = request.get_json() or {}
+    try:
+        store_id = int(data.get("store_id"))
+    except (TypeError, ValueError):
+        return jsonify({"message": "store_id مطلوب"}), 400
+
+    delivery_method = data.get("delivery_method") or "DELIVERY"
+    if delivery_method not in DELIVERY_METHODS:
+        return jsonify({"message": "طريقة الاستلام غير صالحة (DELIVERY أو PICKUP)"}), 400
+
+    terms, products = store_snapshot(store_id)
+    if terms is None:
+        return jsonify({"message": "المتجر غير موجود أو غير متاح"}), 404
+
+    quote, error = compute_quote(
+        terms,
+        products,
+        parse_cart_items(data.get("items")),
+        delivery_method,
+    )
+    if error:
+        return jsonify({"message": error}), 400
+
+    return jsonify(serialize_quote(quote)), 200
+
+
 # ---------- Customer: create order ----------
 @orders_bp.route("", methods=["POST"])
+@rate_limit("create_order")
 def create_order():
     """
     Customer creates an order.
@@ -49,12 +137,24 @@ def create_order():
       "delivery_method": "DELIVERY" | "PICKUP",
       "notes": "no onions"
     }
+    total_amount = المنتجات بس، و delivery_fee لوحدها (للـ DELIVERY)؛ grand_total = الاتنين.
+    لازم المنتجات توصل لـ min_order_amount.
+    header (اختياري): Idempotency-Key – الـ retry بنفس الـ key بيرجع نفس الـ order
     """
     current_user, error = get_current_user_from_request(allowed_roles=["CUSTOMER"])
     if error:
         msg, status = error
         return jsonify({"message": msg}), status
 
+    idem_key = (request.headers.get("Idempotency-Key") or "").strip()
+    if idem_key:
+        if len(idem_key) > idempotency.MAX_KEY_LENGTH:
+            return jsonify({"message": "Idempotency-Key طويل جداً"}), 400
+        request_hash = idempotency.request_fingerprint(request.get_data())
+        stored = idempotency.replay(current_user.id, idem_key, request_hash)
+        if stored is not None:
+            return stored
+
     data = request.get_json() or {}
     store_id = data.get("store_id")
     items_data = data.get("items") or []
@@ -64,6 +164,9 @@ def create_order():
     if not store_id:
         return jsonify({"message": "store_id مطلوب"}), 400
 
+    if delivery_method not in DELIVERY_METHODS:
+        return jsonify({"message": "طريقة الاستلام غير صالحة (DELIVERY أو PICKUP)"}), 400
+
     if not items_data:
         return jsonify({"message": "قائمة المنتجات فارغة"}), 400
 
@@ -71,47 +174,51 @@ def create_order():
     if not store:
         return jsonify({"message": "المتجر غير موجود أو غير متاح"}), 404
 
+    if not is_open_at(store.open_from, store.open_to, local_time()):
+        return jsonify({"message": "المتجر مغلق حالياً"}), 400
+
     # Validate products & same store
-    product_ids = [it.get("product_id") for it in items_data if it.get("product_id")]
-    if not product_ids:
+    cart = parse_cart_items(items_data)
+    if not cart:
         return jsonify({"message": "قائمة المنتجات غير صالحة"}), 400
 
+    # الأسعار من الـ DB مباشرة (مش من الـ snapshot بتاع الـ quote)
     products = Product.query.filter(
-        Product.id.in_(product_ids),
+        Product.id.in_([pid for pid, _ in cart]),
         Product.store_id == store.id,
         Product.is_active == True
     ).all()
 
-    products_by_id = {p.id: p for p in products}
-    total_amount = 0
-
-    order_items = []
-    for it in items_data:
-        pid = it.get("product_id")
-        qty = it.get("quantity", 1)
-        try:
-            qty = int(qty)
-        except (TypeError, ValueError):
-            qty = 1
-        if qty <= 0:
-            qty = 1
-
-        product = products_by_id.get(pid)
-        if not product:
-            return jsonify({"message": f"المنتج {pid} غير متاح"}), 400
-
-        unit_price = float(product.price or 0)
-        subtotal = unit_price * qty
-        total_amount += subtotal
-
-        order_items.append(
+    quote, error = compute_quote(
+        store_terms(store),
+        {p.id: {"name": p.name, "price": money(p.price), "stock": p.stock or 0} for p in products},
+        cart,
+        delivery_method,
+    )
+    if error:
+        return jsonify({"message": error}), 400
+
+    if not quote["meets_min_order"]:
+        return jsonify(
             {
-                "product": product,
-                "quantity": qty,
-                "unit_price": unit_price,
-                "subtotal": subtotal,
+                "message": f"الحد الأدنى للطلب من المتجر {float(quote['min_order_amount']):g}",
+                "quote": serialize_quote(quote),
             }
-        )
+        ), 400
+
+    if not quote["all_in_stock"]:
+        return jsonify(
+            {
+                "message": "الكمية المطلوبة غير متوفرة في المخزون",
+                "quote": serialize_quote(quote),
+            }
+        ), 400
+
+    # الـ quote شاف المخزون قبل الـ UPDATE – طلب تاني ممكن يكون سبقنا على آخر قطعة
+    short = reserve_stock(quote["items"])
+    if short is not None:
+        db.session.rollback()
+        return jsonify({"message": f"الكمية المطلوبة من {short} غير متوفرة في المخزون"}), 409
 
     order = Order(
         customer_id=current_user.id,
@@ -119,32 +226,71 @@ def create_order():
         status="PENDING",              # New / Pending Approval
         delivery_method=delivery_method,
         notes=notes,
-        total_amount=total_amount,
+        total_amount=quote["items_total"],
+        delivery_fee=quote["delivery_fee"],
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow(),
     )
     db.session.add(order)
     db.session.flush()  # to get order.id
 
-    for oi in order_items:
+    for line in quote["items"]:
         item = OrderItem(
             order_id=order.id,
-            product_id=oi["product"].id,
-            product_name=oi["product"].name,
-            unit_price=oi["unit_price"],
-            quantity=oi["quantity"],
-            subtotal=oi["subtotal"],
+            product_id=line["product_id"],
+            product_name=line["product_name"],
+            unit_price=line["unit_price"],
+            quantity=line["quantity"],
+            subtotal=line["subtotal"],
         )
         db.session.add(item)
 
+    record_order_events(
+        [
+            {
+                "order_id": order.id,
+                "store_id": store.id,
+                "customer_id": current_user.id,
+                "status": order.status,
+            }
+        ],
+        EVENT_CREATED,
+    )
+    record_order_created(store.id, order.created_at)
+
+    if idem_key:
+        body = json.dumps(serialize_order(order), ensure_ascii=False)
+        return idempotency.commit_with_key(current_user.id, idem_key, request_hash, body, 201)
+
     db.session.commit()
 
     return jsonify(serialize_order(order)), 201
 
 
+def _include_archived() -> bool:
+    return request.args.get("include_archived", "").lower() in ("1", "true", "yes")
+
+
+def _archived_orders(**filters):
+    # الطلبات القديمة اللي اتنقلت لـ orders_archive (flask orders archive)
+    return (
+        ArchivedOrder.query.filter_by(**filters)
+        .options(
+            selectinload(ArchivedOrder.items),
+            joinedload(ArchivedOrder.store),
+            joinedload(ArchivedOrder.customer),
+        )
+        .order_by(ArchivedOrder.created_at.desc(), ArchivedOrder.id.desc())
+        .all()
+    )
+
+
 # ---------- Customer: list my orders ----------
 @orders_bp.route("/my", methods=["GET"])
 def my_orders():
+    """
+    ?include_archived=1 → كمان الطلبات القديمة المؤرشفة
+    """
     current_user, error = get_current_user_from_request(allowed_roles=["CUSTOMER"])
     if error:
         msg, status = error
@@ -155,12 +301,21 @@ def my_orders():
         .order_by(Order.created_at.desc())
         .all()
     )
-    return jsonify([serialize_order(o) for o in orders]), 200
+    result = [serialize_order(o) for o in orders]
+    if _include_archived():
+        archived = [serialize_order(o) for o in _archived_orders(customer_id=current_user.id)]
+        result = list(merge_newest_first(result, archived))
+    return jsonify(result), 200
 
 
 # ---------- Seller: list store orders ----------
 @orders_bp.route("/seller", methods=["GET"])
 def seller_orders():
+    """
+    ?stream=json   → نفس الـ JSON array بس بيتبعت incremental (للـ history الكبيرة)
+    ?stream=ndjson → order في كل سطر (application/x-ndjson)
+    ?include_archived=1 → كمان الطلبات القديمة المؤرشفة
+    """
     current_user, error = get_current_user_from_request(allowed_roles=["SELLER"])
     if error:
         msg, status = error
@@ -170,22 +325,43 @@ def seller_orders():
     if not store:
         return jsonify({"message": "لم يتم إنشاء متجر بعد لهذا المستخدم"}), 404
 
+    include_archived = _include_archived()
+    stream = request.args.get("stream")
+    if stream in ("json", "ndjson"):
+        orders = iter_store_orders(store)
+        if include_archived:
+            orders = merge_newest_first(orders, iter_store_orders(store, archived=True))
+        if stream == "ndjson":
+            return Response(
+                stream_with_context(iter_ndjson(orders)),
+                mimetype="application/x-ndjson",
+            )
+        return Response(
+            stream_with_context(iter_json_array(orders)),
+            mimetype="application/json",
+        )
+
     orders = (
         Order.query.filter_by(store_id=store.id)
         .order_by(Order.created_at.desc())
         .all()
     )
-    return jsonify([serialize_order(o) for o in orders]), 200
+    result = [serialize_order(o) for o in orders]
+    if include_archived:
+        archived = [serialize_order(o) for o in _archived_orders(store_id=store.id)]
+        result = list(merge_newest_first(result, archived))
+    return jsonify(result), 200
 
 
 # ---------- Seller: update order status ----------
 @orders_bp.route("/<int:order_id>/status", methods=["POST"])
 def update_order_status(order_id):
     """
-    Seller moves order through workflow:
-    PENDING -> ACCEPTED / REJECTED
-    ACCEPTED -> PREPARING
-    PREPARING -> ON_THE_WAY
+    Seller moves order through workflow (ORDER_TRANSITIONS):
+    PENDING -> ACCEPTED / REJECTED / CANCELLED
+    ACCEPTED -> PREPARING / CANCELLED
+    PREPARING -> READY / ON_THE_WAY / CANCELLED
+    READY -> ON_THE_WAY / DELIVERED
     ON_THE_WAY -> DELIVERED
     body: { "status": "ACCEPTED", "mark_paid": true/false }
     """
@@ -198,32 +374,134 @@ def update_order_status(order_id):
     if not store:
         return jsonify({"message": "لم يتم إنشاء متجر بعد لهذا المستخدم"}), 404
 
-    order = Order.query.filter_by(id=order_id, store_id=store.id).first()
-    if not order:
-        return jsonify({"message": "الطلب غير موجود"}), 404
-
     data = request.get_json() or {}
     new_status = data.get("status")
     mark_paid = bool(data.get("mark_paid", False))
 
-    if new_status not in [
-        "PENDING",
-        "ACCEPTED",
-        "REJECTED",
-        "PREPARING",
-        "ON_THE_WAY",
-        "DELIVERED",
-        "CANCELLED",
-    ]:
+    if new_status not in ORDER_STATUSES:
         return jsonify({"message": "حالة غير صالحة"}), 400
 
-    order.status = new_status
+    updated = transition_orders(store.id, [order_id], new_status)
+    if not updated:
+        db.session.rollback()
+        order = Order.query.filter_by(id=order_id, store_id=store.id).first()
+        if not order:
+            return jsonify({"message": "الطلب غير موجود"}), 404
+        return jsonify(
+            {
+                "message": "لا يمكن تغيير حالة الطلب من الحالة الحالية",
+                "status": order.status,
+            }
+        ), 409
+
     if mark_paid:
         # لو حابب تضيف عمود is_paid في الـ Model
         # order.is_paid = True
         pass
 
-    order.updated_at = datetime.utcnow()
     db.session.commit()
 
+    order = db.session.get(Order, order_id)
     return jsonify(serialize_order(order)), 200
+
+
+# ---------- Seller: bulk update order status ----------
+@orders_bp.route("/status/bulk", methods=["POST"])
+def bulk_update_order_status():
+    """
+    body: { "order_ids": [1, 2, 3], "status": "ACCEPTED" }
+    UPDATE واحد للدفعة كلها؛ الطلبات اللي حالتها مش بتسمح بالانتقال بترجع في skipped.
+    """
+    current_user, error = get_current_user_from_request(allowed_roles=["SELLER"])
+    if error:
+        msg, status = error
+        return jsonify({"message": msg}), status
+
+    store = Store.query.filter_by(owner_id=current_user.id).first()
+    if not store:
+        return jsonify({"message": "لم يتم إنشاء متجر بعد لهذا المستخدم"}), 404
+
+    data = request.get_json() or {}
+    new_status = data.get("status")
+    order_ids = data.get("order_ids") or []
+
+    if new_status not in ORDER_STATUSES:
+        return jsonify({"message": "حالة غير صالحة"}), 400
+
+    try:
+        order_ids = list(dict.fromkeys(int(oid) for oid in order_ids))
+    except (TypeError, ValueError):
+        return jsonify({"message": "قائمة الطلبات غير صالحة"}), 400
+
+    if not order_ids:
+        return jsonify({"message": "قائمة الطلبات فارغة"}), 400
+
+    if len(order_ids) > MAX_BULK_ORDERS:
+        return jsonify({"message": f"الحد الأقصى {MAX_BULK_ORDERS} طلب في المرة"}), 400
+
+    updated = set(transition_orders(store.id, order_ids, new_status))
+    db.session.commit()
+
+    return jsonify(
+        {
+            "status": new_status,
+            "updated": [oid for oid in order_ids if oid in updated],
+            "skipped": [oid for oid in order_ids if oid not in updated],
+        }
+    ), 200
+
+
+# ---------- Order events feed ----------
+@orders_bp.route("/events", methods=["GET"])
+def order_events_feed():
+    """
+    ?after=<seq>&limit=100
+    البائع بيشوف events المتجر بتاعه، والعميل events طلباته.
+    الـ client بيبعت next_after اللي رجعله في الطلب اللي بعده.
+    """
+    current_user, error = get_current_user_from_request(allowed_roles=["SELLER", "CUSTOMER"])
+    if error:
+        msg, status = error
+        return jsonify({"message": msg}), status
+
+    after = request.args.get("after", 0, type=int)
+    limit = min(max(request.args.get("limit", 100, type=int), 1), MAX_EVENTS_PAGE)
+
+    if current_user.role == "SELLER":
+        store = Store.query.filter_by(owner_id=current_user.id).first()
+        if not store:
+            return jsonify({"message": "لم يتم إنشاء متجر بعد لهذا المستخدم"}), 404
+        events = tail_events(after, limit, store_id=store.id)
+    else:
+        events = tail_events(after, limit, customer_id=current_user.id)
+
+    return jsonify(
+        {
+            "events": [serialize_event(e) for e in events],
+            "next_after": events[-1].id if events else after,
+        }
+    ), 200
+
+
+# ---------- Order status history ----------
+@orders_bp.route("/<int:order_id>/history", methods=["GET"])
+def order_history(order_id):
+    current_user, error = get_current_user_from_request(allowed_roles=["SELLER", "CUSTOMER"])
+    if error:
+        msg, status = error
+        return jsonify({"message": msg}), status
+
+    query = OrderEvent.query.filter(OrderEvent.order_id == order_id)
+    if current_user.role == "SELLER":
+        store = Store.query.filter_by(owner_id=current_user.id).first()
+        if not store:
+            return jsonify({"message": "لم يتم إنشاء متجر بعد لهذا المستخدم"}), 404
+        query = query.filter(OrderEvent.store_id == store.id)
+    else:
+        query = query.filter(OrderEvent.customer_id == current_user.id)
+
+    events = query.order_by(OrderEvent.id.asc()).all()
+    if not events:
+        return jsonify({"message": "الطلب غير موجود"}), 404
+
+    return jsonify([serialize_event(e) for e in events]), 200
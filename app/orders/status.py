@@ -0,0 +1,77 @@
+# app/orders/status.py
+from datetime import datetime
+
+from sqlalchemy import update
+
+from app import db
+from app.models import Order
+from app.orders.events import EVENT_STATUS_CHANGED, record_order_events
+from app.orders.stock import release_stock
+from app.stores.analytics import CANCELLED_STATUSES, record_status_changes
+
+# الحالة الحالية → الحالات المسموح ننتقل لها
+ORDER_TRANSITIONS = {
+    "PENDING": {"ACCEPTED", "REJECTED", "CANCELLED"},
+    "ACCEPTED": {"PREPARING", "CANCELLED"},
+    "PREPARING": {"READY", "ON_THE_WAY", "CANCELLED"},
+    "READY": {"ON_THE_WAY", "DELIVERED"},  # READY → DELIVERED للـ PICKUP
+    "ON_THE_WAY": {"DELIVERED"},
+    "REJECTED": set(),
+    "DELIVERED": set(),
+    "CANCELLED": set(),
+}
+
+ORDER_STATUSES = set(ORDER_TRANSITIONS)
+
+# العكس: الحالة الجديدة → الحالات اللي ينفع نيجي منها
+_SOURCES = {
+    status: {src for src, targets in ORDER_TRANSITIONS.items() if status in targets}
+    for status in ORDER_STATUSES
+}
+
+
+def can_transition(current: str, new: str) -> bool:
+    return new in ORDER_TRANSITIONS.get(current, ())
+
+
+def transition_orders(store_id: int, order_ids, new_status: str):
+    """
+    compare-and-set في statement واحد:
+    UPDATE orders SET status=:new WHERE id IN (...) AND store_id=:store AND status IN (:sources)
+    مفيش load قبلها، واتنين tap في نفس اللحظة واحد بس فيهم اللي بيكسب.
+    الـ order_events والـ analytics rollups (والمخزون لو اترفض / اتلغى) بتتكتب في نفس الـ transaction.
+    بترجع list بالـ ids اللي اتحدثت فعلاً (مش commit).
+    """
+    sources = _SOURCES.get(new_status)
+    if not sources or not order_ids:
+        return []
+
+    stmt = (
+        update(Order)
+        .where(
+            Order.id.in_(order_ids),
+            Order.store_id == store_id,
+            Order.status.in_(sources),
+        )
+        .values(status=new_status, updated_at=datetime.utcnow())
+        .returning(Order.id, Order.customer_id, Order.created_at, Order.total_amount)
+        .execution_options(synchronize_session=False)
+    )
+    rows = db.session.execute(stmt).all()
+
+    record_order_events(
+        [
+            {
+                "order_id": row.id,
+                "store_id": store_id,
+                "customer_id": row.customer_id,
+                "status": new_status,
+            }
+            for row in rows
+        ],
+        EVENT_STATUS_CHANGED,
+    )
+    record_status_changes(store_id, rows, new_status)
+    if new_status in CANCELLED_STATUSES:
+        release_stock([row.id for row in rows])
+    return [row.id for row in rows]
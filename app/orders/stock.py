@@ -0,0 +1,56 @@
+# app/orders/stock.py
+from collections import defaultdict
+
+from sqlalchemy import func, update
+
+from app import db
+from app.models import OrderItem, Product
+
+
+def reserve_stock(lines):
+    """
+    lines: quote["items"]. بيخصم الكميات بـ UPDATE مشروط لكل منتج:
+    UPDATE products SET stock = stock - :qty WHERE id = :id AND stock >= :qty
+    فطلبين في نفس اللحظة على آخر قطعة واحد بس اللي بيعدي (من غير SELECT ... FOR UPDATE).
+    الـ ids مترتبة علشان الـ row locks تتاخد بنفس الترتيب في كل الـ transactions.
+    بترجع اسم أول منتج الكمية بتاعته مش متوفرة، أو None. (مش commit ولا rollback)
+    """
+    requested = defaultdict(int)
+    names = {}
+    for line in lines:
+        requested[line["product_id"]] += line["quantity"]
+        names[line["product_id"]] = line["product_name"]
+
+    for pid in sorted(requested):
+        qty = requested[pid]
+        result = db.session.execute(
+            update(Product)
+            .where(Product.id == pid, Product.stock >= qty)
+            .values(stock=Product.stock - qty)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            return names[pid]
+    return None
+
+
+def release_stock(order_ids):
+    """
+    الطلبات اللي اترفضت / اتلغت – الكميات بترجع للمخزون في نفس الـ transaction بتاع الـ status update.
+    """
+    if not order_ids:
+        return
+    rows = (
+        db.session.query(OrderItem.product_id, func.sum(OrderItem.quantity))
+        .filter(OrderItem.order_id.in_(order_ids))
+        .group_by(OrderItem.product_id)
+        .order_by(OrderItem.product_id)
+        .all()
+    )
+    for pid, qty in rows:
+        db.session.execute(
+            update(Product)
+            .where(Product.id == pid)
+            .values(stock=Product.stock + qty)
+            .execution_options(synchronize_session=False)
+        )
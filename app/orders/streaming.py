@@ -0,0 +1,125 @@
+# app/orders/streaming.py
+"""
+Streaming لقائمة طلبات المتجر كلها: query واحدة (orders + items + اسم العميل)
+بـ server-side cursor، وكل order بيتبعت أول ما الـ items بتاعته تخلص.
+الذاكرة ثابتة مهما كان حجم الـ history.
+"""
+import heapq
+import json
+
+from sqlalchemy import and_, select
+
+from app import db
+from app.models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem, User
+
+STREAM_CHUNK_SIZE = 500
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+def iter_store_orders(store, chunk_size: int = STREAM_CHUNK_SIZE, archived: bool = False):
+    """
+    بيرجع dicts بنفس شكل serialize_order(order) بالظبط، الأحدث الأول.
+    archived=True → من orders_archive بدل orders.
+    """
+    if archived:
+        order, item = ArchivedOrder, ArchivedOrderItem
+        item_join = and_(item.order_id == order.id, item.order_created_at == order.created_at)
+    else:
+        order, item = Order, OrderItem
+        item_join = item.order_id == order.id
+
+    stmt = (
+        select(
+            order.id,
+            order.customer_id,
+            User.full_name,
+            order.status,
+            order.total_amount,
+            order.delivery_fee,
+            order.delivery_method,
+            order.notes,
+            order.created_at,
+            order.updated_at,
+            item.id,
+            item.product_id,
+            item.product_name,
+            item.unit_price,
+            item.quantity,
+            item.subtotal,
+        )
+        .join(User, User.id == order.customer_id)
+        .outerjoin(item, item_join)
+        .where(order.store_id == store.id)
+        .order_by(order.created_at.desc(), order.id.desc(), item.id)
+    )
+
+    result = db.session.execute(stmt.execution_options(yield_per=chunk_size))
+    current = None
+    try:
+        for row in result:
+            (order_id, customer_id, customer_name, status, total, fee, method, notes,
+             created_at, updated_at, item_id, product_id, product_name,
+             unit_price, quantity, subtotal) = row
+
+            if current is None or current["id"] != order_id:
+                if current is not None:
+                    yield current
+                current = {
+                    "id": order_id,
+                    "store_id": store.id,
+                    "store_name": store.name,
+                    "customer_id": customer_id,
+                    "customer_name": customer_name,
+                    "status": status,
+                    "total_amount": float(total or 0),
+                    "delivery_fee": float(fee or 0),
+                    "grand_total": float((total or 0) + (fee or 0)),
+                    "delivery_method": method,
+                    "notes": notes,
+                    "created_at": _iso(created_at),
+                    "updated_at": _iso(updated_at),
+                    "items": [],
+                }
+
+            if item_id is not None:
+                current["items"].append(
+                    {
+                        "id": item_id,
+                        "product_id": product_id,
+                        "product_name": product_name,
+                        "unit_price": float(unit_price),
+                        "quantity": quantity,
+                        "subtotal": float(subtotal),
+                    }
+                )
+        if current is not None:
+            yield current
+    finally:
+        result.close()
+
+
+def merge_newest_first(*streams):
+    """
+    أكتر من stream مترتبين الأحدث الأول (hot + archive) → stream واحد بنفس الترتيب.
+    """
+    return heapq.merge(*streams, key=lambda o: (o["created_at"] or "", o["id"]), reverse=True)
+
+
+def iter_json_array(items):
+    """
+    JSON array بيتكتب incremental: "[" ثم العناصر مفصولة بـ "," ثم "]".
+    """
+    yield "["
+    first = True
+    for item in items:
+        yield ("" if first else ",") + json.dumps(item, ensure_ascii=False)
+        first = False
+    yield "]"
+
+
+def iter_ndjson(items):
+    for item in items:
+        yield json.dumps(item, ensure_ascii=False) + "\n"
@@ -0,0 +1,199 @@
+# app/ratelimit.py
+"""
+Token-bucket rate limiting لكل user (JWT sub) أو IP.
+
+- memory: dict جوه الـ process (كل gunicorn worker له buckets لوحده)
+- sqlite:///path: ملف SQLite مشترك بين كل الـ workers على نفس الجهاز
+الـ budgets لكل route في Config.RATELIMIT_BUDGETS بالشكل "10/minute".
+"""
+import math
+import os
+import sqlite3
+import threading
+import time
+from functools import wraps
+
+import jwt
+from flask import current_app, jsonify, request
+
+from app.auth.tokens import decode_token
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# buckets اللي مستخدمتش من ساعة بتبقى مليانة أصلاً – نمسحها
+_IDLE_SECONDS = 3600
+
+
+def parse_budget(budget: str):
+    """
+    "10/minute" → (capacity=10, rate=10/60 token per second)
+    """
+    count, _, period = budget.partition("/")
+    capacity = int(count)
+    seconds = _PERIODS[period.strip().lower()]
+    return capacity, capacity / seconds
+
+
+def _take(tokens, updated, capacity, rate, now):
+    """
+    بترجع (tokens_after, retry_after). retry_after = 0 يعني الـ request مسموح.
+    """
+    tokens = min(capacity, tokens + (now - updated) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate
+
+
+class MemoryBucketStore:
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: int, rate: float, now: float) -> float:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._prune(now)
+                tokens, retry_after = _take(capacity, now, capacity, rate, now)
+            else:
+                tokens, retry_after = _take(bucket[0], bucket[1], capacity, rate, now)
+            self._buckets[key] = (tokens, now)
+            return retry_after
+
+    def _prune(self, now: float):
+        cutoff = now - _IDLE_SECONDS
+        for key in [k for k, (_, updated) in self._buckets.items() if updated < cutoff]:
+            del self._buckets[key]
+
+
+class SQLiteBucketStore:
+    """
+    bucket واحد = row واحد. BEGIN IMMEDIATE بيعمل lock قصير على الملف
+    فكل workers بيشوفوا نفس العدد. WAL + synchronous=OFF علشان الـ take
+    يفضل في حدود الـ microseconds (لو الجهاز وقع بنخسر شوية counters بس).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._calls = 0
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        # connection جديدة لكل thread ولكل process (بعد الـ fork)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def take(self, key: str, capacity: int, rate: float, now: float) -> float:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                tokens, retry_after = _take(capacity, now, capacity, rate, now)
+            else:
+                tokens, retry_after = _take(row[0], row[1], capacity, rate, now)
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                (key, tokens, now),
+            )
+
+            self._calls += 1
+            if self._calls % 1000 == 0:
+                conn.execute("DELETE FROM buckets WHERE updated < ?", (now - _IDLE_SECONDS,))
+
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return retry_after
+
+
+def create_store(url: str):
+    if url.startswith("sqlite:///"):
+        return SQLiteBucketStore(url[len("sqlite:///"):])
+    return MemoryBucketStore()
+
+
+def init_app(app):
+    app.extensions["ratelimit"] = {
+        "store": create_store(app.config.get("RATELIMIT_STORAGE") or "memory"),
+        "budgets": {
+            scope: parse_budget(budget)
+            for scope, budget in (app.config.get("RATELIMIT_BUDGETS") or {}).items()
+        },
+    }
+
+
+def _client_identity() -> str:
+    """
+    لو فيه توكن سليم → sub (من الـ verified-token cache، فمفيش HMAC غالباً)
+    غير كده → IP (ورا الـ proxy ده الـ client IP بعد ProxyFix، شوف Config.PROXY_FIX_HOPS)
+    """
+    auth_header = request.headers.get("Authorization", "")
+    if auth_header.startswith("Bearer "):
+        try:
+            sub = decode_token(auth_header[7:].strip()).get("sub")
+            if sub:
+                return f"u:{sub}"
+        except jwt.InvalidTokenError:
+            pass
+
+    return f"ip:{request.remote_addr}"
+
+
+def check_rate_limit(scope: str):
+    """
+    بترجع None لو مسموح، أو response 429 فيه Retry-After.
+    """
+    if not current_app.config.get("RATELIMIT_ENABLED", True):
+        return None
+
+    state = current_app.extensions.get("ratelimit")
+    budget = state and state["budgets"].get(scope)
+    if not budget:
+        return None
+
+    capacity, rate = budget
+    key = f"{scope}:{_client_identity()}"
+    retry_after = state["store"].take(key, capacity, rate, time.time())
+    if not retry_after:
+        return None
+
+    response = jsonify({"message": "طلبات كثيرة جداً، حاول مرة أخرى بعد قليل"})
+    response.status_code = 429
+    response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def rate_limit(scope: str, when=None):
+    """
+    @rate_limit("login")
+    @rate_limit("stores_search", when=lambda: bool(request.args.get("search")))
+    """
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if when is None or when():
+                limited = check_rate_limit(scope)
+                if limited is not None:
+                    return limited
+            return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
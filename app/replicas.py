@@ -0,0 +1,153 @@
+# app/replicas.py
+"""
+Read replicas (اختياري): DATABASE_REPLICA_URLS → SQLALCHEMY_BINDS باسم replica_0, replica_1, ...
+
+- GET / HEAD: الـ SELECT العادي بيروح لـ replica (round-robin)
+- أي flush / INSERT / UPDATE / DELETE / SELECT ... FOR UPDATE / text() → الـ primary،
+  ومن ساعتها باقي الـ request كله على الـ primary
+- read-your-writes: بعد commit فيه كتابة من مستخدم، الـ GETs بتاعته بتروح للـ primary
+  لمدة READ_YOUR_WRITES_SECONDS (علشان العميل يشوف الطلب اللي لسه عامله حتى لو الـ replica متأخرة)
+- برا الـ requests (CLI / jobs worker) كله primary
+
+الـ read-your-writes window في ذاكرة الـ process – لو فيه كذا gunicorn worker،
+الـ window بيتسجل في الـ worker اللي استقبل الكتابة بس.
+"""
+import itertools
+import threading
+import time
+
+import jwt
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.sql import Select
+
+REPLICA_BIND_PREFIX = "replica_"
+READ_METHODS = {"GET", "HEAD"}
+
+
+def replica_binds(urls: str) -> dict:
+    """
+    "url1,url2" → {"replica_0": url1, "replica_1": url2}
+    """
+    binds = {}
+    for index, url in enumerate(u.strip() for u in (urls or "").split(",") if u.strip()):
+        if url.startswith("postgres://"):
+            url = url.replace("postgres://", "postgresql://", 1)
+        binds[f"{REPLICA_BIND_PREFIX}{index}"] = url
+    return binds
+
+
+class RecentWrites:
+    """
+    user_id → وقت انتهاء الـ read-your-writes window.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._until = {}
+        self._lock = threading.Lock()
+
+    def mark(self, user_id, seconds: float):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._until) >= self.max_keys:
+                self._until = {k: v for k, v in self._until.items() if v > now}
+            self._until[user_id] = now + seconds
+
+    def active(self, user_id) -> bool:
+        with self._lock:
+            until = self._until.get(user_id)
+        return until is not None and until > time.monotonic()
+
+
+class RoutingSession(Session):
+    """
+    Session بتختار الـ engine حسب نوع الـ statement والـ request الحالي.
+    """
+
+    _replica_counter = itertools.count()
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context() and g.get("db_use_replica"):
+            if self._flushing or not _is_plain_select(clause):
+                # كتابة → الـ primary لباقي الـ request
+                g.db_use_replica = False
+            else:
+                replicas = _replica_engines(self._db.engines)
+                if replicas:
+                    return replicas[next(self._replica_counter) % len(replicas)]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _is_plain_select(clause) -> bool:
+    return isinstance(clause, Select) and clause._for_update_arg is None
+
+
+def _replica_engines(engines):
+    return [engine for key, engine in sorted(engines.items(), key=lambda kv: kv[0] or "")
+            if key and key.startswith(REPLICA_BIND_PREFIX)]
+
+
+def _request_user_id():
+    from app.auth.tokens import decode_token
+
+    auth_header = request.headers.get("Authorization", "")
+    if not auth_header.startswith("Bearer "):
+        return None
+    try:
+        return decode_token(auth_header[7:].strip()).get("sub")
+    except jwt.InvalidTokenError:
+        return None
+
+
+def mark_recent_write(user_id):
+    """
+    لمستخدم لسه متعملش في الـ request ده بتوكن (زي register) – الـ window بيبدأ من دلوقتي.
+    """
+    state = current_app.extensions.get("replicas")
+    if state is not None and state["enabled"] and user_id is not None:
+        state["recent"].mark(str(user_id), current_app.config.get("READ_YOUR_WRITES_SECONDS", 5))
+
+
+def init_app(app, db):
+    state = {"enabled": False, "recent": RecentWrites()}
+    app.extensions["replicas"] = state
+
+    with app.app_context():
+        state["enabled"] = bool(_replica_engines(db.engines))
+
+    if not state["enabled"]:
+        return
+
+    @app.before_request
+    def route_reads():
+        user_id = _request_user_id()
+        g.db_user_id = user_id
+        g.db_use_replica = (
+            request.method in READ_METHODS
+            and not (user_id is not None and state["recent"].active(user_id))
+        )
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _remember_flush(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _remember_dml(orm_execute_state):
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _start_window(session):
+    wrote = session.info.pop("wrote", False)
+    if wrote and has_request_context() and g.get("db_user_id") is not None:
+        mark_recent_write(g.db_user_id)
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _forget_writes(session):
+    session.info.pop("wrote", None)
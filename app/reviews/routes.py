@@ -1,34 +1,41 @@
 from flask import Blueprint, jsonify
+from sqlalchemy.orm import joinedload
 from app.auth.routes import get_current_user_from_request
 from app.models import StoreReview
 
 profile_bp = Blueprint("profile", __name__)
 
-@profile_bp.route("/my-reviews", methods=["GET"])
-def my_reviews():
-    current_user, error = get_current_user_from_request(allowed_roles=["CUSTOMER"])
-    if error:
-        msg, status = error
-        return jsonify({"message": msg}), status
+MY_REVIEWS_LIMIT = 20
 
+
+def recent_customer_reviews(customer_id: int, limit: int = MY_REVIEWS_LIMIT):
     reviews = (
         StoreReview.query
-        .filter_by(customer_id=current_user.id)
+        .filter_by(customer_id=customer_id)
+        .options(joinedload(StoreReview.store))
         .order_by(StoreReview.created_at.desc())
-        .limit(20)
+        .limit(limit)
         .all()
     )
 
-    return jsonify(
-        [
-            {
-                "id": r.id,
-                "store_id": r.store_id,
-                "store_name": r.store.name,
-                "rating": r.rating,
-                "comment": r.comment,
-                "created_at": r.created_at.isoformat(),
-            }
-            for r in reviews
-        ]
-    ), 200
+    return [
+        {
+            "id": r.id,
+            "store_id": r.store_id,
+            "store_name": r.store.name,
+            "rating": r.rating,
+            "comment": r.comment,
+            "created_at": r.created_at.isoformat(),
+        }
+        for r in reviews
+    ]
+
+
+@profile_bp.route("/my-reviews", methods=["GET"])
+def my_reviews():
+    current_user, error = get_current_user_from_request(allowed_roles=["CUSTOMER"])
+    if error:
+        msg, status = error
+        return jsonify({"message": msg}), status
+
+    return jsonify(recent_customer_reviews(current_user.id)), 200
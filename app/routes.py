@@ -1,8 +1,50 @@
 # app/routes.py
 from flask import Blueprint, jsonify
 
+from app.auth.routes import get_current_user_from_request, serialize_user
+from app.models import Store
+from app.orders.routes import recent_customer_orders
+from app.reviews.routes import recent_customer_reviews
+from app.stores.hours import local_time
+from app.stores.routes import serialize_store_with_rating, store_ratings
+
 main_bp = Blueprint("main", __name__)
 
+BOOTSTRAP_RECENT_ORDERS = 10
+
 @main_bp.route("/api/health", methods=["GET"])
 def health():
     return jsonify({"status": "ok", "service": "compound-marketplace-backend"})
+
+
+@main_bp.route("/api/bootstrap", methods=["GET"])
+def bootstrap():
+    """
+    كل اللي الـ app محتاجه وهو بيفتح في request واحد بدل 4
+    (/api/auth/me + /api/stores + /api/orders/my + /api/profile/my-reviews):
+    التوكن بيتفك والـ user بيتجاب مرة واحدة، والباقي queries batch بعدد ثابت
+    (المتاجر + الـ ratings بـ GROUP BY + الطلبات + الـ items بـ IN + الـ reviews).
+    الطلبات والـ reviews للـ CUSTOMER بس – غير كده بيرجعوا [].
+    """
+    current_user, error = get_current_user_from_request()
+    if error:
+        msg, status = error
+        return jsonify({"message": msg}), status
+
+    now = local_time()
+    stores = Store.query.filter_by(is_active=True).order_by(Store.created_at.desc()).all()
+    ratings = store_ratings([s.id for s in stores])
+
+    recent_orders, recent_reviews = [], []
+    if current_user.role == "CUSTOMER":
+        recent_orders = recent_customer_orders(current_user.id, BOOTSTRAP_RECENT_ORDERS)
+        recent_reviews = recent_customer_reviews(current_user.id)
+
+    return jsonify(
+        {
+            "user": serialize_user(current_user),
+            "stores": [serialize_store_with_rating(s, now, ratings.get(s.id, (0, 0))) for s in stores],
+            "recent_orders": recent_orders,
+            "recent_reviews": recent_reviews,
+        }
+    ), 200
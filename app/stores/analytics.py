@@ -0,0 +1,322 @@
+# app/stores/analytics.py
+"""
+Rollups يومية لكل متجر ومنتج. اليوم هو يوم الكمبوند (STORE_TIMEZONE) مش يوم UTC:
+created_at متخزن UTC، فطلب الساعة 23:30 بتوقيت القاهرة بيتحسب في نفس اليوم مش اللي بعده.
+"""
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import and_, case, func, insert
+
+from app import db
+from app.models import (
+    ArchivedOrder,
+    ArchivedOrderItem,
+    Order,
+    OrderItem,
+    ProductDailyStats,
+    StoreDailyStats,
+)
+from app.stores.hours import local_date
+
+analytics_cli = AppGroup("analytics", help="Sales analytics rollups.")
+
+_STORE_COUNTERS = ("orders_count", "delivered_count", "cancelled_count", "revenue")
+_PRODUCT_COUNTERS = ("quantity", "revenue")
+
+CANCELLED_STATUSES = ("CANCELLED", "REJECTED")
+
+
+def _dialect_insert(model):
+    dialect = db.engine.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise RuntimeError(f"Analytics rollups don't support {dialect}")
+    return insert(model)
+
+
+def _upsert_increment(model, key_cols, counters, rows, replace_cols=()):
+    """
+    INSERT ... ON CONFLICT (keys) DO UPDATE SET col = col + excluded.col
+    الـ rows لازم تكون متجمعة (key واحد مرة واحدة) علشان Postgres يقبلها في statement واحد.
+    """
+    if not rows:
+        return
+    stmt = _dialect_insert(model)
+    updates = {col: getattr(model, col) + getattr(stmt.excluded, col) for col in counters}
+    updates.update({col: getattr(stmt.excluded, col) for col in replace_cols})
+    stmt = stmt.on_conflict_do_update(index_elements=list(key_cols), set_=updates)
+    db.session.execute(stmt, rows)
+
+
+def _store_row(store_id, day, **counters):
+    row = {"store_id": store_id, "day": day}
+    row.update({col: 0 for col in _STORE_COUNTERS})
+    row.update(counters)
+    return row
+
+
+def record_order_created(store_id: int, created_at):
+    _upsert_increment(
+        StoreDailyStats,
+        ("store_id", "day"),
+        _STORE_COUNTERS,
+        [_store_row(store_id, local_date(created_at), orders_count=1)],
+    )
+
+
+def record_status_changes(store_id: int, orders, new_status: str):
+    """
+    orders: rows فيها id / created_at / total_amount (جاية من الـ RETURNING).
+    بيتنادى في نفس الـ transaction بتاع الـ status update.
+    """
+    if not orders:
+        return
+
+    if new_status in CANCELLED_STATUSES:
+        per_day = defaultdict(int)
+        for o in orders:
+            per_day[local_date(o.created_at)] += 1
+        _upsert_increment(
+            StoreDailyStats,
+            ("store_id", "day"),
+            _STORE_COUNTERS,
+            [_store_row(store_id, day, cancelled_count=n) for day, n in per_day.items()],
+        )
+        return
+
+    if new_status != "DELIVERED":
+        return
+
+    days = {}
+    per_day = defaultdict(lambda: [0, Decimal("0")])
+    for o in orders:
+        day = local_date(o.created_at)
+        days[o.id] = day
+        per_day[day][0] += 1
+        per_day[day][1] += Decimal(o.total_amount or 0)
+
+    _upsert_increment(
+        StoreDailyStats,
+        ("store_id", "day"),
+        _STORE_COUNTERS,
+        [
+            _store_row(store_id, day, delivered_count=n, revenue=revenue)
+            for day, (n, revenue) in per_day.items()
+        ],
+    )
+
+    items = db.session.query(
+        OrderItem.order_id,
+        OrderItem.product_id,
+        OrderItem.product_name,
+        OrderItem.quantity,
+        OrderItem.subtotal,
+    ).filter(OrderItem.order_id.in_(list(days)))
+
+    per_product = {}
+    for it in items:
+        key = (days[it.order_id], it.product_id)
+        row = per_product.setdefault(
+            key,
+            {
+                "store_id": store_id,
+                "day": key[0],
+                "product_id": it.product_id,
+                "product_name": it.product_name,
+                "quantity": 0,
+                "revenue": Decimal("0"),
+            },
+        )
+        row["quantity"] += it.quantity
+        row["revenue"] += Decimal(it.subtotal or 0)
+
+    _upsert_increment(
+        ProductDailyStats,
+        ("store_id", "day", "product_id"),
+        _PRODUCT_COUNTERS,
+        list(per_product.values()),
+        replace_cols=("product_name",),
+    )
+
+
+def _utc_hour(column):
+    """
+    'YYYY-MM-DD HH' بتوقيت UTC. الـ GROUP BY بالساعة في الـ DB وبعدين كل ساعة بتتحول ليوم الكمبوند
+    في Python (_local_day) – SQLite معندوش time zones، وفرق توقيت القاهرة ساعات كاملة.
+    """
+    if db.engine.dialect.name == "postgresql":
+        return func.to_char(column, "YYYY-MM-DD HH24")
+    return func.strftime("%Y-%m-%d %H", column)
+
+
+def _local_day(hour: str):
+    return local_date(datetime.strptime(hour, "%Y-%m-%d %H"))
+
+
+def _aggregate(order, item, item_join, store_id, store_totals, product_totals):
+    """
+    GROUP BY في الـ DB على جدول طلبات واحد (orders أو orders_archive) والنتيجة بتتجمع في الـ dicts.
+    """
+    hour = _utc_hour(order.created_at)
+    delivered = order.status == "DELIVERED"
+
+    store_rows = db.session.query(
+        order.store_id,
+        hour,
+        func.count(order.id),
+        func.sum(case((delivered, 1), else_=0)),
+        func.sum(case((order.status.in_(CANCELLED_STATUSES), 1), else_=0)),
+        func.sum(case((delivered, order.total_amount), else_=0)),
+    ).group_by(order.store_id, hour)
+
+    product_rows = (
+        db.session.query(
+            order.store_id,
+            hour,
+            item.product_id,
+            func.max(item.product_name),
+            func.sum(item.quantity),
+            func.sum(item.subtotal),
+        )
+        .join(item, item_join)
+        .filter(delivered)
+        .group_by(order.store_id, hour, item.product_id)
+    )
+
+    if store_id is not None:
+        store_rows = store_rows.filter(order.store_id == store_id)
+        product_rows = product_rows.filter(order.store_id == store_id)
+
+    for sid, hour, n, delivered_n, cancelled_n, revenue in store_rows:
+        d = _local_day(hour)
+        row = store_totals.setdefault((sid, d), _store_row(sid, d))
+        row["orders_count"] += n
+        row["delivered_count"] += delivered_n or 0
+        row["cancelled_count"] += cancelled_n or 0
+        row["revenue"] += Decimal(revenue or 0)
+
+    for sid, hour, pid, name, qty, revenue in product_rows:
+        d = _local_day(hour)
+        row = product_totals.setdefault(
+            (sid, d, pid),
+            {"store_id": sid, "day": d, "product_id": pid,
+             "product_name": name, "quantity": 0, "revenue": Decimal("0")},
+        )
+        row["quantity"] += qty or 0
+        row["revenue"] += Decimal(revenue or 0)
+
+
+def rebuild_stats(store_id=None):
+    """
+    يمسح الـ rollups ويحسبها من الأول من orders/order_items + الأرشيف (GROUP BY في الـ DB).
+    """
+    store_q = StoreDailyStats.query
+    product_q = ProductDailyStats.query
+    if store_id is not None:
+        store_q = store_q.filter_by(store_id=store_id)
+        product_q = product_q.filter_by(store_id=store_id)
+    store_q.delete(synchronize_session=False)
+    product_q.delete(synchronize_session=False)
+
+    # نفس اليوم ممكن يبقى جزء منه في orders وجزء في الأرشيف → بنجمعهم قبل الـ insert
+    store_totals, product_totals = {}, {}
+    _aggregate(
+        Order, OrderItem, OrderItem.order_id == Order.id,
+        store_id, store_totals, product_totals,
+    )
+    _aggregate(
+        ArchivedOrder, ArchivedOrderItem,
+        and_(
+            ArchivedOrderItem.order_id == ArchivedOrder.id,
+            ArchivedOrderItem.order_created_at == ArchivedOrder.created_at,
+        ),
+        store_id, store_totals, product_totals,
+    )
+
+    store_stats = list(store_totals.values())
+    product_stats = list(product_totals.values())
+
+    if store_stats:
+        db.session.execute(insert(StoreDailyStats), store_stats)
+    if product_stats:
+        db.session.execute(insert(ProductDailyStats), product_stats)
+    db.session.commit()
+    return len(store_stats), len(product_stats)
+
+
+def store_analytics(store_id: int, date_from: date, date_to: date, top: int = 10):
+    """
+    كل الأرقام من الـ rollups – الوقت بيعتمد على عدد الأيام مش على حجم الـ history.
+    """
+    days = (
+        StoreDailyStats.query.filter(
+            StoreDailyStats.store_id == store_id,
+            StoreDailyStats.day >= date_from,
+            StoreDailyStats.day <= date_to,
+        )
+        .order_by(StoreDailyStats.day.asc())
+        .all()
+    )
+
+    top_products = (
+        db.session.query(
+            ProductDailyStats.product_id,
+            func.max(ProductDailyStats.product_name),
+            func.sum(ProductDailyStats.quantity),
+            func.sum(ProductDailyStats.revenue),
+        )
+        .filter(
+            ProductDailyStats.store_id == store_id,
+            ProductDailyStats.day >= date_from,
+            ProductDailyStats.day <= date_to,
+        )
+        .group_by(ProductDailyStats.product_id)
+        .order_by(func.sum(ProductDailyStats.quantity).desc())
+        .limit(top)
+        .all()
+    )
+
+    return {
+        "from": date_from.isoformat(),
+        "to": date_to.isoformat(),
+        "totals": {
+            "orders_count": sum(d.orders_count for d in days),
+            "delivered_count": sum(d.delivered_count for d in days),
+            "cancelled_count": sum(d.cancelled_count for d in days),
+            "revenue": float(sum((d.revenue for d in days), Decimal("0"))),
+        },
+        "days": [
+            {
+                "day": d.day.isoformat(),
+                "orders_count": d.orders_count,
+                "delivered_count": d.delivered_count,
+                "cancelled_count": d.cancelled_count,
+                "revenue": float(d.revenue or 0),
+            }
+            for d in days
+        ],
+        "top_products": [
+            {
+                "product_id": pid,
+                "name": name,
+                "quantity": int(qty or 0),
+                "revenue": float(revenue or 0),
+            }
+            for pid, name, qty, revenue in top_products
+        ],
+    }
+
+
+@analytics_cli.command("rebuild")
+@click.option("--store-id", type=int, default=None, help="Rebuild a single store only.")
+def rebuild_command(store_id):
+    """Recompute store/product daily rollups from orders."""
+    stores_n, products_n = rebuild_stats(store_id)
+    click.echo(f"Rebuilt {stores_n} store-day rows and {products_n} product-day rows")
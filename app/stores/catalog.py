@@ -0,0 +1,163 @@
+# app/stores/catalog.py
+"""
+منيو المتجر (المنتجات النشطة) متخزن serialized حسب (store_id, catalog_version):
+
+- Store.catalog_version بيزيد (bump_catalog_version) في نفس الـ transaction بتاع أي تعديل
+  في المنتجات أو بيانات المتجر – فالـ snapshot القديم عمره ما بيترجع بالغلط
+- الـ snapshot بيتكتب ملف في CATALOG_CACHE_DIR (atomic بـ os.replace) – كل الـ workers
+  على نفس الجهاز بيشاركوه، فأول worker بس هو اللي بيعمل query للمنتجات بعد كل تعديل
+- وفوقه نسخة في ذاكرة الـ process (آخر version لكل متجر) علشان منقراش الملف كل مرة
+- الـ response كامل (المنتجات + بيانات المتجر) بيتخزن لكل متجر مع الـ ETag بتاعه كـ
+  PrecompressedBody، فالـ gzip / brotli بيتعمل مرة لكل ETag مش مع كل request
+"""
+import glob
+import os
+import tempfile
+import threading
+
+from flask import current_app
+from sqlalchemy import update
+
+from app import db
+from app.compression import PrecompressedBody
+from app.models import Product, Store
+from app.tenancy import current_tenant_id
+
+_lock = threading.Lock()
+_memory = {}  # (tenant_id, store_id) → (version, body)
+_responses = {}  # (tenant_id, store_id) → (etag, PrecompressedBody)
+
+
+def bump_catalog_version(store_id: int):
+    """
+    UPDATE stores SET catalog_version = catalog_version + 1 – الـ commit على اللي نادى.
+    """
+    db.session.execute(
+        update(Store)
+        .where(Store.id == store_id)
+        .values(catalog_version=Store.catalog_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def serialize_catalog_product(p: Product):
+    return {
+        "id": p.id,
+        "name": p.name,
+        "description": p.description,
+        "price": float(p.price),
+        "image_url": p.image_url,
+        "stock": p.stock,
+        "is_active": p.is_active,
+    }
+
+
+def _cache_dir() -> str:
+    return current_app.config.get("CATALOG_CACHE_DIR") or os.path.join(
+        tempfile.gettempdir(), "airnav-catalog"
+    )
+
+
+def _path(tenant_id, store_id: int, version: int) -> str:
+    return os.path.join(_cache_dir(), f"{tenant_id}-{store_id}-{version}.json")
+
+
+def _read_file(path: str):
+    try:
+        with open(path, "rb") as fh:
+            return fh.read()
+    except OSError:
+        return None
+
+
+def _write_file(tenant_id, store_id: int, version: int, body: bytes):
+    path = _path(tenant_id, store_id, version)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(body)
+        os.replace(tmp, path)
+    except OSError:
+        current_app.logger.warning("Could not write catalog snapshot %s", path, exc_info=True)
+        return
+
+    # الـ versions القديمة لنفس المتجر مبقاش ليها لازمة
+    for old in glob.glob(os.path.join(_cache_dir(), f"{tenant_id}-{store_id}-*.json")):
+        if old != path:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+
+def _load_body(store_id: int) -> bytes:
+    products = (
+        Product.query
+        .filter_by(store_id=store_id, is_active=True)
+        .order_by(Product.created_at.asc())
+        .all()
+    )
+    return current_app.json.dumps([serialize_catalog_product(p) for p in products]).encode("utf-8")
+
+
+def catalog_body(store: Store) -> bytes:
+    """
+    JSON array المنتجات النشطة للمتجر بالـ catalog_version الحالي (bytes جاهزة للـ response).
+    """
+    tenant_id = current_tenant_id()
+    key = (tenant_id, store.id)
+    version = store.catalog_version
+
+    cached = _memory.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    body = _read_file(_path(tenant_id, store.id, version))
+    if body is None:
+        body = _load_body(store.id)
+        _write_file(tenant_id, store.id, version, body)
+
+    with _lock:
+        current = _memory.get(key)
+        if current is None or current[0] <= version:
+            _memory[key] = (version, body)
+    return body
+
+
+def catalog_etag(store: Store, store_data: dict) -> str:
+    """
+    الـ response فيه حاجات بتتغير من غير bump للـ version (is_open_now والـ rating)،
+    فلازم يبقوا جزء من الـ ETag وإلا الـ 304 هيرجّع متجر مقفول على إنه مفتوح.
+    """
+    return (
+        f"catalog-{current_tenant_id()}-{store.id}-{store.catalog_version}"
+        f"-{int(store_data['is_open_now'])}-{store_data['reviews_count']}-{store_data['avg_rating']}"
+    )
+
+
+def catalog_response(store: Store, store_data: dict, etag: str):
+    """
+    {"products": [...], "store": {...}} – الـ ETag بيتغير مع أي حاجة في الاتنين، فنفس الـ ETag
+    يعني نفس الـ bytes ونقدر نرجّع النسخة المضغوطة المتخزنة.
+    """
+    key = (current_tenant_id(), store.id)
+    cached = _responses.get(key)
+    if cached is not None and cached[0] == etag:
+        return cached[1].response()
+
+    # المنتجات bytes جاهزة من الـ snapshot – بنلزقها في الـ JSON من غير ما نعيد الـ serialize
+    snapshot = PrecompressedBody(
+        b"".join(
+            [
+                b'{"products":',
+                catalog_body(store),
+                b',"store":',
+                current_app.json.dumps(store_data).encode("utf-8"),
+                b"}",
+            ]
+        )
+    )
+    with _lock:
+        _responses[key] = (etag, snapshot)
+    return snapshot.response()
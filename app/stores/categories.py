@@ -0,0 +1,87 @@
+# app/stores/categories.py
+"""
+تصنيفات المتاجر (store_categories) + عدد المتاجر النشطة في كل تصنيف.
+الـ aggregate بيتحسب مرة ويتخزن في الذاكرة لحد ما:
+- متجر يتعدل/يتنشأ في نفس الـ process (invalidate_category_cache)
+- أو يعدي CATEGORY_CACHE_SECONDS (علشان تعديلات الـ workers التانية توصل)
+الـ counts لكل كمبوند لوحده (الـ cache متخزن بالـ tenant_id).
+الـ response نفسه متخزن مضغوط (PrecompressedJSON) مع الـ entry.
+"""
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import and_, func
+
+from app import db
+from app.compression import PrecompressedJSON
+from app.models import Store, StoreCategory
+from app.tenancy import current_tenant_id
+
+_lock = threading.Lock()
+_cache = {}  # tenant_id → {"expires_at", "facets", "codes", "body"}
+
+
+def normalize_category(value):
+    return (value or "").strip().upper() or None
+
+
+def _load():
+    rows = (
+        db.session.query(
+            StoreCategory.code,
+            StoreCategory.name,
+            func.count(Store.id),
+        )
+        .outerjoin(
+            Store,
+            and_(Store.category == StoreCategory.code, Store.is_active == True),
+        )
+        .filter(StoreCategory.is_active == True)
+        .group_by(StoreCategory.code, StoreCategory.name, StoreCategory.sort_order)
+        .order_by(StoreCategory.sort_order.asc(), StoreCategory.code.asc())
+        .all()
+    )
+    facets = [
+        {"code": code, "name": name, "stores_count": int(count)}
+        for code, name, count in rows
+    ]
+    return facets, {f["code"] for f in facets}
+
+
+def _cached():
+    now = time.monotonic()
+    tenant_id = current_tenant_id()
+    entry = _cache.get(tenant_id)
+    if entry is not None and now < entry["expires_at"]:
+        return entry
+
+    with _lock:
+        entry = _cache.get(tenant_id)
+        if entry is None or now >= entry["expires_at"]:
+            facets, codes = _load()
+            entry = {
+                "facets": facets,
+                "codes": codes,
+                "body": PrecompressedJSON(facets),
+                "expires_at": now + current_app.config.get("CATEGORY_CACHE_SECONDS", 60),
+            }
+            _cache[tenant_id] = entry
+    return entry
+
+
+def category_facets():
+    return _cached()["facets"]
+
+
+def category_facets_response():
+    return _cached()["body"].response()
+
+
+def is_valid_category(code) -> bool:
+    return code in _cached()["codes"]
+
+
+def invalidate_category_cache():
+    with _lock:
+        _cache.pop(current_tenant_id(), None)
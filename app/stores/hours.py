@@ -0,0 +1,77 @@
+# app/stores/hours.py
+"""
+مواعيد فتح المتاجر (open_from / open_to) بتوقيت الكمبوند (STORE_TIMEZONE).
+
+- open_from أو open_to مش متحدد → مفتوح دايماً
+- open_from == open_to → مفتوح 24 ساعة
+- open_from < open_to → open_from <= now < open_to
+- open_from > open_to (بيعدي نص الليل، زي 18:00 → 02:00) → now >= open_from أو now < open_to
+is_open_at و open_now_clause لازم يفضلوا بنفس المنطق.
+"""
+from datetime import date, datetime, time, timezone
+from zoneinfo import ZoneInfo
+
+from flask import current_app
+from sqlalchemy import and_, or_
+
+from app.models import Store
+
+
+def store_timezone() -> ZoneInfo:
+    return ZoneInfo(current_app.config.get("STORE_TIMEZONE", "Africa/Cairo"))
+
+
+def local_time(now: datetime = None) -> time:
+    """
+    الوقت الحالي (أو now) بتوقيت الكمبوند، من غير tzinfo علشان نقارنه بعمود Time.
+    """
+    now = now or datetime.now(timezone.utc)
+    if now.tzinfo is None:
+        now = now.replace(tzinfo=timezone.utc)
+    return now.astimezone(store_timezone()).time().replace(tzinfo=None)
+
+
+def local_date(at: datetime = None) -> date:
+    """
+    اليوم بتوقيت الكمبوند (الـ business day بتاع الـ analytics) لـ at أو دلوقتي.
+    at من غير tzinfo معناه UTC (زي created_at في الـ DB).
+    """
+    at = at or datetime.now(timezone.utc)
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=timezone.utc)
+    return at.astimezone(store_timezone()).date()
+
+
+def is_open_at(open_from, open_to, at: time) -> bool:
+    if open_from is None or open_to is None or open_from == open_to:
+        return True
+    if open_from < open_to:
+        return open_from <= at < open_to
+    return at >= open_from or at < open_to
+
+
+def open_now_clause(at: time):
+    """
+    نفس is_open_at كـ SQL expression – الفلترة بتحصل في الـ DB على
+    ix_stores_active_hours بدل ما نجيب كل المتاجر ونفلتر في Python.
+    """
+    return or_(
+        Store.open_from.is_(None),
+        Store.open_to.is_(None),
+        Store.open_from == Store.open_to,
+        and_(Store.open_from < Store.open_to, Store.open_from <= at, Store.open_to > at),
+        and_(Store.open_from > Store.open_to, or_(Store.open_from <= at, Store.open_to > at)),
+    )
+
+
+def parse_time(value):
+    """
+    "HH:MM" أو "HH:MM:SS" → time. None / "" → None. غير كده ValueError.
+    """
+    if value is None or value == "":
+        return None
+    return time.fromisoformat(str(value).strip())
+
+
+def format_time(value):
+    return value.strftime("%H:%M") if value else None
@@ -0,0 +1,258 @@
+# app/stores/imports.py
+"""
+Import للمنيو من CSV أو XLSX:
+- الملف بيتقرا row بـ row (csv.DictReader / openpyxl read_only) – مش بيتحمل كله في الذاكرة
+- كل CHUNK_SIZE row بيتعملهم upsert بـ apply_product_batch في transaction واحد
+- الـ rows الغلط بتتسجل في errors ومبتوقفش الباقي
+- الشغل بيحصل في الـ job queue (flask jobs worker)، والـ request بيرجع job id على طول.
+  الـ Job بيتسجل في نفس الـ transaction بتاع ProductImportJob، فلو الـ worker مات أو اتعمل
+  deploy الـ import بيتاخد تاني (JOBS_LOCK_TIMEOUT) بدل ما يفضل QUEUED / RUNNING على طول
+- الملف بيتحفظ في IMPORT_ROOT (برا MEDIA_ROOT اللي بيتعمله serve للناس)، ولازم يبقى متشارك
+  بين الـ web والـ worker
+
+الأعمدة: id (اختياري) , name , description , price , stock , image_url , is_active
+لو id مش موجود، المنتج بيتطابق بالاسم (case-insensitive) جوه نفس المتجر.
+"""
+import csv
+import json
+import logging
+import os
+from datetime import datetime
+
+from sqlalchemy import func
+
+from app import db
+from app.jobs.queue import enqueue, job
+from app.models import Product, ProductImportJob
+from app.orders.pricing import invalidate_store_pricing
+from app.stores.catalog import bump_catalog_version
+from app.stores.products import apply_product_batch, parse_product_fields
+from app.tenancy import use_tenant
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_IMPORT_EXTENSIONS = {"csv", "xlsx"}
+CHUNK_SIZE = 200
+MAX_REPORTED_ERRORS = 200
+
+_COLUMNS = ("id", "name", "description", "price", "stock", "image_url", "is_active")
+_TRUE_VALUES = {"1", "true", "yes", "y", "نعم"}
+
+
+def _iter_csv_rows(path):
+    with open(path, newline="", encoding="utf-8-sig") as fh:
+        for number, row in enumerate(csv.DictReader(fh), start=2):
+            yield number, row
+
+
+def _iter_xlsx_rows(path):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise RuntimeError("XLSX import requires openpyxl")
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        header = [str(h) if h is not None else "" for h in header]
+        for number, values in enumerate(rows, start=2):
+            if values is None or all(v is None for v in values):
+                continue
+            yield number, dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def iter_rows(path):
+    """
+    (row_number, dict) – الـ keys lowercase ومن غير مسافات، والخلايا الفاضية مش موجودة.
+    row_number بيبدأ من 2 (الـ header هو row 1) علشان يطابق الشيت.
+    """
+    reader = _iter_xlsx_rows(path) if path.lower().endswith(".xlsx") else _iter_csv_rows(path)
+    for number, raw in reader:
+        row = {}
+        for key, value in raw.items():
+            key = (key or "").strip().lower()
+            if key not in _COLUMNS or value is None:
+                continue
+            if isinstance(value, str):
+                value = value.strip()
+                if value == "":
+                    continue
+            row[key] = value
+        if "is_active" in row and isinstance(row["is_active"], str):
+            row["is_active"] = row["is_active"].lower() in _TRUE_VALUES
+        yield number, row
+
+
+def _existing_products(store_id, rows):
+    ids, names = set(), set()
+    for _, row in rows:
+        if "id" in row:
+            try:
+                ids.add(int(row["id"]))
+            except (TypeError, ValueError):
+                pass
+        if "name" in row:
+            names.add(str(row["name"]).lower())
+
+    by_id, by_name = set(), {}
+    if ids or names:
+        query = db.session.query(Product.id, Product.name).filter(
+            Product.store_id == store_id,
+            db.or_(Product.id.in_(ids), func.lower(Product.name).in_(names)),
+        )
+        for pid, name in query:
+            by_id.add(pid)
+            by_name.setdefault(name.lower(), pid)
+    return by_id, by_name
+
+
+def _apply_chunk(job, rows, seen_ids, seen_names):
+    """
+    rows: [(row_number, row)] → operations لـ apply_product_batch (بعد ما نشيل الـ rows الغلط).
+    seen_ids / seen_names: المنتجات اللي ظهرت في الـ chunks اللي فاتت من نفس الملف – أي row
+    تاني لنفس المنتج (بالـ id أو بالاسم) بيتسجل "مكرر" بدل ما يتعمل منتج تاني أو يكتب فوق الأول.
+    """
+    by_id, by_name = _existing_products(job.store_id, rows)
+    operations, errors = [], []
+
+    for number, row in rows:
+        product_id = None
+        name = str(row["name"]).lower() if "name" in row else None
+        if "id" in row:
+            try:
+                product_id = int(row["id"])
+            except (TypeError, ValueError):
+                errors.append({"row": number, "error": "رقم المنتج غير صالح"})
+                continue
+            if product_id not in by_id:
+                errors.append({"row": number, "error": "المنتج غير موجود"})
+                continue
+            duplicate = product_id in seen_ids
+        else:
+            if name is not None:
+                product_id = by_name.get(name)
+            duplicate = name in seen_names or product_id in seen_ids
+
+        fields, error = parse_product_fields(row, partial=product_id is not None)
+        if error:
+            errors.append({"row": number, "error": error})
+            continue
+
+        if duplicate:
+            errors.append({"row": number, "error": "المنتج مكرر في الملف"})
+            continue
+        if product_id is not None:
+            seen_ids.add(product_id)
+        if name is not None:
+            seen_names.add(name)
+
+        if product_id is None:
+            operations.append(dict(fields, op="create"))
+        else:
+            operations.append(dict(fields, op="update", id=product_id))
+
+    results = []
+    if operations:
+        results, ok = apply_product_batch(job.store_id, operations)
+        if not ok:
+            # مش المفروض يحصل بعد الـ validation اللي فوق
+            db.session.rollback()
+            raise RuntimeError("Import chunk failed validation")
+        bump_catalog_version(job.store_id)
+
+    job.processed_rows += len(rows)
+    job.created_count += sum(1 for r in results if r["status"] == "created")
+    job.updated_count += sum(1 for r in results if r["status"] == "updated")
+    job.error_count += len(errors)
+    if errors:
+        reported = json.loads(job.errors) if job.errors else []
+        room = MAX_REPORTED_ERRORS - len(reported)
+        if room > 0:
+            job.errors = json.dumps(reported + errors[:room], ensure_ascii=False)
+
+    db.session.commit()
+    if operations:
+        invalidate_store_pricing(job.store_id)
+
+
+def run_import(job_id: int):
+    job = db.session.get(ProductImportJob, job_id)
+    if job is None or job.status not in ("QUEUED", "RUNNING"):
+        return
+
+    if job.status == "RUNNING":
+        # محاولة سابقة وقفت في النص (الـ worker مات) – بنعيد الملف من الأول. الـ chunks اللي
+        # اتطبقت قبل كده بتتطابق بالـ id / الاسم فبتبقى update مش منتجات مكررة
+        job.processed_rows = job.created_count = job.updated_count = job.error_count = 0
+        job.errors = None
+
+    job.status = "RUNNING"
+    job.started_at = datetime.utcnow()
+    db.session.commit()
+
+    try:
+        chunk = []
+        seen_ids, seen_names = set(), set()
+        for number, row in iter_rows(job.file_path):
+            chunk.append((number, row))
+            if len(chunk) >= CHUNK_SIZE:
+                _apply_chunk(job, chunk, seen_ids, seen_names)
+                chunk = []
+        if chunk:
+            _apply_chunk(job, chunk, seen_ids, seen_names)
+        job.status = "DONE"
+    except Exception as exc:
+        logger.exception("Product import %s failed", job_id)
+        db.session.rollback()
+        job = db.session.get(ProductImportJob, job_id)
+        job.status = "FAILED"
+        reported = json.loads(job.errors) if job.errors else []
+        job.errors = json.dumps(reported + [{"row": None, "error": str(exc)}], ensure_ascii=False)
+    finally:
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        try:
+            os.remove(job.file_path)
+        except OSError:
+            pass
+
+
+@job("stores.import_products")
+def import_products_task(import_id: int):
+    record = db.session.get(ProductImportJob, import_id)
+    if record is None:
+        return
+    # المنتجات الجديدة بتاخد tenant_id بتاع الـ request اللي رفع الملف
+    with use_tenant(record.tenant_id):
+        run_import(import_id)
+
+
+def submit_import(record: ProductImportJob):
+    """
+    بيضيف الـ Job للـ session من غير commit – الـ route بيعمل commit للاتنين مع بعض.
+    run_import بيسجل الفشل في ProductImportJob بنفسه، فالـ retries بتاعة الـ queue
+    بس للحالات اللي الـ worker نفسه وقع فيها.
+    """
+    db.session.flush()
+    enqueue("stores.import_products", {"import_id": record.id}, max_attempts=3)
+
+
+def serialize_import_job(job: ProductImportJob):
+    return {
+        "id": job.id,
+        "filename": job.filename,
+        "status": job.status,
+        "processed_rows": job.processed_rows,
+        "created_count": job.created_count,
+        "updated_count": job.updated_count,
+        "error_count": job.error_count,
+        "errors": json.loads(job.errors) if job.errors else [],
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
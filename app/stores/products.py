@@ -0,0 +1,161 @@
+# app/stores/products.py
+"""
+Batch create/update/delete للمنتجات في transaction واحد.
+نفس قواعد الـ validation بتاعة POST / PUT /api/stores/my/products.
+"""
+from datetime import datetime
+
+from sqlalchemy import delete, insert, update
+
+from app import db
+from app.models import Product
+
+MAX_BATCH_OPERATIONS = 200
+
+BATCH_OPS = ("create", "update", "delete")
+
+
+def parse_product_fields(data: dict, partial: bool = False):
+    """
+    بترجع (fields, error). partial=True للـ update: بناخد بس المفاتيح الموجودة.
+    """
+    fields = {}
+
+    if not partial or "name" in data:
+        name = (data.get("name") or "").strip()
+        if not name:
+            if partial:
+                return None, "اسم المنتج لا يمكن أن يكون فارغاً"
+            return None, "اسم المنتج مطلوب"
+        fields["name"] = name
+
+    for key in ("description", "image_url"):
+        if not partial or key in data:
+            fields[key] = data.get(key)
+
+    if not partial or "price" in data:
+        try:
+            fields["price"] = float(data.get("price"))
+        except (TypeError, ValueError):
+            return None, "سعر المنتج غير صالح"
+
+    if not partial or "stock" in data:
+        try:
+            fields["stock"] = int(data.get("stock", 0))
+        except (TypeError, ValueError):
+            fields["stock"] = 0
+
+    if not partial or "is_active" in data:
+        fields["is_active"] = bool(data.get("is_active", True))
+
+    return fields, None
+
+
+def apply_product_batch(store_id: int, operations):
+    """
+    operations: [{"op": "create", ...fields}, {"op": "update", "id": 5, ...}, {"op": "delete", "id": 7}]
+    - بيعمل validate للكل الأول؛ لو فيه أي غلط مفيش حاجة بتتنفذ (ok=False)
+    - بعدين: INSERT واحد (executemany + RETURNING)، bulk UPDATE by PK، و DELETE ... WHERE id IN
+    بترجع (results, ok). الـ commit على اللي نادى.
+    """
+    referenced = []
+    for op in operations:
+        if isinstance(op, dict) and op.get("op") in ("update", "delete"):
+            try:
+                referenced.append(int(op.get("id")))
+            except (TypeError, ValueError):
+                pass
+
+    owned = set()
+    if referenced:
+        owned = {
+            pid
+            for (pid,) in db.session.query(Product.id).filter(
+                Product.store_id == store_id, Product.id.in_(referenced)
+            )
+        }
+
+    results = []
+    creates, updates, deletes = [], [], []
+    seen_ids = set()
+    ok = True
+
+    for index, op in enumerate(operations):
+        kind = op.get("op") if isinstance(op, dict) else None
+        result = {"index": index, "op": kind}
+        results.append(result)
+
+        if kind not in BATCH_OPS:
+            result["error"] = "نوع العملية غير صالح"
+            ok = False
+            continue
+
+        if kind == "create":
+            fields, error = parse_product_fields(op)
+            if error:
+                result["error"] = error
+                ok = False
+                continue
+            creates.append((result, fields))
+            continue
+
+        try:
+            product_id = int(op.get("id"))
+        except (TypeError, ValueError):
+            result["error"] = "رقم المنتج غير صالح"
+            ok = False
+            continue
+
+        result["id"] = product_id
+        if product_id not in owned:
+            result["error"] = "المنتج غير موجود"
+            ok = False
+            continue
+        if product_id in seen_ids:
+            result["error"] = "المنتج مكرر في نفس الدفعة"
+            ok = False
+            continue
+        seen_ids.add(product_id)
+
+        if kind == "delete":
+            deletes.append(product_id)
+            continue
+
+        fields, error = parse_product_fields(op, partial=True)
+        if error:
+            result["error"] = error
+            ok = False
+            continue
+        updates.append(dict(fields, id=product_id))
+
+    if not ok:
+        return results, False
+
+    now = datetime.utcnow()
+
+    if creates:
+        new_ids = db.session.execute(
+            insert(Product).returning(Product.id, sort_by_parameter_order=True),
+            [
+                dict(fields, store_id=store_id, created_at=now, updated_at=now)
+                for _, fields in creates
+            ],
+        ).scalars().all()
+        for (result, _), new_id in zip(creates, new_ids):
+            result["id"] = new_id
+
+    if updates:
+        # ORM bulk UPDATE by primary key – executemany لكل مجموعة مفاتيح
+        db.session.execute(update(Product), [dict(row, updated_at=now) for row in updates])
+
+    if deletes:
+        db.session.execute(
+            delete(Product)
+            .where(Product.store_id == store_id, Product.id.in_(deletes))
+            .execution_options(synchronize_session=False)
+        )
+
+    for result in results:
+        result["status"] = {"create": "created", "update": "updated", "delete": "deleted"}[result["op"]]
+
+    return results, True
@@ -1,9 +1,26 @@
-from flask import Blueprint, jsonify, request
+import os
+import uuid
+
+from flask import Blueprint, jsonify, request, current_app
+from werkzeug.utils import secure_filename
 from app import db
 from app.auth.routes import get_current_user_from_request
 from sqlalchemy import func
-from app.models import Store, Product, StoreReview
-from datetime import datetime
+from app.models import Store, Product, StoreReview, ProductImportJob
+from app.ratelimit import rate_limit
+from app.stores.analytics import store_analytics
+from app.stores.hours import local_date, local_time, is_open_at, open_now_clause, parse_time, format_time
+from app.stores.products import MAX_BATCH_OPERATIONS, apply_product_batch
+from app.stores.imports import ALLOWED_IMPORT_EXTENSIONS, submit_import, serialize_import_job
+from app.orders.pricing import invalidate_store_pricing
+from app.stores.catalog import bump_catalog_version, catalog_etag, catalog_response, serialize_catalog_product
+from app.stores.categories import (
+    category_facets_response,
+    invalidate_category_cache,
+    is_valid_category,
+    normalize_category,
+)
+from datetime import datetime, date, timedelta
 
 stores_bp = Blueprint("stores", __name__)
 
@@ -35,6 +52,8 @@ def my_store():
                 "delivery_fee": float(store.delivery_fee or 0),
                 "profile_image_url": store.profile_image_url,
                 "is_active": store.is_active,
+                "open_from": format_time(store.open_from),
+                "open_to": format_time(store.open_to),
             }
         ), 200
 
@@ -54,7 +73,10 @@ def my_store():
 
     store.name = name
     store.description = (data.get("description") or "").strip() or None
-    store.category = data.get("category") or store.category
+    category = normalize_category(data.get("category")) or store.category
+    if not is_valid_category(category):
+        return jsonify({"message": "تصنيف المتجر غير صالح"}), 400
+    store.category = category
 
     min_order_amount = data.get("min_order_amount")
     delivery_fee = data.get("delivery_fee")
@@ -65,11 +87,22 @@ def my_store():
     except (TypeError, ValueError):
         return jsonify({"message": "قيمة الحد الأدنى أو مصاريف التوصيل غير صالحة"}), 400
 
+    # مواعيد العمل "HH:MM" (null = مفتوح دايماً)
+    if "open_from" in data or "open_to" in data:
+        try:
+            store.open_from = parse_time(data.get("open_from"))
+            store.open_to = parse_time(data.get("open_to"))
+        except ValueError:
+            return jsonify({"message": "مواعيد العمل غير صالحة (HH:MM)"}), 400
+
     # صورة البروفايل (لو جت من الـ Frontend بعد الـ upload)
     if "profile_image_url" in data:
         store.profile_image_url = data.get("profile_image_url") or None
 
+    bump_catalog_version(store.id)
     db.session.commit()
+    invalidate_category_cache()
+    invalidate_store_pricing(store.id)
 
     return jsonify(
         {
@@ -81,6 +114,8 @@ def my_store():
             "delivery_fee": float(store.delivery_fee or 0),
             "profile_image_url": store.profile_image_url,
             "is_active": store.is_active,
+            "open_from": format_time(store.open_from),
+            "open_to": format_time(store.open_to),
         }
     ), 200
 
@@ -99,13 +134,22 @@ def create_or_update_my_store():
     data = request.get_json() or {}
     name = (data.get("name") or "").strip()
     description = data.get("description")
-    category = data.get("category") or "FOOD"
+    category = normalize_category(data.get("category")) or "FOOD"
     min_order_amount = data.get("min_order_amount") or 0
     delivery_fee = data.get("delivery_fee") or 0
 
     if not name:
         return jsonify({"message": "اسم المتجر مطلوب"}), 400
 
+    if not is_valid_category(category):
+        return jsonify({"message": "تصنيف المتجر غير صالح"}), 400
+
+    try:
+        open_from = parse_time(data.get("open_from"))
+        open_to = parse_time(data.get("open_to"))
+    except ValueError:
+        return jsonify({"message": "مواعيد العمل غير صالحة (HH:MM)"}), 400
+
     store = Store.query.filter_by(owner_id=current_user.id).first()
 
     if not store:
@@ -117,6 +161,8 @@ def create_or_update_my_store():
             category=category,
             min_order_amount=min_order_amount,
             delivery_fee=delivery_fee,
+            open_from=open_from,
+            open_to=open_to,
             is_active=True,
         )
         db.session.add(store)
@@ -127,8 +173,13 @@ def create_or_update_my_store():
         store.category = category
         store.min_order_amount = min_order_amount
         store.delivery_fee = delivery_fee
+        store.open_from = open_from
+        store.open_to = open_to
+        bump_catalog_version(store.id)
 
     db.session.commit()
+    invalidate_category_cache()
+    invalidate_store_pricing(store.id)
 
     return jsonify(
         {
@@ -140,6 +191,8 @@ def create_or_update_my_store():
             "min_order_amount": float(store.min_order_amount or 0),
             "delivery_fee": float(store.delivery_fee or 0),
             "is_active": store.is_active,
+            "open_from": format_time(store.open_from),
+            "open_to": format_time(store.open_to),
         }
     ), 200
 
@@ -218,19 +271,110 @@ def create_product():
     )
 
     db.session.add(product)
+    bump_catalog_version(store.id)
     db.session.commit()
+    invalidate_store_pricing(store.id)
 
-    return jsonify(
-        {
-            "id": product.id,
-            "name": product.name,
-            "description": product.description,
-            "price": float(product.price),
-            "image_url": product.image_url,
-            "stock": product.stock,
-            "is_active": product.is_active,
-        }
-    ), 201
+    return jsonify(serialize_catalog_product(product)), 201
+
+@stores_bp.route("/my/products", methods=["PATCH"])
+def batch_products():
+    """
+    body: { "operations": [
+        { "op": "create", "name": "...", "price": 10, "stock": 5 },
+        { "op": "update", "id": 12, "stock": 0 },
+        { "op": "delete", "id": 13 }
+    ] }
+    كله في transaction واحد: لو أي عملية فيها غلط مفيش حاجة بتتنفذ (400 + results).
+    """
+    current_user, error = get_current_user_from_request(allowed_roles=["SELLER"])
+    if error:
+        msg, status = error
+        return jsonify({"message": msg}), status
+
+    store = Store.query.filter_by(owner_id=current_user.id).first()
+    if not store:
+        return jsonify({"message": "لم يتم إنشاء متجر بعد"}), 404
+
+    data = request.get_json() or {}
+    operations = data.get("operations")
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"message": "قائمة العمليات فارغة"}), 400
+
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return jsonify({"message": f"الحد الأقصى {MAX_BATCH_OPERATIONS} عملية في المرة"}), 400
+
+    results, ok = apply_product_batch(store.id, operations)
+    if not ok:
+        db.session.rollback()
+        return jsonify({"message": "بعض العمليات غير صالحة", "results": results}), 400
+
+    bump_catalog_version(store.id)
+    db.session.commit()
+    invalidate_store_pricing(store.id)
+    return jsonify({"results": results}), 200
+
+@stores_bp.route("/my/products/import", methods=["POST"])
+@rate_limit("uploads")
+def import_products():
+    """
+    multipart: file = menu.csv / menu.xlsx
+    بيرجع 202 + job على طول؛ الاستيراد نفسه بيحصل في الـ job worker.
+    """
+    current_user, error = get_current_user_from_request(allowed_roles=["SELLER"])
+    if error:
+        msg, status = error
+        return jsonify({"message": msg}), status
+
+    store = Store.query.filter_by(owner_id=current_user.id).first()
+    if not store:
+        return jsonify({"message": "لم يتم إنشاء متجر بعد"}), 404
+
+    if "file" not in request.files:
+        return jsonify({"message": "لم يتم إرسال أي ملف"}), 400
+
+    file = request.files["file"]
+    if file.filename == "":
+        return jsonify({"message": "اسم الملف فارغ"}), 400
+
+    filename = secure_filename(file.filename)
+    ext = filename.rsplit(".", 1)[1].lower() if "." in filename else ""
+    if ext not in ALLOWED_IMPORT_EXTENSIONS:
+        return jsonify({"message": "نوع الملف غير مدعوم (CSV أو XLSX)"}), 400
+
+    import_root = current_app.config["IMPORT_ROOT"]
+    os.makedirs(import_root, exist_ok=True)
+    save_path = os.path.join(import_root, f"{uuid.uuid4().hex}.{ext}")
+    file.save(save_path)
+
+    job = ProductImportJob(
+        store_id=store.id,
+        filename=filename,
+        file_path=save_path,
+        status="QUEUED",
+    )
+    db.session.add(job)
+    submit_import(job)
+    db.session.commit()
+
+    return jsonify(serialize_import_job(job)), 202
+
+@stores_bp.route("/my/products/import/<int:job_id>", methods=["GET"])
+def import_products_status(job_id):
+    current_user, error = get_current_user_from_request(allowed_roles=["SELLER"])
+    if error:
+        msg, status = error
+        return jsonify({"message": msg}), status
+
+    store = Store.query.filter_by(owner_id=current_user.id).first()
+    if not store:
+        return jsonify({"message": "لم يتم إنشاء متجر بعد"}), 404
+
+    job = ProductImportJob.query.filter_by(id=job_id, store_id=store.id).first()
+    if not job:
+        return jsonify({"message": "عملية الاستيراد غير موجودة"}), 404
+
+    return jsonify(serialize_import_job(job)), 200
 
 @stores_bp.route("/my/products/<int:product_id>", methods=["PUT"])
 def update_product(product_id):
@@ -277,19 +421,11 @@ def update_product(product_id):
     if "is_active" in data:
         product.is_active = bool(data.get("is_active"))
 
+    bump_catalog_version(store.id)
     db.session.commit()
+    invalidate_store_pricing(store.id)
 
-    return jsonify(
-        {
-            "id": product.id,
-            "name": product.name,
-            "description": product.description,
-            "price": float(product.price),
-            "image_url": product.image_url,
-            "stock": product.stock,
-            "is_active": product.is_active,
-        }
-    ), 200
+    return jsonify(serialize_catalog_product(product)), 200
 
 @stores_bp.route("/my/products/<int:product_id>", methods=["DELETE"])
 def delete_product(product_id):
@@ -307,15 +443,71 @@ def delete_product(product_id):
         return jsonify({"message": "المنتج غير موجود"}), 404
 
     db.session.delete(product)
+    bump_catalog_version(store.id)
     db.session.commit()
+    invalidate_store_pricing(store.id)
 
     return jsonify({"message": "تم حذف المنتج"}), 200
 
-def serialize_store_with_rating(store: Store):
-    avg, count = db.session.query(
-        func.coalesce(func.avg(StoreReview.rating), 0),
-        func.count(StoreReview.id)
-    ).filter(StoreReview.store_id == store.id).one()
+@stores_bp.route("/my/analytics", methods=["GET"])
+def my_store_analytics():
+    """
+    ?from=YYYY-MM-DD&to=YYYY-MM-DD (الافتراضي آخر 30 يوم)
+    مبيعات يومية + أكتر المنتجات مبيعاً من الـ rollups.
+    """
+    current_user, error = get_current_user_from_request(allowed_roles=["SELLER"])
+    if error:
+        msg, status = error
+        return jsonify({"message": msg}), status
+
+    store = Store.query.filter_by(owner_id=current_user.id).first()
+    if not store:
+        return jsonify({"message": "لم يتم إنشاء متجر بعد"}), 404
+
+    try:
+        date_to = date.fromisoformat(request.args["to"]) if request.args.get("to") else local_date()
+        date_from = (
+            date.fromisoformat(request.args["from"])
+            if request.args.get("from")
+            else date_to - timedelta(days=29)
+        )
+    except ValueError:
+        return jsonify({"message": "صيغة التاريخ غير صالحة (YYYY-MM-DD)"}), 400
+
+    if date_from > date_to:
+        return jsonify({"message": "تاريخ البداية بعد تاريخ النهاية"}), 400
+
+    return jsonify(store_analytics(store.id, date_from, date_to)), 200
+
+def store_ratings(store_ids):
+    """
+    {store_id: (avg, count)} لكل المتاجر في query واحدة (GROUP BY) بدل query لكل متجر.
+    """
+    if not store_ids:
+        return {}
+    rows = (
+        db.session.query(
+            StoreReview.store_id,
+            func.avg(StoreReview.rating),
+            func.count(StoreReview.id),
+        )
+        .filter(StoreReview.store_id.in_(store_ids))
+        .group_by(StoreReview.store_id)
+        .all()
+    )
+    return {store_id: (avg, count) for store_id, avg, count in rows}
+
+
+def serialize_store_with_rating(store: Store, now=None, rating=None):
+    """
+    rating: (avg, count) من store_ratings – لو مش متبعت بيتحسب بـ query للمتجر ده.
+    """
+    if rating is None:
+        rating = db.session.query(
+            func.coalesce(func.avg(StoreReview.rating), 0),
+            func.count(StoreReview.id)
+        ).filter(StoreReview.store_id == store.id).one()
+    avg, count = rating
 
     avg_value = float(avg or 0)
     return {
@@ -327,17 +519,29 @@ def serialize_store_with_rating(store: Store):
         "delivery_fee": float(store.delivery_fee or 0),
         "is_active": store.is_active,
         "profile_image_url": store.profile_image_url,
+        "open_from": format_time(store.open_from),
+        "open_to": format_time(store.open_to),
+        "is_open_now": is_open_at(store.open_from, store.open_to, now or local_time()),
         "avg_rating": round(avg_value, 1),
         "reviews_count": int(count),
     }
 
 @stores_bp.route("", methods=["GET"])
+@rate_limit("stores_search", when=lambda: bool(request.args.get("search")))
 def list_active_stores():
-    category = request.args.get("category")
+    """
+    ?category=FOOD&search=...&open_now=1
+    open_now بيتحسب في الـ SQL بتوقيت القاهرة (وبيتعامل مع المواعيد اللي بتعدي نص الليل).
+    """
+    category = normalize_category(request.args.get("category"))
     search = request.args.get("search")
+    now = local_time()
 
     query = Store.query.filter_by(is_active=True)
 
+    if request.args.get("open_now") in ("1", "true"):
+        query = query.filter(open_now_clause(now))
+
     if category:
         query = query.filter(Store.category == category)
 
@@ -348,21 +552,31 @@ def list_active_stores():
         )
 
     stores = query.order_by(Store.created_at.desc()).all()
-    return jsonify([serialize_store_with_rating(s) for s in stores]), 200
+    ratings = store_ratings([s.id for s in stores])
+    return jsonify(
+        [serialize_store_with_rating(s, now, ratings.get(s.id, (0, 0))) for s in stores]
+    ), 200
+
+@stores_bp.route("/categories", methods=["GET"])
+def list_store_categories():
+    """
+    التصنيفات + عدد المتاجر النشطة في كل واحد (facet counts للـ home screen).
+    """
+    return category_facets_response()
 
 @stores_bp.route("/<int:store_id>", methods=["GET"])
 def get_store_with_products(store_id):
+    """
+    المنيو متخزن حسب (store_id, catalog_version) – app/stores/catalog.py.
+    - If-None-Match بالـ ETag اللي رجع قبل كده → 304
+    - ?catalog_version=N ولسه هو الحالي → {"unchanged": true, "catalog_version": N, "store": {...}}
+    في الحالتين مفيش query للمنتجات. الـ ETag فيه الـ catalog_version + is_open_now + الـ rating،
+    فأي تغيير في أي حاجة في الـ response بيغيره.
+    """
     store = Store.query.filter_by(id=store_id, is_active=True).first()
     if not store:
         return jsonify({"message": "المتجر غير موجود أو غير متاح حالياً"}), 404
 
-    products = (
-        Product.query
-        .filter_by(store_id=store.id, is_active=True)
-        .order_by(Product.created_at.asc())
-        .all()
-    )
-
     avg, count = db.session.query(
         func.coalesce(func.avg(StoreReview.rating), 0),
         func.count(StoreReview.id)
@@ -370,33 +584,38 @@ def get_store_with_products(store_id):
 
     avg_value = float(avg or 0)
 
-    return jsonify(
-        {
-            "store": {
-                "id": store.id,
-                "name": store.name,
-                "description": store.description,
-                "category": store.category,
-                "min_order_amount": float(store.min_order_amount or 0),
-                "delivery_fee": float(store.delivery_fee or 0),
-                "profile_image_url": store.profile_image_url,
-                "avg_rating": round(avg_value, 1),
-                "reviews_count": int(count),
-            },
-            "products": [
-                {
-                    "id": p.id,
-                    "name": p.name,
-                    "description": p.description,
-                    "price": float(p.price),
-                    "image_url": p.image_url,
-                    "stock": p.stock,
-                    "is_active": p.is_active,
-                }
-                for p in products
-            ],
-        }
-    ), 200
+    store_data = {
+        "id": store.id,
+        "name": store.name,
+        "description": store.description,
+        "category": store.category,
+        "min_order_amount": float(store.min_order_amount or 0),
+        "delivery_fee": float(store.delivery_fee or 0),
+        "profile_image_url": store.profile_image_url,
+        "open_from": format_time(store.open_from),
+        "open_to": format_time(store.open_to),
+        "is_open_now": is_open_at(store.open_from, store.open_to, local_time()),
+        "avg_rating": round(avg_value, 1),
+        "reviews_count": int(count),
+        "catalog_version": store.catalog_version,
+    }
+
+    etag = catalog_etag(store, store_data)
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag, weak=True)
+        return response
+
+    if request.args.get("catalog_version") == str(store.catalog_version):
+        response = jsonify(
+            {"unchanged": True, "catalog_version": store.catalog_version, "store": store_data}
+        )
+    else:
+        response = catalog_response(store, store_data, etag)
+
+    response.set_etag(etag, weak=True)
+    response.headers["Cache-Control"] = "no-cache"
+    return response, 200
 
 @stores_bp.route("/<int:store_id>/reviews", methods=["GET"])
 def list_store_reviews(store_id):
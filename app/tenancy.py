@@ -0,0 +1,165 @@
+# app/tenancy.py
+"""
+أكتر من كمبوند (tenant) على نفس الـ deployment.
+
+- كل request بيتحدد الـ tenant بتاعه: header X-Compound (الـ code) → الـ Host → DEFAULT_TENANT
+- الموديلز اللي بتورث TenantScoped عندها tenant_id، وكل SELECT / UPDATE / DELETE بالـ ORM
+  بيتضاف له tenant_id = :current من مكان واحد (do_orm_execute + with_loader_criteria)
+- tenant_id في الـ INSERT بيتملى من الـ tenant الحالي (column default)، و before_flush بيمنع
+  كتابة object بتاع tenant تاني
+- برا الـ requests (CLI / jobs worker) مفيش tenant → الـ queries مش متفلترة، ولو الكود محتاج
+  يكتب rows بتاعة tenant معين بيستخدم use_tenant(tenant_id)
+- execution_options(all_tenants=True) بيلغي الفلترة لـ statement واحد
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+import click
+from flask import current_app, g, has_app_context, jsonify, request
+from flask.cli import AppGroup
+from sqlalchemy import event
+from sqlalchemy.orm import declared_attr, with_loader_criteria
+
+from app import db
+from app.replicas import RoutingSession
+
+tenants_cli = AppGroup("tenants", help="Compounds (tenants) management.")
+
+
+class CrossTenantWrite(Exception):
+    pass
+
+
+def current_tenant_id():
+    if not has_app_context():
+        return None
+    return g.get("tenant_id")
+
+
+@contextmanager
+def use_tenant(tenant_id):
+    previous = g.get("tenant_id")
+    g.tenant_id = tenant_id
+    try:
+        yield
+    finally:
+        g.tenant_id = previous
+
+
+class TenantScoped:
+    """
+    Mixin: tenant_id + فلترة تلقائية بالـ tenant الحالي.
+    """
+
+    @declared_attr
+    def tenant_id(cls):
+        return db.Column(
+            db.Integer, db.ForeignKey("tenants.id"), nullable=False, default=current_tenant_id
+        )
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _scope_to_tenant(orm_execute_state):
+    tenant_id = current_tenant_id()
+    if tenant_id is None or orm_execute_state.execution_options.get("all_tenants"):
+        return
+    if orm_execute_state.is_select or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.statement = orm_execute_state.statement.options(
+            with_loader_criteria(
+                TenantScoped,
+                lambda cls: cls.tenant_id == tenant_id,
+                include_aliases=True,
+            )
+        )
+
+
+@event.listens_for(RoutingSession, "before_flush")
+def _check_tenant(session, flush_context, instances):
+    tenant_id = current_tenant_id()
+    if tenant_id is None:
+        return
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, TenantScoped):
+            continue
+        if obj.tenant_id is None:
+            obj.tenant_id = tenant_id
+        elif obj.tenant_id != tenant_id:
+            raise CrossTenantWrite(f"{obj!r} belongs to tenant {obj.tenant_id}, not {tenant_id}")
+
+
+# ---------- tenant lookup ----------
+_lock = threading.Lock()
+_cache = {"expires_at": 0.0, "by_code": {}, "by_host": {}}
+
+
+def _load_tenants():
+    from app.models import Tenant
+
+    by_code, by_host = {}, {}
+    for tenant in Tenant.query.filter_by(is_active=True):
+        by_code[tenant.code.lower()] = tenant.id
+        for host in (tenant.hosts or "").split(","):
+            host = host.strip().lower()
+            if host:
+                by_host[host] = tenant.id
+    return by_code, by_host
+
+
+def _tenants():
+    now = time.monotonic()
+    if now >= _cache["expires_at"]:
+        with _lock:
+            if now >= _cache["expires_at"]:
+                _cache["by_code"], _cache["by_host"] = _load_tenants()
+                _cache["expires_at"] = now + current_app.config.get("TENANT_CACHE_SECONDS", 60)
+    return _cache
+
+
+def invalidate_tenant_cache():
+    with _lock:
+        _cache["expires_at"] = 0.0
+
+
+def tenant_for_request():
+    tenants = _tenants()
+    code = request.headers.get("X-Compound", "").strip().lower()
+    if code:
+        return tenants["by_code"].get(code)
+    host = (request.host or "").split(":", 1)[0].lower()
+    if host in tenants["by_host"]:
+        return tenants["by_host"][host]
+    return tenants["by_code"].get(current_app.config.get("DEFAULT_TENANT", "").lower())
+
+
+def init_app(app):
+    @app.before_request
+    def resolve_tenant():
+        tenant_id = tenant_for_request()
+        if tenant_id is None:
+            return jsonify({"message": "الكمبوند غير موجود"}), 404
+        g.tenant_id = tenant_id
+
+
+@tenants_cli.command("create")
+@click.argument("code")
+@click.argument("name")
+@click.option("--hosts", default="", help="Comma separated hostnames served by this compound.")
+def create_tenant_command(code, name, hosts):
+    """Add a compound."""
+    from app.models import Tenant
+
+    tenant = Tenant(code=code.lower(), name=name, hosts=hosts or None)
+    db.session.add(tenant)
+    db.session.commit()
+    click.echo(f"Created tenant {tenant.id} ({tenant.code})")
+
+
+@tenants_cli.command("list")
+def list_tenants_command():
+    """List compounds."""
+    from app.models import Tenant
+
+    for tenant in Tenant.query.order_by(Tenant.id):
+        state = "active" if tenant.is_active else "inactive"
+        click.echo(f"{tenant.id}\t{tenant.code}\t{tenant.name}\t{tenant.hosts or '-'}\t{state}")
@@ -3,7 +3,11 @@ import uuid
 from flask import Blueprint, request, jsonify, current_app
 from werkzeug.utils import secure_filename
 
+from app import db
 from app.auth.routes import get_current_user_from_request
+from app.jobs.queue import enqueue
+from app.ratelimit import rate_limit
+from app.uploads.tasks import thumbnail_url_for
 
 uploads_bp = Blueprint("uploads", __name__)
 
@@ -14,6 +18,7 @@ def allowed_file(filename: str) -> bool:
 
 
 @uploads_bp.route("/product-image", methods=["POST"])
+@rate_limit("uploads")
 def upload_product_image():
     # لازم يكون SELLER
     current_user, error = get_current_user_from_request(allowed_roles=["SELLER"])
@@ -49,9 +54,14 @@ def upload_product_image():
     media_url_path = current_app.config.get("MEDIA_URL_PATH", "/media")
     public_url = f"{media_url_path}/products/{unique_name}"
 
-    return jsonify({"url": public_url}), 201
+    # الـ thumbnail بيتعمل في الـ worker
+    enqueue("uploads.thumbnail", {"folder": "products", "filename": unique_name})
+    db.session.commit()
+
+    return jsonify({"url": public_url, "thumbnail_url": thumbnail_url_for("products", unique_name)}), 201
 
 @uploads_bp.route("/store-image", methods=["POST"])
+@rate_limit("uploads")
 def upload_store_image():
     from app.auth.routes import get_current_user_from_request
 
@@ -84,4 +94,8 @@ def upload_store_image():
     media_url_path = current_app.config.get("MEDIA_URL_PATH", "/media")
     public_url = f"{media_url_path}/stores/{unique_name}"
 
-    return jsonify({"url": public_url}), 201
+    # الـ thumbnail بيتعمل في الـ worker
+    enqueue("uploads.thumbnail", {"folder": "stores", "filename": unique_name})
+    db.session.commit()
+
+    return jsonify({"url": public_url, "thumbnail_url": thumbnail_url_for("stores", unique_name)}), 201
@@ -0,0 +1,47 @@
+# app/uploads/tasks.py
+"""
+Jobs بتاعة الصور: الـ upload بيحفظ الملف ويرجع على طول، والـ thumbnail بيتعمل في الـ worker.
+الـ upload بيرجع thumbnail_url (thumbnail_url_for) – الملف بيبان هناك أول ما الـ worker يخلص،
+ولحد كده الـ frontend يستخدم الـ url الأصلي.
+Pillow في requirements.txt – لو مش متسطب الـ job بيتعلم DEAD برسالة واضحة.
+"""
+import os
+
+from flask import current_app
+
+from app.jobs.queue import JobError, job
+
+THUMBNAIL_DIR = "thumbs"
+
+
+def thumbnail_path(media_root: str, folder: str, filename: str) -> str:
+    return os.path.join(media_root, folder, THUMBNAIL_DIR, filename)
+
+
+def thumbnail_url_for(folder: str, filename: str) -> str:
+    media_url_path = current_app.config.get("MEDIA_URL_PATH", "/media")
+    return f"{media_url_path}/{folder}/{THUMBNAIL_DIR}/{filename}"
+
+
+@job("uploads.thumbnail")
+def make_thumbnail(folder: str, filename: str):
+    try:
+        from PIL import Image
+    except ImportError:
+        raise JobError("Thumbnails require Pillow (pip install Pillow)")
+
+    media_root = current_app.config["MEDIA_ROOT"]
+    source = os.path.join(media_root, folder, filename)
+    if not os.path.exists(source):
+        raise JobError(f"Upload {folder}/{filename} not found")
+
+    target = thumbnail_path(media_root, folder, filename)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+
+    size = current_app.config.get("THUMBNAIL_SIZE", 400)
+    with Image.open(source) as image:
+        image.thumbnail((size, size))
+        # نكتب في ملف مؤقت وبعدين rename علشان محدش يقرا thumbnail نصه مكتوب
+        tmp = f"{target}.tmp"
+        image.save(tmp, format=image.format)
+    os.replace(tmp, target)
@@ -0,0 +1,26 @@
+# gunicorn.conf.py
+"""
+gunicorn -c gunicorn.conf.py wsgi:app
+
+preload_app: الـ app (imports + create_app + configure_mappers) بيتعمل مرة واحدة في الـ master
+والـ workers بياخدوه بالـ fork، فـ boot الـ worker وإعادة تشغيله بيبقوا أسرع.
+بعد الـ fork كل worker بيعمل dispose للـ engines علشان ما يشاركش connections مع الـ master.
+
+ده الـ web بس – الـ job queue محتاجة process لوحدها (`flask jobs worker`، شوف Procfile)،
+وإلا الـ imports والإشعارات والـ thumbnails بيفضلوا QUEUED.
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8001')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+threads = int(os.environ.get("GUNICORN_THREADS", "1"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+
+
+def post_fork(server, worker):
+    from app import dispose_engines
+    from wsgi import app
+
+    dispose_engines(app)
@@ -0,0 +1,79 @@
+"""Add monthly-partitioned orders archive
+
+Revision ID: 0b5d93e7a8c2
+Revises: f4c81b2d6e53
+Create Date: 2026-10-19 21:06:15.372940
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b5d93e7a8c2'
+down_revision = 'f4c81b2d6e53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    is_postgres = op.get_bind().dialect.name == 'postgresql'
+
+    # في Postgres: partitioned بالشهر (الـ partitions نفسها من `flask orders partitions|archive`)
+    op.create_table('orders_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('customer_id', sa.Integer(), nullable=False),
+    sa.Column('store_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('total_amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('delivery_method', sa.String(length=20), nullable=False),
+    sa.Column('notes', sa.String(length=255), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ),
+    sa.PrimaryKeyConstraint('id', 'created_at'),
+    postgresql_partition_by='RANGE (created_at)'
+    )
+    with op.batch_alter_table('orders_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_orders_archive_tenant_store_created', ['tenant_id', 'store_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_orders_archive_tenant_customer_created', ['tenant_id', 'customer_id', 'created_at'], unique=False)
+
+    op.create_table('order_items_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('order_created_at', sa.DateTime(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('product_name', sa.String(length=120), nullable=False),
+    sa.Column('unit_price', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('subtotal', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ),
+    sa.PrimaryKeyConstraint('id', 'order_created_at'),
+    postgresql_partition_by='RANGE (order_created_at)'
+    )
+    with op.batch_alter_table('order_items_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_order_items_archive_tenant_order', ['tenant_id', 'order_id'], unique=False)
+
+    if is_postgres:
+        # أي row مالهوش partition شهري بيقع هنا بدل ما الـ insert يفشل
+        op.execute("CREATE TABLE orders_archive_default PARTITION OF orders_archive DEFAULT")
+        op.execute("CREATE TABLE order_items_archive_default PARTITION OF order_items_archive DEFAULT")
+        # الـ events بتفضل بعد ما الطلب يتنقل للأرشيف. a5c2e8f41d09 مبقاش بيعمل الـ FK ده، بس
+        # الداتابيز اللي اتعملها migrate بالنسخة القديمة ممكن يكون فيها
+        op.execute("ALTER TABLE order_events DROP CONSTRAINT IF EXISTS order_events_order_id_fkey")
+
+
+def downgrade():
+    with op.batch_alter_table('order_items_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_items_archive_tenant_order')
+
+    op.drop_table('order_items_archive')
+
+    with op.batch_alter_table('orders_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_orders_archive_tenant_customer_created')
+        batch_op.drop_index('ix_orders_archive_tenant_store_created')
+
+    op.drop_table('orders_archive')
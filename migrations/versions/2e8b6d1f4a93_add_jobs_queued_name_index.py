@@ -0,0 +1,29 @@
+"""Add partial index on queued jobs by name
+
+Revision ID: 2e8b6d1f4a93
+Revises: 7c4e2a9f1b68
+Create Date: 2026-10-20 10:02:44.517309
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2e8b6d1f4a93'
+down_revision = '7c4e2a9f1b68'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # schedule_dispatch: SELECT ... FROM jobs WHERE name = ? AND status = 'QUEUED' مع كل طلب
+    op.create_index(
+        'ix_jobs_queued_name', 'jobs', ['name'], unique=False,
+        postgresql_where=sa.text("status = 'QUEUED'"),
+        sqlite_where=sa.text("status = 'QUEUED'"),
+    )
+
+
+def downgrade():
+    op.drop_index('ix_jobs_queued_name', table_name='jobs')
@@ -0,0 +1,54 @@
+"""Add notification endpoints and dispatch cursor
+
+Revision ID: 3a7e6c0d94b1
+Revises: 9d2f5b8e1c47
+Create Date: 2026-10-19 19:48:33.160524
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3a7e6c0d94b1'
+down_revision = '9d2f5b8e1c47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('notification_endpoints',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('transport', sa.String(length=20), nullable=False),
+    sa.Column('target', sa.String(length=1000), nullable=False),
+    sa.Column('secret', sa.String(length=255), nullable=True),
+    sa.Column('keys', sa.Text(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('notification_endpoints', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_notification_endpoints_user_id'), ['user_id'], unique=False)
+
+    op.create_table('notification_cursors',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('last_event_id', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # الإشعارات تبدأ من الـ events الجديدة بس – مش هنبعت الـ history القديمة
+    op.execute(
+        "INSERT INTO notification_cursors (name, last_event_id, updated_at) "
+        "SELECT 'order_events', COALESCE(MAX(id), 0), CURRENT_TIMESTAMP FROM order_events"
+    )
+
+
+def downgrade():
+    op.drop_table('notification_cursors')
+
+    with op.batch_alter_table('notification_endpoints', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_notification_endpoints_user_id'))
+
+    op.drop_table('notification_endpoints')
@@ -0,0 +1,45 @@
+"""Add lower() indexes on users username/email
+
+Revision ID: 4b9e0c7a13f2
+Revises: 8f3a1d6c2b47
+Create Date: 2026-10-19 11:03:54.902113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b9e0c7a13f2'
+down_revision = '8f3a1d6c2b47'
+branch_labels = None
+depends_on = None
+
+
+def _duplicates(column):
+    rows = op.get_bind().execute(sa.text(
+        f"SELECT lower({column}) AS value, count(*) AS n FROM users "
+        f"WHERE {column} IS NOT NULL GROUP BY lower({column}) HAVING count(*) > 1"
+    )).fetchall()
+    return [f"{value} ({n})" for value, n in rows]
+
+
+def upgrade():
+    # الـ unique index على lower() هيفشل لو فيه حسابات بتختلف في الـ case بس (Ahmed / ahmed).
+    # مش هنمسح أو ندمج حسابات أوتوماتيك – لازم تتحل يدوي قبل الـ upgrade
+    conflicts = {column: _duplicates(column) for column in ("username", "email")}
+    conflicts = {column: values for column, values in conflicts.items() if values}
+    if conflicts:
+        details = "; ".join(f"{column}: {', '.join(values)}" for column, values in conflicts.items())
+        raise RuntimeError(
+            "Case-insensitive duplicate users must be resolved before this migration "
+            f"(rename or merge them, then re-run `flask db upgrade`): {details}"
+        )
+
+    op.create_index('ix_users_lower_username', 'users', [sa.text('lower(username)')], unique=True)
+    op.create_index('ix_users_lower_email', 'users', [sa.text('lower(email)')], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_users_lower_email', table_name='users')
+    op.drop_index('ix_users_lower_username', table_name='users')
@@ -0,0 +1,34 @@
+"""Add order delivery fee
+
+Revision ID: 5a1f7c3e9d20
+Revises: 2e8b6d1f4a93
+Create Date: 2026-10-20 10:48:19.604127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a1f7c3e9d20'
+down_revision = '2e8b6d1f4a93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # total_amount بيفضل المنتجات بس (الـ rollups)، ومصاريف التوصيل في عمود لوحدها
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('delivery_fee', sa.Numeric(precision=10, scale=2), server_default='0', nullable=False))
+
+    # في Postgres الـ ALTER على الجدول الـ partitioned بيتطبق على كل الـ partitions
+    with op.batch_alter_table('orders_archive', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('delivery_fee', sa.Numeric(precision=10, scale=2), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('orders_archive', schema=None) as batch_op:
+        batch_op.drop_column('delivery_fee')
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_column('delivery_fee')
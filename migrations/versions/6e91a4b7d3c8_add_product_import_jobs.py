@@ -0,0 +1,45 @@
+"""Add product import jobs
+
+Revision ID: 6e91a4b7d3c8
+Revises: b18f7e3c6a20
+Create Date: 2026-10-19 18:40:51.902336
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6e91a4b7d3c8'
+down_revision = 'b18f7e3c6a20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('product_import_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('store_id', sa.Integer(), nullable=False),
+    sa.Column('filename', sa.String(length=255), nullable=False),
+    sa.Column('file_path', sa.String(length=500), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('processed_rows', sa.Integer(), nullable=False),
+    sa.Column('created_count', sa.Integer(), nullable=False),
+    sa.Column('updated_count', sa.Integer(), nullable=False),
+    sa.Column('error_count', sa.Integer(), nullable=False),
+    sa.Column('errors', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['store_id'], ['stores.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('product_import_jobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_product_import_jobs_store_id'), ['store_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('product_import_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_product_import_jobs_store_id'))
+
+    op.drop_table('product_import_jobs')
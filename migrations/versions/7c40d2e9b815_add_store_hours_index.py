@@ -0,0 +1,26 @@
+"""Add store opening hours index
+
+Revision ID: 7c40d2e9b815
+Revises: e3b6f19d5a72
+Create Date: 2026-10-19 16:08:45.219374
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c40d2e9b815'
+down_revision = 'e3b6f19d5a72'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('stores', schema=None) as batch_op:
+        batch_op.create_index('ix_stores_active_hours', ['is_active', 'open_from', 'open_to'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('stores', schema=None) as batch_op:
+        batch_op.drop_index('ix_stores_active_hours')
@@ -0,0 +1,26 @@
+"""Add store catalog version
+
+Revision ID: 7c4e2a9f1b68
+Revises: 0b5d93e7a8c2
+Create Date: 2026-10-19 23:41:07.226513
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c4e2a9f1b68'
+down_revision = '0b5d93e7a8c2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('stores', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('catalog_version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('stores', schema=None) as batch_op:
+        batch_op.drop_column('catalog_version')
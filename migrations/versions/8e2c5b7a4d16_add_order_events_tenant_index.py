@@ -0,0 +1,27 @@
+"""Add order_events (tenant_id, id) index
+
+Revision ID: 8e2c5b7a4d16
+Revises: 5a1f7c3e9d20
+Create Date: 2026-10-20 12:14:37.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e2c5b7a4d16'
+down_revision = '5a1f7c3e9d20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # الـ dispatcher بقى بيقرا الـ events بـ cursor لكل tenant
+    with op.batch_alter_table('order_events', schema=None) as batch_op:
+        batch_op.create_index('ix_order_events_tenant_id_id', ['tenant_id', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('order_events', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_events_tenant_id_id')
@@ -0,0 +1,26 @@
+"""Add user token version
+
+Revision ID: 8f3a1d6c2b47
+Revises: c2c7ab49bd59
+Create Date: 2026-10-19 10:12:31.418207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f3a1d6c2b47'
+down_revision = 'c2c7ab49bd59'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('token_version')
@@ -0,0 +1,50 @@
+"""Add order events log
+
+Revision ID: a5c2e8f41d09
+Revises: d71e5a0b9c34
+Create Date: 2026-10-19 13:41:26.084512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a5c2e8f41d09'
+down_revision = 'd71e5a0b9c34'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('order_events',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('store_id', sa.Integer(), nullable=False),
+    sa.Column('customer_id', sa.Integer(), nullable=False),
+    sa.Column('event_type', sa.String(length=20), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    # order_id من غير FK (زي الموديل): الـ events بتفضل بعد ما الطلب يتنقل للأرشيف
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('order_events', schema=None) as batch_op:
+        batch_op.create_index('ix_order_events_store_id_id', ['store_id', 'id'], unique=False, postgresql_include=['order_id', 'event_type', 'status', 'created_at'])
+        batch_op.create_index('ix_order_events_customer_id_id', ['customer_id', 'id'], unique=False, postgresql_include=['order_id', 'event_type', 'status', 'created_at'])
+        batch_op.create_index('ix_order_events_order_id_id', ['order_id', 'id'], unique=False)
+
+    # الطلبات الموجودة قبل كده: event واحد بحالتها الحالية علشان الـ history ما تبقاش فاضية
+    op.execute(
+        "INSERT INTO order_events (order_id, store_id, customer_id, event_type, status, created_at) "
+        "SELECT id, store_id, customer_id, 'CREATED', status, COALESCE(updated_at, created_at, CURRENT_TIMESTAMP) "
+        "FROM orders ORDER BY id"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('order_events', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_events_order_id_id')
+        batch_op.drop_index('ix_order_events_customer_id_id')
+        batch_op.drop_index('ix_order_events_store_id_id')
+
+    op.drop_table('order_events')
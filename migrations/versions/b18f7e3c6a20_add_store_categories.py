@@ -0,0 +1,62 @@
+"""Add store categories table and category listing index
+
+Revision ID: b18f7e3c6a20
+Revises: 7c40d2e9b815
+Create Date: 2026-10-19 17:26:03.647190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b18f7e3c6a20'
+down_revision = '7c40d2e9b815'
+branch_labels = None
+depends_on = None
+
+
+DEFAULT_CATEGORIES = [
+    ('FOOD', 'أكل', 1),
+    ('DESSERT', 'حلويات', 2),
+    ('GROCERY', 'بقالة', 3),
+    ('CLOTHES', 'ملابس', 4),
+    ('OTHER', 'أخرى', 99),
+]
+
+
+def upgrade():
+    categories = op.create_table('store_categories',
+    sa.Column('code', sa.String(length=50), nullable=False),
+    sa.Column('name', sa.String(length=80), nullable=False),
+    sa.Column('sort_order', sa.Integer(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.PrimaryKeyConstraint('code')
+    )
+    op.bulk_insert(
+        categories,
+        [
+            {'code': code, 'name': name, 'sort_order': order, 'is_active': True}
+            for code, name, order in DEFAULT_CATEGORIES
+        ],
+    )
+
+    # normalize القيم القديمة وضيف أي تصنيف مش موجود علشان الـ FK
+    op.execute("UPDATE stores SET category = UPPER(TRIM(category))")
+    op.execute(
+        "INSERT INTO store_categories (code, name, sort_order, is_active) "
+        "SELECT DISTINCT category, category, 50, true FROM stores "
+        "WHERE category NOT IN (SELECT code FROM store_categories)"
+    )
+
+    with op.batch_alter_table('stores', schema=None) as batch_op:
+        batch_op.create_foreign_key('fk_stores_category_store_categories', 'store_categories', ['category'], ['code'])
+        batch_op.create_index('ix_stores_active_category_created', ['is_active', 'category', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('stores', schema=None) as batch_op:
+        batch_op.drop_index('ix_stores_active_category_created')
+        batch_op.drop_constraint('fk_stores_category_store_categories', type_='foreignkey')
+
+    op.drop_table('store_categories')
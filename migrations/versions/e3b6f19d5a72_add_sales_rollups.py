@@ -0,0 +1,45 @@
+"""Add store/product daily sales rollups
+
+Revision ID: e3b6f19d5a72
+Revises: a5c2e8f41d09
+Create Date: 2026-10-19 14:55:12.370658
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3b6f19d5a72'
+down_revision = 'a5c2e8f41d09'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('store_daily_stats',
+    sa.Column('store_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('orders_count', sa.Integer(), nullable=False),
+    sa.Column('delivered_count', sa.Integer(), nullable=False),
+    sa.Column('cancelled_count', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['store_id'], ['stores.id'], ),
+    sa.PrimaryKeyConstraint('store_id', 'day')
+    )
+    op.create_table('product_daily_stats',
+    sa.Column('store_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('product_name', sa.String(length=150), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['store_id'], ['stores.id'], ),
+    sa.PrimaryKeyConstraint('store_id', 'day', 'product_id')
+    )
+    # البيانات القديمة: شغّل `flask analytics rebuild` بعد الـ upgrade
+
+
+def downgrade():
+    op.drop_table('product_daily_stats')
+    op.drop_table('store_daily_stats')
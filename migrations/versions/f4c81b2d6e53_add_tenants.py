@@ -0,0 +1,144 @@
+"""Add tenants and tenant_id on tenant-scoped tables
+
+Revision ID: f4c81b2d6e53
+Revises: 3a7e6c0d94b1
+Create Date: 2026-10-19 20:31:42.507193
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4c81b2d6e53'
+down_revision = '3a7e6c0d94b1'
+branch_labels = None
+depends_on = None
+
+
+# الداتا الموجودة كلها بتاعة الكمبوند الأول (tenant 1)
+TENANT_TABLES = [
+    'users',
+    'stores',
+    'products',
+    'product_import_jobs',
+    'orders',
+    'order_items',
+    'order_events',
+    'notification_endpoints',
+    'store_reviews',
+]
+
+EVENT_INCLUDE = ['order_id', 'event_type', 'status', 'created_at']
+
+# SQLite بيعكس الـ UNIQUE (username) / UNIQUE (email) من غير اسم – الـ convention بيديهم اسم علشان نقدر نشيلهم
+USERS_NAMING = {'uq': 'uq_%(table_name)s_%(column_0_name)s'}
+
+
+def upgrade():
+    op.create_table('tenants',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('code', sa.String(length=50), nullable=False),
+    sa.Column('name', sa.String(length=120), nullable=False),
+    sa.Column('hosts', sa.Text(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('code')
+    )
+    op.execute(
+        "INSERT INTO tenants (id, code, name, hosts, is_active, created_at) "
+        "VALUES (1, 'airnav', 'AirNav Compound', NULL, true, CURRENT_TIMESTAMP)"
+    )
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("SELECT setval(pg_get_serial_sequence('tenants', 'id'), 1)")
+
+    # الـ functional indexes الأول – batch mode في SQLite بيعيد إنشاء الجدول ومش بيحافظ عليها
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("ALTER TABLE users DROP CONSTRAINT IF EXISTS users_username_key")
+        op.execute("ALTER TABLE users DROP CONSTRAINT IF EXISTS users_email_key")
+    op.drop_index('ix_users_lower_email', table_name='users')
+    op.drop_index('ix_users_lower_username', table_name='users')
+    if op.get_bind().dialect.name != 'postgresql':
+        # SQLite مفيهوش DROP CONSTRAINT – لازم الجدول يتعمل من جديد من غيرهم،
+        # وإلا الـ sqlite_autoindex بيمنع نفس الـ username في كمبوند تاني
+        with op.batch_alter_table('users', recreate='always', naming_convention=USERS_NAMING) as batch_op:
+            batch_op.drop_constraint('uq_users_username', type_='unique')
+            batch_op.drop_constraint('uq_users_email', type_='unique')
+
+    for table in TENANT_TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('tenant_id', sa.Integer(), nullable=False, server_default='1'))
+            batch_op.create_foreign_key(f'fk_{table}_tenant_id', 'tenants', ['tenant_id'], ['id'])
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('tenant_id', server_default=None)
+
+    # username / email unique جوه الكمبوند بس
+    op.create_index('ix_users_tenant_lower_username', 'users', ['tenant_id', sa.text('lower(username)')], unique=True)
+    op.create_index('ix_users_tenant_lower_email', 'users', ['tenant_id', sa.text('lower(email)')], unique=True)
+
+    with op.batch_alter_table('stores', schema=None) as batch_op:
+        batch_op.drop_index('ix_stores_active_hours')
+        batch_op.drop_index('ix_stores_active_category_created')
+        batch_op.create_index('ix_stores_active_hours', ['tenant_id', 'is_active', 'open_from', 'open_to'], unique=False)
+        batch_op.create_index('ix_stores_active_category_created', ['tenant_id', 'is_active', 'category', 'created_at'], unique=False)
+
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.create_index('ix_products_tenant_store_active', ['tenant_id', 'store_id', 'is_active'], unique=False)
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.create_index('ix_orders_tenant_store_created', ['tenant_id', 'store_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_orders_tenant_customer_created', ['tenant_id', 'customer_id', 'created_at'], unique=False)
+
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.create_index('ix_order_items_tenant_order', ['tenant_id', 'order_id'], unique=False)
+
+    with op.batch_alter_table('store_reviews', schema=None) as batch_op:
+        batch_op.create_index('ix_store_reviews_tenant_store_created', ['tenant_id', 'store_id', 'created_at'], unique=False)
+
+    # الـ feeds بقت بتفلتر بـ tenant_id كمان – لازم يبقى في الـ INCLUDE علشان index-only scan
+    with op.batch_alter_table('order_events', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_events_store_id_id')
+        batch_op.drop_index('ix_order_events_customer_id_id')
+        batch_op.create_index('ix_order_events_store_id_id', ['store_id', 'id'], unique=False, postgresql_include=['tenant_id'] + EVENT_INCLUDE)
+        batch_op.create_index('ix_order_events_customer_id_id', ['customer_id', 'id'], unique=False, postgresql_include=['tenant_id'] + EVENT_INCLUDE)
+
+
+def downgrade():
+    with op.batch_alter_table('order_events', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_events_customer_id_id')
+        batch_op.drop_index('ix_order_events_store_id_id')
+        batch_op.create_index('ix_order_events_store_id_id', ['store_id', 'id'], unique=False, postgresql_include=EVENT_INCLUDE)
+        batch_op.create_index('ix_order_events_customer_id_id', ['customer_id', 'id'], unique=False, postgresql_include=EVENT_INCLUDE)
+
+    with op.batch_alter_table('store_reviews', schema=None) as batch_op:
+        batch_op.drop_index('ix_store_reviews_tenant_store_created')
+
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_items_tenant_order')
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_index('ix_orders_tenant_customer_created')
+        batch_op.drop_index('ix_orders_tenant_store_created')
+
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_index('ix_products_tenant_store_active')
+
+    with op.batch_alter_table('stores', schema=None) as batch_op:
+        batch_op.drop_index('ix_stores_active_category_created')
+        batch_op.drop_index('ix_stores_active_hours')
+        batch_op.create_index('ix_stores_active_hours', ['is_active', 'open_from', 'open_to'], unique=False)
+        batch_op.create_index('ix_stores_active_category_created', ['is_active', 'category', 'created_at'], unique=False)
+
+    op.drop_index('ix_users_tenant_lower_email', table_name='users')
+    op.drop_index('ix_users_tenant_lower_username', table_name='users')
+
+    for table in reversed(TENANT_TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_constraint(f'fk_{table}_tenant_id', type_='foreignkey')
+            batch_op.drop_column('tenant_id')
+
+    op.create_index('ix_users_lower_username', 'users', [sa.text('lower(username)')], unique=True)
+    op.create_index('ix_users_lower_email', 'users', [sa.text('lower(email)')], unique=True)
+
+    op.drop_table('tenants')
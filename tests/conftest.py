@@ -0,0 +1,69 @@
+# tests/conftest.py
+"""
+كل test بياخد app جديد على SQLite في tmp_path، فيه الكمبوند الافتراضي (airnav) والتصنيفات.
+make_app(**config) بيغير أي قيمة في Config قبل create_app (زي SQLALCHEMY_BINDS للـ replicas).
+"""
+import pytest
+from sqlalchemy.orm import Session
+
+from app import create_app, db
+from app.config import Config
+from app.models import StoreCategory, Tenant
+from app.orders import pricing
+from app.stores import catalog, categories
+from app.tenancy import invalidate_tenant_cache
+
+
+def seed(engine=None):
+    """
+    الكمبوند والتصنيفات – على الـ primary، أو على engine تاني (replica) بنفس الـ ids.
+    """
+    session = db.session if engine is None else Session(bind=engine)
+    session.add(Tenant(id=1, code="airnav", name="AirNav"))
+    for code in ("FOOD", "DESSERT"):
+        session.add(StoreCategory(code=code, name=code.title(), sort_order=1))
+    session.commit()
+    if engine is not None:
+        session.close()
+
+
+def reset_caches():
+    """
+    الـ caches دي على مستوى الـ process ومتفتحة بـ (tenant_id, store_id) – كل test عنده DB جديدة
+    بنفس الـ ids، فلازم تتمسح بين الـ tests.
+    """
+    invalidate_tenant_cache()
+    for cache in (catalog._memory, catalog._responses, categories._cache, pricing._cache):
+        cache.clear()
+
+
+@pytest.fixture
+def make_app(tmp_path, monkeypatch):
+    def factory(**config):
+        monkeypatch.setattr(Config, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'primary.db'}")
+        monkeypatch.setattr(Config, "MEDIA_ROOT", str(tmp_path / "media"))
+        monkeypatch.setattr(Config, "IMPORT_ROOT", str(tmp_path / "imports"))
+        monkeypatch.setattr(Config, "CATALOG_CACHE_DIR", str(tmp_path / "catalog"), raising=False)
+        for key, value in config.items():
+            monkeypatch.setattr(Config, key, value, raising=False)
+
+        app = create_app()
+        app.config.update(TESTING=True, RATELIMIT_ENABLED=False)
+        with app.app_context():
+            db.create_all(bind_key=None)  # الـ replicas (لو فيه) الـ test بيجهزها بنفسه
+            seed()
+        reset_caches()
+        return app
+
+    yield factory
+    reset_caches()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
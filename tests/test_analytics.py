@@ -0,0 +1,58 @@
+# tests/test_analytics.py
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from app import db
+from app.models import Order, StoreDailyStats
+from app.stores.analytics import rebuild_stats, record_order_created, record_status_changes
+from app.stores.hours import local_date
+from app.tenancy import use_tenant
+
+# مارس: القاهرة UTC+2 – 21:59 UTC = 23:59 نفس اليوم، 22:30 UTC = 00:30 اليوم اللي بعده
+LATE_EVENING = datetime(2026, 3, 10, 21, 59)
+AFTER_MIDNIGHT = datetime(2026, 3, 10, 22, 30)
+
+
+@pytest.mark.parametrize(
+    "utc, expected",
+    [(LATE_EVENING, date(2026, 3, 10)), (AFTER_MIDNIGHT, date(2026, 3, 11)),
+     (datetime(2026, 7, 1, 21, 0), date(2026, 7, 2))],  # الصيفي UTC+3
+)
+def test_local_date_uses_store_timezone(app, utc, expected):
+    with app.app_context():
+        assert local_date(utc) == expected
+
+
+def stats(store_id=1):
+    return {
+        row.day: (row.orders_count, row.delivered_count, row.revenue)
+        for row in StoreDailyStats.query.filter_by(store_id=store_id)
+    }
+
+
+def add_order(created_at, total):
+    order = Order(customer_id=1, store_id=1, status="DELIVERED", total_amount=total,
+                  delivery_method="PICKUP", created_at=created_at)
+    db.session.add(order)
+    db.session.flush()
+    return order
+
+
+def test_incremental_and_rebuild_bucket_by_local_day(app):
+    with app.app_context(), use_tenant(1):
+        orders = [add_order(LATE_EVENING, Decimal("10.00")), add_order(AFTER_MIDNIGHT, Decimal("25.50"))]
+        for order in orders:
+            record_order_created(1, order.created_at)
+        record_status_changes(1, orders, "DELIVERED")
+        db.session.commit()
+
+        expected = {
+            date(2026, 3, 10): (1, 1, Decimal("10.00")),
+            date(2026, 3, 11): (1, 1, Decimal("25.50")),
+        }
+        assert stats() == expected
+
+        rebuild_stats()
+        assert stats() == expected
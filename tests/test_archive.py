@@ -0,0 +1,88 @@
+# tests/test_archive.py
+from datetime import datetime
+
+from sqlalchemy import update
+
+from app import db
+from app.models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+from app.orders import archive
+from app.orders.archive import archive_cutoff, archive_orders
+from app.tenancy import use_tenant
+
+
+def register(client, username, role):
+    response = client.post("/api/auth/register", json={
+        "username": username, "full_name": username, "email": f"{username}@x.com",
+        "password": "secret1", "desired_role": role,
+    })
+    assert response.status_code == 201, response.get_json()
+    return {"Authorization": "Bearer " + response.get_json()["access_token"]}
+
+
+def place_orders(client, count):
+    seller = register(client, "seller", "SELLER")
+    store_id = client.post("/api/stores/my", headers=seller, json={"name": "Shop", "category": "FOOD"}).get_json()["id"]
+    product_id = client.post("/api/stores/my/products", headers=seller,
+                             json={"name": "Koshary", "price": 10, "stock": 100}).get_json()["id"]
+    customer = register(client, "customer", "CUSTOMER")
+    ids = []
+    for _ in range(count):
+        response = client.post("/api/orders", headers=customer, json={
+            "store_id": store_id, "items": [{"product_id": product_id, "quantity": 2}],
+        })
+        assert response.status_code == 201, response.get_json()
+        ids.append(response.get_json()["id"])
+    return customer, ids
+
+
+def backdate(app, order_ids, created_at, status):
+    with app.app_context(), use_tenant(1):
+        db.session.execute(
+            update(Order).where(Order.id.in_(order_ids)).values(created_at=created_at, status=status)
+        )
+        db.session.commit()
+
+
+def test_archive_cutoff_is_start_of_month():
+    assert archive_cutoff(6, datetime(2026, 3, 15, 10)) == datetime(2025, 9, 1)
+    assert archive_cutoff(0, datetime(2026, 1, 31)) == datetime(2026, 1, 1)
+
+
+def test_archive_moves_old_finished_orders_in_batches(app, client):
+    customer, ids = place_orders(client, 6)
+    old = datetime(2020, 1, 10)
+    backdate(app, ids[:4], old, "DELIVERED")
+    backdate(app, ids[4:5], old, "PENDING")  # مش منتهي – بيفضل
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["orders", "archive", "--dry-run"])
+    assert "4 orders" in result.output
+    result = runner.invoke(args=["orders", "archive", "--batch-size", "3"])
+    assert result.exception is None, result.output
+    assert "Archived 4 orders" in result.output
+
+    with app.app_context(), use_tenant(1):
+        assert sorted(o.id for o in Order.query) == ids[4:]
+        assert sorted(o.id for o in ArchivedOrder.query) == ids[:4]
+        assert OrderItem.query.count() == 2
+        assert ArchivedOrderItem.query.count() == 4
+
+    current = client.get("/api/orders/my", headers=customer).get_json()
+    everything = client.get("/api/orders/my?include_archived=1", headers=customer).get_json()
+    assert len(current) == 2
+    assert sorted(o["id"] for o in everything) == ids
+
+
+def test_archive_keeps_going_after_a_short_batch(app, monkeypatch):
+    # SKIP LOCKED: batch أصغر من batch_size مش معناه إن الشغل خلص – الـ 0 بس هو اللي بيوقف
+    moved = iter([5, 2, 5, 0, 7])
+    calls = []
+
+    def fake_batch(cutoff, batch_size):
+        calls.append(batch_size)
+        return next(moved)
+
+    monkeypatch.setattr(archive, "archive_batch", fake_batch)
+    with app.app_context():
+        assert archive_orders(6, batch_size=5) == 12
+    assert calls == [5, 5, 5, 5]
@@ -0,0 +1,48 @@
+# tests/test_bootstrap.py
+from app.routes import BOOTSTRAP_RECENT_ORDERS
+
+
+def register(client, username, role):
+    response = client.post("/api/auth/register", json={
+        "username": username, "full_name": username, "email": f"{username}@x.com",
+        "password": "secret1", "desired_role": role,
+    })
+    assert response.status_code == 201, response.get_json()
+    return {"Authorization": "Bearer " + response.get_json()["access_token"]}
+
+
+def test_bootstrap_matches_the_endpoints_it_replaces(client):
+    seller = register(client, "seller", "SELLER")
+    store_id = client.post("/api/stores/my", headers=seller, json={"name": "Shop", "category": "FOOD"}).get_json()["id"]
+    product_id = client.post("/api/stores/my/products", headers=seller,
+                             json={"name": "Koshary", "price": 10, "stock": 100}).get_json()["id"]
+    customer = register(client, "customer", "CUSTOMER")
+    for quantity in range(1, BOOTSTRAP_RECENT_ORDERS + 3):
+        response = client.post("/api/orders", headers=customer, json={
+            "store_id": store_id, "items": [{"product_id": product_id, "quantity": quantity}],
+        })
+        assert response.status_code == 201, response.get_json()
+    client.post(f"/api/stores/{store_id}/reviews", headers=customer, json={"rating": 4, "comment": "حلو"})
+
+    response = client.get("/api/bootstrap", headers=customer)
+    assert response.status_code == 200
+    data = response.get_json()
+
+    assert data["user"] == client.get("/api/auth/me", headers=customer).get_json()["user"]
+    assert data["stores"] == client.get("/api/stores").get_json()
+    assert data["stores"][0]["avg_rating"] == 4.0
+    assert data["recent_orders"] == client.get("/api/orders/my", headers=customer).get_json()[:BOOTSTRAP_RECENT_ORDERS]
+    assert len(data["recent_orders"]) == BOOTSTRAP_RECENT_ORDERS
+    assert data["recent_reviews"] == client.get("/api/profile/my-reviews", headers=customer).get_json()
+    assert len(data["recent_reviews"]) == 1
+
+
+def test_bootstrap_for_seller_has_no_customer_sections(client):
+    seller = register(client, "seller", "SELLER")
+    data = client.get("/api/bootstrap", headers=seller).get_json()
+    assert data["user"]["role"] == "SELLER"
+    assert (data["recent_orders"], data["recent_reviews"]) == ([], [])
+
+
+def test_bootstrap_requires_a_token(client):
+    assert client.get("/api/bootstrap").status_code == 401
@@ -0,0 +1,57 @@
+# tests/test_catalog.py
+def register(client, username, role):
+    response = client.post("/api/auth/register", json={
+        "username": username, "full_name": username, "email": f"{username}@x.com",
+        "password": "secret1", "desired_role": role,
+    })
+    assert response.status_code == 201, response.get_json()
+    return {"Authorization": "Bearer " + response.get_json()["access_token"]}
+
+
+def setup_store(client):
+    seller = register(client, "seller", "SELLER")
+    store_id = client.post("/api/stores/my", headers=seller, json={"name": "Shop", "category": "FOOD"}).get_json()["id"]
+    product_id = client.post("/api/stores/my/products", headers=seller,
+                             json={"name": "Koshary", "price": 10, "stock": 5}).get_json()["id"]
+    return seller, store_id, product_id
+
+
+def test_etag_and_catalog_version_short_circuit_until_something_changes(client):
+    seller, store_id, product_id = setup_store(client)
+
+    first = client.get(f"/api/stores/{store_id}")
+    assert first.status_code == 200
+    etag, body = first.headers["ETag"], first.get_json()
+    version = body["store"]["catalog_version"]
+    assert [p["name"] for p in body["products"]] == ["Koshary"]
+
+    cached = client.get(f"/api/stores/{store_id}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag and cached.data == b""
+
+    unchanged = client.get(f"/api/stores/{store_id}?catalog_version={version}").get_json()
+    assert unchanged == {"unchanged": True, "catalog_version": version, "store": body["store"]}
+
+    response = client.patch("/api/stores/my/products", headers=seller,
+                            json={"operations": [{"op": "update", "id": product_id, "price": 12}]})
+    assert response.status_code == 200
+
+    changed = client.get(f"/api/stores/{store_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.get_json()["store"]["catalog_version"] > version
+    assert changed.get_json()["products"][0]["price"] == 12.0
+    assert "unchanged" not in client.get(f"/api/stores/{store_id}?catalog_version={version}").get_json()
+
+
+def test_new_review_changes_etag_without_catalog_change(client):
+    _, store_id, _ = setup_store(client)
+    first = client.get(f"/api/stores/{store_id}")
+
+    customer = register(client, "customer", "CUSTOMER")
+    client.post(f"/api/stores/{store_id}/reviews", headers=customer, json={"rating": 5})
+
+    response = client.get(f"/api/stores/{store_id}", headers={"If-None-Match": first.headers["ETag"]})
+    assert response.status_code == 200
+    assert response.get_json()["store"]["catalog_version"] == first.get_json()["store"]["catalog_version"]
+    assert response.get_json()["store"]["avg_rating"] == 5.0
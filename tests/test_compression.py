@@ -0,0 +1,59 @@
+# tests/test_compression.py
+import gzip
+import json
+
+import brotli
+import pytest
+
+from app import compression
+
+
+def register(client, username, role):
+    response = client.post("/api/auth/register", json={
+        "username": username, "full_name": username, "email": f"{username}@x.com",
+        "password": "secret1", "desired_role": role,
+    })
+    assert response.status_code == 201, response.get_json()
+    return {"Authorization": "Bearer " + response.get_json()["access_token"]}
+
+
+@pytest.fixture
+def store_id(client):
+    seller = register(client, "seller", "SELLER")
+    response = client.post("/api/stores/my", json={"name": "Shop", "category": "FOOD"}, headers=seller)
+    assert response.status_code == 200, response.get_json()
+    for i in range(40):
+        response = client.post("/api/stores/my/products", headers=seller, json={
+            "name": f"منتج رقم {i}", "description": "وصف المنتج " * 5, "price": 10 + i, "stock": 5,
+        })
+        assert response.status_code == 201, response.get_json()
+    return client.get("/api/stores/my", headers=seller).get_json()["id"]
+
+
+@pytest.fixture
+def compress_calls(monkeypatch):
+    calls = []
+    original = compression.compress
+
+    def counting(data, encoding):
+        calls.append(encoding)
+        return original(data, encoding)
+
+    monkeypatch.setattr(compression, "compress", counting)
+    return calls
+
+
+@pytest.mark.parametrize("encoding, decompress", [("gzip", gzip.decompress), ("br", brotli.decompress)])
+def test_catalog_is_compressed_once_per_etag(client, store_id, compress_calls, encoding, decompress):
+    plain = client.get(f"/api/stores/{store_id}")
+    assert "Content-Encoding" not in plain.headers
+
+    responses = [
+        client.get(f"/api/stores/{store_id}", headers={"Accept-Encoding": encoding}) for _ in range(3)
+    ]
+    for response in responses:
+        assert response.headers["Content-Encoding"] == encoding
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert response.headers["ETag"] == plain.headers["ETag"]
+        assert json.loads(decompress(response.get_data())) == plain.get_json()
+    assert compress_calls == [encoding]
@@ -0,0 +1,43 @@
+# tests/test_export_summary.py
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from app.admin.export import RevenueSummary
+
+
+def rows(n=3000):
+    subtotals = [Decimal("0.10"), Decimal("0.15"), Decimal("19.99"), Decimal("0.05")]
+    return [
+        (i, datetime(2026, 1, 1 + i % 3, 12), "DELIVERED" if i % 3 else "CANCELLED",
+         i % 4, f"store {i % 4}", "FOOD", 1, "DELIVERY", Decimal("0"), i, 1, "p",
+         subtotals[i % 4], 1, subtotals[(i * 7) % 4])
+        for i in range(n)
+    ]
+
+
+def summarize(summary, data, chunk_size=700):
+    for start in range(0, len(data), chunk_size):
+        summary.add(data[start:start + chunk_size])
+    return summary.rows()
+
+
+def python_summary():
+    summary = RevenueSummary()
+    summary._pd, summary._totals = None, defaultdict(Decimal)
+    return summary
+
+
+def test_pandas_and_python_paths_agree():
+    pytest.importorskip("pandas")
+    data = rows()
+    assert summarize(RevenueSummary(), data) == summarize(python_summary(), data)
+
+
+def test_only_delivered_orders_count():
+    data = rows(6)
+    expected = sum(row[14] for row in data if row[2] == "DELIVERED")
+    total = sum(Decimal(str(row["revenue"])) for row in summarize(python_summary(), data))
+    assert total == expected
@@ -0,0 +1,98 @@
+# tests/test_imports.py
+import io
+import os
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Job, Product, ProductImportJob
+from app.stores import imports
+
+
+def register(client, username, role):
+    response = client.post("/api/auth/register", json={
+        "username": username, "full_name": username, "email": f"{username}@x.com",
+        "password": "secret1", "desired_role": role,
+    })
+    assert response.status_code == 201, response.get_json()
+    return {"Authorization": "Bearer " + response.get_json()["access_token"]}
+
+
+def upload(client, seller, rows=30, csv_data=None):
+    csv_data = csv_data or "name,price,stock\n" + "".join(f"Item {i},{i + 1},1\n" for i in range(rows))
+    response = client.post(
+        "/api/stores/my/products/import", headers=seller, content_type="multipart/form-data",
+        data={"file": (io.BytesIO(csv_data.encode()), "menu.csv")},
+    )
+    assert response.status_code == 202, response.get_json()
+    return response.get_json()["id"]
+
+
+def run_worker(app):
+    result = app.test_cli_runner().invoke(args=["jobs", "worker", "--once"])
+    assert result.exception is None, result.output
+
+
+def status(client, seller, import_id):
+    return client.get(f"/api/stores/my/products/import/{import_id}", headers=seller).get_json()
+
+
+def setup_store(client):
+    seller = register(client, "seller", "SELLER")
+    response = client.post("/api/stores/my", json={"name": "Shop", "category": "FOOD"}, headers=seller)
+    assert response.status_code == 200, response.get_json()
+    return seller
+
+
+def test_import_runs_on_job_queue_outside_media_root(app, client):
+    seller = setup_store(client)
+    import_id = upload(client, seller)
+
+    with app.app_context():
+        record = db.session.get(ProductImportJob, import_id)
+        assert os.path.exists(record.file_path)
+        assert not record.file_path.startswith(app.config["MEDIA_ROOT"])
+        assert Job.query.filter_by(name="stores.import_products").count() == 1
+    assert status(client, seller, import_id)["status"] == "QUEUED"
+
+    run_worker(app)
+
+    job = status(client, seller, import_id)
+    assert (job["status"], job["processed_rows"], job["created_count"]) == ("DONE", 30, 30)
+    with app.app_context():
+        assert not os.path.exists(db.session.get(ProductImportJob, import_id).file_path)
+
+
+def test_import_interrupted_by_dead_worker_is_resumed(app, client):
+    seller = setup_store(client)
+    import_id = upload(client, seller)
+
+    with app.app_context():
+        queued = Job.query.one()
+        queued.status, queued.attempts = "RUNNING", 1
+        queued.locked_by, queued.locked_at = "dead-worker", datetime.utcnow() - timedelta(hours=1)
+        record = db.session.get(ProductImportJob, import_id)
+        record.status, record.processed_rows, record.created_count = "RUNNING", 10, 10
+        db.session.commit()
+
+    run_worker(app)
+
+    job = status(client, seller, import_id)
+    assert (job["status"], job["processed_rows"], job["created_count"]) == ("DONE", 30, 30)
+
+
+def test_repeated_name_in_file_is_reported_not_created_twice(app, client, monkeypatch):
+    monkeypatch.setattr(imports, "CHUNK_SIZE", 2)  # التكرار التاني في chunk تاني
+    seller = setup_store(client)
+    import_id = upload(client, seller, csv_data="name,price\nFalafel,5\nfalafel,6\nTaameya,3\nFALAFEL,7\n")
+    run_worker(app)
+
+    job = status(client, seller, import_id)
+    assert (job["created_count"], job["updated_count"], job["error_count"]) == (2, 0, 2)
+    assert job["errors"] == [
+        {"row": 3, "error": "المنتج مكرر في الملف"},
+        {"row": 5, "error": "المنتج مكرر في الملف"},
+    ]
+    with app.app_context():
+        assert [(p.name, float(p.price)) for p in Product.query.order_by(Product.id)] == [
+            ("Falafel", 5.0), ("Taameya", 3.0),
+        ]
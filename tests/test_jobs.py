@@ -0,0 +1,56 @@
+# tests/test_jobs.py
+import io
+import os
+from datetime import datetime, timedelta
+
+from PIL import Image
+
+from app import db
+from app.jobs.queue import DEAD, DONE, QUEUED
+from app.models import Job
+
+
+def register(client, username, role):
+    response = client.post("/api/auth/register", json={
+        "username": username, "full_name": username, "email": f"{username}@x.com",
+        "password": "secret1", "desired_role": role,
+    })
+    assert response.status_code == 201, response.get_json()
+    return {"Authorization": "Bearer " + response.get_json()["access_token"]}
+
+
+def test_upload_thumbnail_is_written_where_thumbnail_url_points(app, client):
+    seller = register(client, "seller", "SELLER")
+    image = io.BytesIO()
+    Image.new("RGB", (1200, 800), "red").save(image, format="PNG")
+    image.seek(0)
+
+    response = client.post("/api/uploads/product-image", headers=seller, content_type="multipart/form-data",
+                           data={"file": (image, "photo.png")})
+    assert response.status_code == 201, response.get_json()
+    thumbnail_url = response.get_json()["thumbnail_url"]
+
+    result = app.test_cli_runner().invoke(args=["jobs", "worker", "--once"])
+    assert result.exception is None, result.output
+
+    media_url_path = app.config["MEDIA_URL_PATH"]
+    path = os.path.join(app.config["MEDIA_ROOT"], thumbnail_url[len(media_url_path) + 1:])
+    with Image.open(path) as thumbnail:
+        assert max(thumbnail.size) == app.config.get("THUMBNAIL_SIZE", 400)
+    with app.app_context():
+        assert Job.query.one().status == DONE
+
+
+def test_purge_removes_old_done_and_dead_jobs(app):
+    old = datetime.utcnow() - timedelta(days=30)
+    with app.app_context():
+        for status, finished_at in [(DONE, old), (DEAD, old), (DEAD, datetime.utcnow()), (QUEUED, None)]:
+            db.session.add(Job(queue="default", name="x", payload="{}", status=status, attempts=0,
+                               max_attempts=1, run_at=old, finished_at=finished_at))
+        db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=["jobs", "purge", "--days", "7"])
+    assert "Deleted 2 jobs" in result.output
+
+    with app.app_context():
+        assert sorted(job.status for job in Job.query) == [DEAD, QUEUED]
@@ -0,0 +1,127 @@
+# tests/test_notifications.py
+import socket
+
+import pytest
+
+from app import db
+from app.models import Job, NotificationCursor, NotificationEndpoint, User
+from app.notifications import transports
+from app.notifications.dispatch import DELIVER_JOB, deliver, dispatch_events
+from app.notifications.transports import UnsafeTarget, get_transport, resolve_public, target_error
+from app.tenancy import use_tenant
+
+
+def register(client, username, role):
+    response = client.post("/api/auth/register", json={
+        "username": username, "full_name": username, "email": f"{username}@x.com",
+        "password": "secret1", "desired_role": role,
+    })
+    assert response.status_code == 201, response.get_json()
+    return {"Authorization": "Bearer " + response.get_json()["access_token"]}
+
+
+@pytest.fixture
+def resolves_to(monkeypatch):
+    """
+    DNS وهمي: resolves_to("10.0.0.5") → أي host بيـresolve للعنوان ده.
+    """
+    def setter(*ips):
+        def getaddrinfo(host, port, *args, **kwargs):
+            return [(socket.AF_INET6 if ":" in ip else socket.AF_INET, socket.SOCK_STREAM, 6, "", (ip, port))
+                    for ip in ips]
+        monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+    return setter
+
+
+@pytest.fixture
+def stub_app(make_app, monkeypatch):
+    monkeypatch.setattr(transports, "_transports", None)
+    yield make_app(NOTIFICATIONS_TRANSPORT_OVERRIDE="stub")
+    transports._transports = None
+
+
+def add_endpoint(username, target="https://hooks.example.com/orders"):
+    with use_tenant(1):
+        user = User.query.filter_by(username=username).one()
+        endpoint = NotificationEndpoint(user_id=user.id, transport="webhook", target=target)
+        db.session.add(endpoint)
+        db.session.commit()
+        return user.id, endpoint.id
+
+
+def run_worker(app):
+    result = app.test_cli_runner().invoke(args=["jobs", "worker", "--once"])
+    assert result.exception is None, result.output
+
+
+def test_dispatch_sends_latest_event_per_order_to_each_recipient(stub_app):
+    client = stub_app.test_client()
+    seller = register(client, "seller", "SELLER")
+    store_id = client.post("/api/stores/my", headers=seller, json={"name": "Shop", "category": "FOOD"}).get_json()["id"]
+    product_id = client.post("/api/stores/my/products", headers=seller,
+                             json={"name": "Koshary", "price": 10, "stock": 5}).get_json()["id"]
+    customer = register(client, "customer", "CUSTOMER")
+    order_id = client.post("/api/orders", headers=customer, json={
+        "store_id": store_id, "items": [{"product_id": product_id, "quantity": 1}],
+    }).get_json()["id"]
+    for status in ("ACCEPTED", "PREPARING"):
+        client.post(f"/api/orders/{order_id}/status", headers=seller, json={"status": status})
+
+    with stub_app.app_context():
+        seller_id, _ = add_endpoint("seller")
+        customer_id, _ = add_endpoint("customer")
+        dispatch_events()
+        assert Job.query.filter_by(name=DELIVER_JOB).count() == 2
+        assert db.session.get(NotificationCursor, "order_events:1").last_event_id == 3
+
+        # الـ cursor اتحرك – مفيش حاجة جديدة تتبعت
+        dispatch_events()
+        assert Job.query.filter_by(name=DELIVER_JOB).count() == 2
+
+    run_worker(stub_app)
+    with stub_app.app_context():
+        sent = {message["user_id"]: message["events"] for _, message in get_transport("stub").sent}
+    assert [(e["order_id"], e["event_type"]) for e in sent[seller_id]] == [(order_id, "CREATED")]
+    assert [(e["order_id"], e["status"]) for e in sent[customer_id]] == [(order_id, "PREPARING")]
+
+
+@pytest.mark.parametrize("ip", ["127.0.0.1", "10.0.0.5", "169.254.169.254", "::1", "::ffff:192.168.1.1", "224.0.0.1"])
+def test_target_error_rejects_non_public_addresses(app, resolves_to, ip):
+    resolves_to(ip)
+    with app.app_context():
+        assert target_error("webhook", "https://hooks.example.com/x") == "الرابط يشير لعنوان غير مسموح"
+    with pytest.raises(UnsafeTarget):
+        resolve_public("hooks.example.com", 443)
+
+
+def test_target_error_accepts_public_https_only(app, resolves_to):
+    resolves_to("93.184.216.34")
+    with app.app_context():
+        assert target_error("webhook", "https://hooks.example.com/x") is None
+        assert target_error("webhook", "http://hooks.example.com/x") == "الرابط لازم يكون https"
+        assert target_error("webpush", "https://hooks.example.com/x") == "خدمة الإشعارات (push) غير مدعومة"
+        # عنوان واحد private وسط عناوين public كفاية للرفض
+        resolves_to("93.184.216.34", "10.0.0.5")
+        assert target_error("webhook", "https://hooks.example.com/x") == "الرابط يشير لعنوان غير مسموح"
+
+
+def test_register_endpoint_rejects_private_target(client, resolves_to):
+    customer = register(client, "customer", "CUSTOMER")
+    resolves_to("10.0.0.5")
+    response = client.post("/api/notifications/endpoints", headers=customer,
+                           json={"transport": "webhook", "url": "https://internal.example.com/hook"})
+    assert response.status_code == 400
+    assert response.get_json()["message"] == "الرابط يشير لعنوان غير مسموح"
+
+
+def test_delivery_after_dns_rebinding_disables_endpoint(app, client, resolves_to, monkeypatch):
+    monkeypatch.setattr(transports, "_transports", None)
+    register(client, "customer", "CUSTOMER")
+    with app.app_context():
+        _, endpoint_id = add_endpoint("customer")
+        # اتسجل على IP public وبعدها الـ DNS بقى بيشاور على الـ metadata service
+        resolves_to("169.254.169.254")
+        deliver(endpoint_id, [])
+        db.session.commit()
+        assert db.session.get(NotificationEndpoint, endpoint_id).is_active is False
+    transports._transports = None
@@ -0,0 +1,223 @@
+# tests/test_orders.py
+import pytest
+
+from app import db
+from app.models import Order, Product, Tenant
+from app.orders import idempotency
+from app.orders.events import EVENT_CREATED, record_order_events
+from app.orders.status import ORDER_STATUSES, ORDER_TRANSITIONS, can_transition, transition_orders
+from app.orders.stock import reserve_stock
+from app.tenancy import use_tenant
+
+
+def register(client, username, role):
+    response = client.post("/api/auth/register", json={
+        "username": username, "full_name": username, "email": f"{username}@x.com",
+        "password": "secret1", "desired_role": role,
+    })
+    assert response.status_code == 201, response.get_json()
+    return {"Authorization": "Bearer " + response.get_json()["access_token"]}
+
+
+@pytest.fixture
+def shop(client):
+    seller = register(client, "seller", "SELLER")
+    response = client.post("/api/stores/my", headers=seller, json={
+        "name": "Shop", "category": "FOOD", "min_order_amount": 0, "delivery_fee": 0,
+    })
+    assert response.status_code == 200, response.get_json()
+    store_id = response.get_json()["id"]
+    response = client.post("/api/stores/my/products", headers=seller, json={"name": "Koshary", "price": 10, "stock": 5})
+    assert response.status_code == 201, response.get_json()
+    return {
+        "seller": seller,
+        "customer": register(client, "customer", "CUSTOMER"),
+        "store_id": store_id,
+        "product_id": response.get_json()["id"],
+    }
+
+
+def cart(shop, quantity, **extra):
+    return {"store_id": shop["store_id"], "items": [{"product_id": shop["product_id"], "quantity": quantity}], **extra}
+
+
+def stock(app, shop):
+    with app.app_context(), use_tenant(1):
+        return db.session.get(Product, shop["product_id"]).stock
+
+
+def test_quote_cannot_order_over_stock(client, shop):
+    quote = client.post("/api/orders/quote", json=cart(shop, 6)).get_json()
+    assert quote["all_in_stock"] is False
+    assert quote["can_order"] is False
+    assert client.post("/api/orders/quote", json=cart(shop, 5)).get_json()["can_order"] is True
+
+
+def test_create_order_decrements_stock_and_rejects_over_stock(app, client, shop):
+    response = client.post("/api/orders", headers=shop["customer"], json=cart(shop, 3))
+    assert response.status_code == 201, response.get_json()
+    assert stock(app, shop) == 2
+
+    response = client.post("/api/orders", headers=shop["customer"], json=cart(shop, 3))
+    assert response.status_code == 400
+    assert response.get_json()["quote"]["all_in_stock"] is False
+    assert stock(app, shop) == 2
+
+
+def test_reserve_stock_is_conditional(app, shop):
+    line = {"product_id": shop["product_id"], "product_name": "Koshary", "quantity": 3}
+    with app.app_context(), use_tenant(1):
+        # الـ quote شاف 5 – طلب تاني خد 3 قبلنا
+        assert reserve_stock([line]) is None
+        assert reserve_stock([line]) == "Koshary"
+        db.session.commit()
+    assert stock(app, shop) == 2
+
+
+def test_cancelling_returns_stock(app, client, shop):
+    order = client.post("/api/orders", headers=shop["customer"], json=cart(shop, 4)).get_json()
+    assert stock(app, shop) == 1
+    response = client.post(f"/api/orders/{order['id']}/status", headers=shop["seller"], json={"status": "REJECTED"})
+    assert response.status_code == 200, response.get_json()
+    assert stock(app, shop) == 5
+
+
+def order_count(app):
+    with app.app_context(), use_tenant(1):
+        return Order.query.count()
+
+
+def test_idempotent_retry_replays_the_first_order(app, client, shop):
+    headers = dict(shop["customer"], **{"Idempotency-Key": "k-1"})
+    first = client.post("/api/orders", headers=headers, json=cart(shop, 2))
+    retry = client.post("/api/orders", headers=headers, json=cart(shop, 2))
+    assert (first.status_code, retry.status_code) == (201, 201)
+    assert retry.get_json() == first.get_json()
+    assert order_count(app) == 1
+    assert stock(app, shop) == 3
+
+
+def test_idempotency_key_reused_with_another_body_is_422(app, client, shop):
+    headers = dict(shop["customer"], **{"Idempotency-Key": "k-1"})
+    assert client.post("/api/orders", headers=headers, json=cart(shop, 2)).status_code == 201
+    response = client.post("/api/orders", headers=headers, json=cart(shop, 3))
+    assert response.status_code == 422
+    assert order_count(app) == 1
+
+
+def test_concurrent_requests_with_same_key_create_one_order(app, client, shop, monkeypatch):
+    headers = dict(shop["customer"], **{"Idempotency-Key": "k-1"})
+    first = client.post("/api/orders", headers=headers, json=cart(shop, 2)).get_json()
+
+    # التاني عدّى الـ replay قبل ما الأول يعمل commit – الـ unique constraint هو اللي بيمسكه
+    real_replay = idempotency.replay
+    calls = []
+
+    def racing_replay(*args):
+        calls.append(args)
+        return None if len(calls) == 1 else real_replay(*args)
+
+    monkeypatch.setattr(idempotency, "replay", racing_replay)
+    second = client.post("/api/orders", headers=headers, json=cart(shop, 2))
+
+    assert len(calls) == 2
+    assert second.status_code == 201
+    assert second.get_json()["id"] == first["id"]
+    assert order_count(app) == 1
+    assert stock(app, shop) == 3
+
+
+def set_status(client, shop, order_id, status):
+    return client.post(f"/api/orders/{order_id}/status", headers=shop["seller"], json={"status": status})
+
+
+def place_order(client, shop, quantity=1):
+    response = client.post("/api/orders", headers=shop["customer"], json=cart(shop, quantity))
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()["id"]
+
+
+def test_transition_table():
+    assert all(targets <= ORDER_STATUSES for targets in ORDER_TRANSITIONS.values())
+    for terminal in ("REJECTED", "DELIVERED", "CANCELLED"):
+        assert ORDER_TRANSITIONS[terminal] == set()
+    assert can_transition("READY", "DELIVERED")  # PICKUP
+    assert not can_transition("PENDING", "DELIVERED")
+    assert not can_transition("DELIVERED", "CANCELLED")
+
+
+def test_status_workflow_rejects_invalid_moves(client, shop):
+    order_id = place_order(client, shop)
+    response = set_status(client, shop, order_id, "DELIVERED")
+    assert response.status_code == 409
+    assert response.get_json()["status"] == "PENDING"
+
+    for status in ("ACCEPTED", "PREPARING", "READY", "DELIVERED"):
+        response = set_status(client, shop, order_id, status)
+        assert response.status_code == 200, response.get_json()
+        assert response.get_json()["status"] == status
+
+    assert set_status(client, shop, order_id, "BOGUS").status_code == 400
+    assert set_status(client, shop, 9999, "ACCEPTED").status_code == 404
+
+
+def test_compare_and_set_loser_gets_409(app, client, shop):
+    order_id = place_order(client, shop)
+    with app.app_context(), use_tenant(1):
+        # اتنين قروا PENDING في نفس اللحظة – الـ UPDATE ... WHERE status IN (...) بيعدّي واحد بس
+        assert transition_orders(shop["store_id"], [order_id], "ACCEPTED") == [order_id]
+        assert transition_orders(shop["store_id"], [order_id], "REJECTED") == []
+        db.session.commit()
+
+    response = set_status(client, shop, order_id, "REJECTED")
+    assert response.status_code == 409
+    assert response.get_json()["status"] == "ACCEPTED"
+    assert stock(app, shop) == 4
+
+
+def test_bulk_status_reports_skipped_orders(client, shop):
+    first, second = place_order(client, shop), place_order(client, shop)
+    assert set_status(client, shop, second, "REJECTED").status_code == 200
+
+    response = client.post("/api/orders/status/bulk", headers=shop["seller"],
+                           json={"order_ids": [first, second, first], "status": "ACCEPTED"})
+    assert response.status_code == 200
+    assert response.get_json() == {"status": "ACCEPTED", "updated": [first], "skipped": [second]}
+
+
+def feed(client, headers, after=0, limit=100):
+    response = client.get(f"/api/orders/events?after={after}&limit={limit}", headers=headers)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def test_event_feed_tails_in_sequence_order(app, client, shop):
+    first, second = place_order(client, shop), place_order(client, shop)
+    set_status(client, shop, first, "ACCEPTED")
+    set_status(client, shop, second, "REJECTED")
+
+    # events من كمبوند تاني بنفس الـ store_id مش بتظهر
+    with app.app_context():
+        db.session.add(Tenant(id=2, code="palm", name="Palm"))
+        db.session.commit()
+        with use_tenant(2):
+            record_order_events([{"order_id": 99, "store_id": shop["store_id"], "customer_id": 1,
+                                  "status": "PENDING"}], EVENT_CREATED)
+            db.session.commit()
+
+    page = feed(client, shop["seller"], limit=3)
+    seqs = [e["seq"] for e in page["events"]]
+    assert seqs == sorted(seqs) and page["next_after"] == seqs[-1]
+    assert [(e["order_id"], e["event_type"]) for e in page["events"]] == [
+        (first, "CREATED"), (second, "CREATED"), (first, "STATUS_CHANGED"),
+    ]
+
+    rest = feed(client, shop["seller"], after=page["next_after"])
+    assert [(e["order_id"], e["status"]) for e in rest["events"]] == [(second, "REJECTED")]
+    assert feed(client, shop["seller"], after=rest["next_after"]) == {"events": [], "next_after": rest["next_after"]}
+
+    customer = feed(client, shop["customer"])
+    assert [e["seq"] for e in customer["events"]] == seqs + [rest["next_after"]]
+
+    history = client.get(f"/api/orders/{first}/history", headers=shop["customer"]).get_json()
+    assert [e["status"] for e in history] == ["PENDING", "ACCEPTED"]
@@ -0,0 +1,81 @@
+# tests/test_products.py
+from app.stores.products import MAX_BATCH_OPERATIONS
+
+
+def register(client, username, role):
+    response = client.post("/api/auth/register", json={
+        "username": username, "full_name": username, "email": f"{username}@x.com",
+        "password": "secret1", "desired_role": role,
+    })
+    assert response.status_code == 201, response.get_json()
+    return {"Authorization": "Bearer " + response.get_json()["access_token"]}
+
+
+def setup_store(client):
+    seller = register(client, "seller", "SELLER")
+    response = client.post("/api/stores/my", json={"name": "Shop", "category": "FOOD"}, headers=seller)
+    assert response.status_code == 200, response.get_json()
+    return seller
+
+
+def batch(client, seller, operations):
+    return client.patch("/api/stores/my/products", headers=seller, json={"operations": operations})
+
+
+def my_products(client, seller):
+    return {p["name"]: p for p in client.get("/api/stores/my/products", headers=seller).get_json()}
+
+
+def test_batch_applies_creates_updates_and_deletes(client):
+    seller = setup_store(client)
+    response = batch(client, seller, [{"op": "create", "name": f"P{i}", "price": i + 1, "stock": 3} for i in range(3)])
+    assert response.status_code == 200, response.get_json()
+    results = response.get_json()["results"]
+    assert [(r["index"], r["status"]) for r in results] == [(0, "created"), (1, "created"), (2, "created")]
+    ids = [r["id"] for r in results]
+
+    response = batch(client, seller, [
+        {"op": "update", "id": ids[0], "price": 99, "stock": 0},
+        {"op": "delete", "id": ids[1]},
+        {"op": "create", "name": "New", "price": "2.50"},
+    ])
+    assert response.status_code == 200, response.get_json()
+    products = my_products(client, seller)
+    assert set(products) == {"P0", "P2", "New"}
+    assert (products["P0"]["price"], products["P0"]["stock"]) == (99.0, 0)
+    assert products["New"]["price"] == 2.5
+
+
+def test_batch_with_invalid_operations_applies_nothing(client):
+    seller = setup_store(client)
+    product_id = batch(client, seller, [{"op": "create", "name": "Kept", "price": 5}]).get_json()["results"][0]["id"]
+
+    response = batch(client, seller, [
+        {"op": "update", "id": product_id, "price": 7},
+        {"op": "create", "name": "Bad", "price": "abc"},
+        {"op": "delete", "id": 9999},
+        {"op": "update", "id": product_id, "stock": 1},
+        {"op": "rename"},
+    ])
+    assert response.status_code == 400
+    errors = {r["index"]: r.get("error") for r in response.get_json()["results"]}
+    assert errors[0] is None
+    assert errors[2] == "المنتج غير موجود"
+    assert errors[3] == "المنتج مكرر في نفس الدفعة"
+    assert errors[4] == "نوع العملية غير صالح"
+    assert errors[1]
+    assert set(my_products(client, seller)) == {"Kept"}
+    assert my_products(client, seller)["Kept"]["price"] == 5.0
+
+
+def test_batch_is_capped(client):
+    seller = setup_store(client)
+    operations = [{"op": "create", "name": f"P{i}", "price": 1} for i in range(MAX_BATCH_OPERATIONS + 1)]
+    response = batch(client, seller, operations)
+    assert response.status_code == 400
+    assert response.get_json()["message"] == f"الحد الأقصى {MAX_BATCH_OPERATIONS} عملية في المرة"
+    assert my_products(client, seller) == {}
+
+    assert batch(client, seller, operations[:MAX_BATCH_OPERATIONS]).status_code == 200
+    assert len(my_products(client, seller)) == MAX_BATCH_OPERATIONS
+    assert batch(client, seller, []).status_code == 400
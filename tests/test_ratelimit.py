@@ -0,0 +1,40 @@
+# tests/test_ratelimit.py
+import pytest
+
+
+@pytest.fixture
+def limited_app(make_app):
+    app = make_app(RATELIMIT_BUDGETS={"login": "2/minute", "refresh": "2/minute"}, PROXY_FIX_HOPS=1)
+    app.config["RATELIMIT_ENABLED"] = True
+    return app
+
+
+def login(client, ip):
+    return client.post(
+        "/api/auth/login",
+        json={"username": "nobody", "password": "x"},
+        headers={"X-Forwarded-For": ip},
+    )
+
+
+def test_anonymous_clients_behind_proxy_get_their_own_bucket(limited_app):
+    client = limited_app.test_client()
+    assert [login(client, "198.51.100.1").status_code for _ in range(3)][-1] == 429
+    assert login(client, "198.51.100.2").status_code != 429
+
+
+def test_only_the_configured_hops_are_trusted(limited_app):
+    client = limited_app.test_client()
+    # الـ client حاطط IP مزوّر في الأول – الـ proxy بيضيف الحقيقي في الآخر
+    for spoofed in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):
+        response = login(client, f"{spoofed}, 198.51.100.1")
+    assert response.status_code == 429
+
+
+def test_refresh_is_rate_limited(limited_app):
+    client = limited_app.test_client()
+    statuses = [
+        client.post("/api/auth/refresh", json={"refresh_token": "garbage"}).status_code
+        for _ in range(3)
+    ]
+    assert statuses == [401, 401, 429]
@@ -0,0 +1,102 @@
+# tests/test_replicas.py
+"""
+primary و replica على ملفين SQLite منفصلين بنفس الـ schema وبيانات مختلفة،
+فاسم المتجر اللي راجع بيقول الـ query راحت فين.
+"""
+import time
+
+import pytest
+from flask import g
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import Store, User
+from app.tenancy import use_tenant
+from tests.conftest import seed
+
+
+def add_store(session, name):
+    owner = User(username=f"owner-{name}", full_name=name, email=f"{name}@x.com", role="SELLER",
+                 password_hash="x", tenant_id=1)
+    session.add(owner)
+    session.flush()
+    session.add(Store(owner_id=owner.id, name=name, category="FOOD", tenant_id=1))
+    session.commit()
+
+
+@pytest.fixture
+def app(make_app, tmp_path):
+    app = make_app(
+        SQLALCHEMY_BINDS={"replica_0": f"sqlite:///{tmp_path / 'replica.db'}"},
+        READ_YOUR_WRITES_SECONDS=0.5,
+    )
+    with app.app_context():
+        replica = db.engines["replica_0"]
+        db.metadata.create_all(replica)
+        seed(replica)
+        with Session(bind=replica) as session:
+            add_store(session, "replica")
+        with use_tenant(1):
+            add_store(db.session, "primary")
+    return app
+
+
+def store_names(client, headers=None):
+    response = client.get("/api/stores", headers=headers or {})
+    assert response.status_code == 200, response.get_json()
+    return [store["name"] for store in response.get_json()]
+
+
+def register(client, username):
+    response = client.post("/api/auth/register", json={
+        "username": username, "full_name": username, "email": f"{username}@x.com",
+        "password": "secret1",
+    })
+    assert response.status_code == 201, response.get_json()
+    return {"Authorization": "Bearer " + response.get_json()["access_token"]}
+
+
+def test_get_reads_from_replica(client):
+    assert store_names(client) == ["replica"]
+
+
+def test_writes_go_to_primary(app, client):
+    register(client, "newcomer")
+    with app.app_context():
+        primary = db.session.execute(
+            db.select(User.username).where(User.username == "newcomer")
+        ).scalars().all()
+        with Session(bind=db.engines["replica_0"]) as session:
+            replica = session.execute(
+                db.select(User.username).where(User.username == "newcomer")
+            ).scalars().all()
+    assert primary == ["newcomer"]
+    assert replica == []
+
+
+def test_flush_moves_rest_of_get_request_to_primary(app):
+    with app.test_request_context("/api/stores", method="GET"):
+        app.preprocess_request()
+        assert g.db_use_replica is True
+        assert [s.name for s in Store.query.all()] == ["replica"]
+
+        owner_id = db.session.execute(
+            db.select(User.id).where(User.username == "owner-replica")
+        ).scalar_one()
+        db.session.add(Store(owner_id=owner_id, name="flushed", category="FOOD"))
+        db.session.flush()
+
+        assert g.db_use_replica is False
+        assert sorted(s.name for s in Store.query.all()) == ["flushed", "primary"]
+        db.session.rollback()
+
+
+def test_read_your_writes_window(client):
+    headers = register(client, "writer")
+
+    # الكاتب بيقرا من الـ primary جوه الـ window، وباقي المستخدمين من الـ replica
+    assert store_names(client, headers) == ["primary"]
+    assert store_names(client) == ["replica"]
+
+    time.sleep(0.6)
+    assert store_names(client, headers) == ["replica"]
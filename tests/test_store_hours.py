@@ -0,0 +1,115 @@
+# tests/test_store_hours.py
+from datetime import datetime, time, timezone
+from itertools import product
+
+import pytest
+
+from app import db
+from app.models import Store, User
+from app.stores.hours import is_open_at, local_time, open_now_clause
+from app.tenancy import use_tenant
+
+OVERNIGHT = (time(22, 0), time(2, 0))
+
+
+@pytest.mark.parametrize(
+    "at, expected",
+    [
+        (time(21, 59), False),
+        (time(22, 0), True),
+        (time(23, 59), True),
+        (time(0, 0), True),
+        (time(1, 59), True),
+        (time(2, 0), False),
+        (time(12, 0), False),
+    ],
+)
+def test_overnight_hours(at, expected):
+    assert is_open_at(*OVERNIGHT, at) is expected
+
+
+@pytest.mark.parametrize(
+    "at, expected",
+    [(time(8, 59), False), (time(9, 0), True), (time(16, 59), True), (time(17, 0), False)],
+)
+def test_same_day_hours(at, expected):
+    assert is_open_at(time(9, 0), time(17, 0), at) is expected
+
+
+@pytest.mark.parametrize("at", [time(0, 0), time(9, 0), time(23, 59)])
+def test_open_from_equals_open_to_is_open_all_day(at):
+    assert is_open_at(time(9, 0), time(9, 0), at) is True
+
+
+@pytest.mark.parametrize("open_from, open_to", [(None, None), (time(9, 0), None), (None, time(17, 0))])
+def test_missing_hours_is_always_open(open_from, open_to):
+    assert is_open_at(open_from, open_to, time(3, 0)) is True
+
+
+@pytest.mark.parametrize(
+    "utc, expected",
+    [
+        # بداية الصيفي 2024: 00:00 بتوقيت القاهرة بتبقى 01:00
+        (datetime(2024, 4, 25, 21, 59), time(23, 59)),
+        (datetime(2024, 4, 25, 22, 0), time(1, 0)),
+        # نهاية الصيفي 2024: 00:00 بتبقى 23:00 تاني
+        (datetime(2024, 10, 31, 20, 59), time(23, 59)),
+        (datetime(2024, 10, 31, 21, 0), time(23, 0)),
+    ],
+)
+def test_local_time_follows_cairo_dst(app, utc, expected):
+    with app.app_context():
+        assert local_time(utc) == expected
+        assert local_time(utc.replace(tzinfo=timezone.utc)) == expected
+
+
+def test_overnight_store_across_dst_start(app):
+    # المتجر بيقفل 00:30 – الساعة اللي بعد 23:59 بقت 01:00 فهو مقفول
+    with app.app_context():
+        assert is_open_at(time(20, 0), time(0, 30), local_time(datetime(2024, 4, 25, 21, 59)))
+        assert not is_open_at(time(20, 0), time(0, 30), local_time(datetime(2024, 4, 25, 22, 0)))
+
+
+HOURS = [
+    None,
+    time(0, 0),
+    time(2, 0),
+    time(9, 0),
+    time(17, 0),
+    time(22, 0),
+    time(23, 59),
+]
+
+TIMES = sorted(
+    {time(h, m) for h in range(24) for m in (0, 30)}
+    | {time(1, 59), time(8, 59), time(16, 59), time(21, 59), time(23, 59), time(23, 59, 59)}
+)
+
+
+def test_open_now_clause_matches_is_open_at(app):
+    with app.app_context(), use_tenant(1):
+        owner = User(username="owner", full_name="Owner", email="owner@x.com", role="SELLER")
+        owner.password_hash = "x"
+        db.session.add(owner)
+        db.session.flush()
+
+        hours = {}
+        for open_from, open_to in product(HOURS, HOURS):
+            store = Store(
+                owner_id=owner.id, name=f"{open_from}-{open_to}", category="FOOD",
+                open_from=open_from, open_to=open_to,
+            )
+            db.session.add(store)
+            db.session.flush()
+            hours[store.id] = (open_from, open_to)
+        db.session.commit()
+
+        for at in TIMES:
+            in_sql = {
+                store_id for (store_id,) in db.session.query(Store.id).filter(open_now_clause(at))
+            }
+            in_python = {
+                store_id for store_id, (open_from, open_to) in hours.items()
+                if is_open_at(open_from, open_to, at)
+            }
+            assert in_sql == in_python, at
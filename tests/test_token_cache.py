@@ -0,0 +1,39 @@
+# tests/test_token_cache.py
+from app.auth.tokens import VerifiedTokenCache
+
+
+def test_user_index_is_bounded_by_lru():
+    cache = VerifiedTokenCache(maxsize=3)
+    for i in range(100):
+        cache.put(str(i).encode(), {"sub": str(i), "exp": None})
+    assert len(cache._entries) == 3
+    assert set(cache._by_user) == {"97", "98", "99"}
+
+
+def test_invalidate_user_drops_all_their_tokens():
+    cache = VerifiedTokenCache()
+    cache.put(b"a", {"sub": "1", "exp": None})
+    cache.put(b"b", {"sub": "1", "exp": None})
+    cache.put(b"c", {"sub": "2", "exp": None})
+    cache.invalidate_user(1)
+    assert cache.get(b"a", 0) is None
+    assert cache.get(b"b", 0) is None
+    assert cache.get(b"c", 0) == {"sub": "2", "exp": None}
+    assert set(cache._by_user) == {"2"}
+
+
+def test_expired_entry_is_removed():
+    cache = VerifiedTokenCache()
+    cache.put(b"a", {"sub": "1", "exp": 10})
+    assert cache.get(b"a", 9) is not None
+    assert cache.get(b"a", 10) is None
+    assert cache._by_user == {}
+
+
+def test_returns_copies():
+    cache = VerifiedTokenCache()
+    claims = {"sub": "1", "exp": None}
+    cache.put(b"a", claims)
+    claims["sub"] = "2"
+    cache.get(b"a", 0)["sub"] = "3"
+    assert cache.get(b"a", 0)["sub"] == "1"